@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Generate a reproducible synthetic Ideaverse vault for benchmarking.
+
+Usage:
+    ./generate_vault.py OUTPUT_DIR [--notes N] [--seed N] [--links-per-note N]
+                        [--moc-size N] [--frontmatter-error-rate R] [--noise N]
+                        [--transcripts N]
+    python3 generate_vault.py /tmp/bench-vault --notes 10000
+
+Layout:
+- Home.md and Atlas/Maps/Ideaverse Map.md (root notes)
+- Atlas/Maps/ - MOCs linking to their members, some past the bloat threshold
+- Atlas/Dots/ - concept notes; link targets follow a Zipf-like
+  distribution so popular concepts become squeeze points
+- Calendar/Daily/ - daily notes linking to a few concepts
+- Efforts/Ongoing/, Efforts/Simmering/ - project notes
+- Calendar/Meetings/ - with --transcripts, multi-megabyte meeting
+  transcripts, the kind of note that dominates read and scan time
+
+Every note gets random words, wikilinks (aliases, #anchors, Folder/Note
+paths, the occasional broken target and links inside code blocks) and
+frontmatter, with a configurable share of notes missing frontmatter or
+a required property. Notes are spread over two years of age: their
+modification times count back from now, their dates (daily note names,
+'created') back from a fixed day so file contents never change.
+
+Non-vault noise that the audit scripts must skip is written alongside:
+node_modules/, dist/, build/, .obsidian/, a .gitignore'd private/
+folder and a git submodule listed in .gitmodules.
+
+The same seed and options always produce the same files.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+WORDS = (
+    "system pattern event stream state model graph cache index query "
+    "signal network memory storage process thread queue message service "
+    "domain context boundary schema contract protocol layer kernel shell "
+    "habit focus writing reading thinking learning practice review project "
+    "garden atlas effort calendar energy time attention idea concept theory"
+).split()
+
+ADJECTIVES = (
+    "Distributed Atomic Durable Eventual Lazy Reactive Immutable Layered "
+    "Emergent Deliberate Progressive Incremental Adaptive Resilient"
+).split()
+
+# Notes are up to this old (seconds)
+MAX_AGE = 2 * 365 * 86400
+
+# Dates written into notes count back from this fixed day (2025-01-01 UTC)
+DATE_ANCHOR = 1735689600
+
+# Approximate size of each --transcripts note
+TRANSCRIPT_BYTES = 4 * 1024 * 1024
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Generate a reproducible synthetic Ideaverse vault for benchmarking.'
+    )
+    parser.add_argument(
+        'output_dir',
+        type=Path,
+        help='Directory to write the vault into (must not exist unless --force)'
+    )
+    parser.add_argument(
+        '--notes',
+        type=int,
+        default=1000,
+        help='Number of vault notes to generate (default: 1000)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+        help='Random seed (default: 42)'
+    )
+    parser.add_argument(
+        '--links-per-note',
+        type=int,
+        default=8,
+        help='Average number of wikilinks per note (default: 8)'
+    )
+    parser.add_argument(
+        '--moc-size',
+        type=int,
+        default=40,
+        help='Average number of members per MOC (default: 40)'
+    )
+    parser.add_argument(
+        '--frontmatter-error-rate',
+        type=float,
+        default=0.05,
+        help='Share of notes with missing or incomplete frontmatter (default: 0.05)'
+    )
+    parser.add_argument(
+        '--noise',
+        type=int,
+        default=50,
+        help='Files per noise directory that audits must skip (default: 50)'
+    )
+    parser.add_argument(
+        '--transcripts',
+        type=int,
+        default=0,
+        help=f'Number of large (~{TRANSCRIPT_BYTES >> 20} MB) transcript notes to add (default: 0)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Write into OUTPUT_DIR even if it already exists'
+    )
+    return parser.parse_args()
+
+def write(path: Path, content: str, mtime: float = None):
+    """Write a file, creating parent directories, optionally setting its mtime."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding='utf-8')
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+def make_frontmatter(rng, up, created, error_rate, extra=''):
+    """Render a frontmatter header, dropping parts of it at error_rate."""
+    if rng.random() < error_rate:
+        kind = rng.randrange(3)
+        if kind == 0:
+            return ''  # missing frontmatter
+        if kind == 1:
+            up = None  # missing 'up'
+        else:
+            created = None  # missing 'created'
+    lines = ['---']
+    if up:
+        lines.append('up:')
+        lines.append(f'  - "[[{up}]]"')
+    if created:
+        lines.append(f'created: {created}')
+    if extra:
+        lines.append(extra)
+    lines.append('---')
+    return '\n'.join(lines) + '\n'
+
+def make_body(rng, title, links, words):
+    """Render a note body with a heading, prose paragraphs and the given links."""
+    parts = [f'# {title}\n']
+    links = list(links)
+    while words > 0 or links:
+        n = min(words, rng.randint(20, 60))
+        words -= n
+        sentence = ' '.join(rng.choice(WORDS) for _ in range(n))
+        for _ in range(min(len(links), rng.randint(1, 3))):
+            sentence += f' {links.pop()}'
+        parts.append(sentence[:1].upper() + sentence[1:] + '.\n')
+        if rng.random() < 0.1:
+            parts.append(f'\n## {rng.choice(ADJECTIVES)} {rng.choice(WORDS)}\n')
+    if rng.random() < 0.05:
+        # Links in code are not links; audits must ignore them
+        parts.append('\n```\n[[Not A Link]]\n```\n`[[Inline Code]]` #tag/example\n')
+    return '\n'.join(parts)
+
+def render_link(rng, name, folder):
+    """Render a wikilink to a note in one of the forms Obsidian accepts."""
+    r = rng.random()
+    if r < 0.1:
+        return f'[[{name}|{name.lower()}]]'
+    if r < 0.15:
+        return f'[[{name}#{rng.choice(WORDS).capitalize()}]]'
+    if r < 0.18:
+        return f'[[{folder}/{name}]]'
+    return f'[[{name}]]'
+
+def make_transcript(rng, title, links, size):
+    """Render a meeting transcript of about size bytes, links scattered through it."""
+    lines = [f'# {title}\n']
+    total = 0
+    links = list(links)
+    while total < size:
+        minute = len(lines)
+        line = (f'**Speaker {rng.randint(1, 6)}** [{minute // 60:02d}:{minute % 60:02d}]: '
+                + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(5, 60))))
+        if links and rng.random() < 0.01:
+            line += f' {links.pop()}'
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines + links) + '\n'
+
+def generate_vault(output_dir, notes=1000, seed=42, links_per_note=8, moc_size=40,
+                   frontmatter_error_rate=0.05, noise=50, transcripts=0):
+    """
+    Write a synthetic vault and return a summary of what was generated.
+
+    Args:
+        output_dir: Directory to write the vault into
+        notes: Number of vault notes (concepts, daily notes, efforts and MOCs)
+        seed: Random seed; the same arguments always produce the same files
+        links_per_note: Average wikilinks per note
+        moc_size: Average members per MOC
+        frontmatter_error_rate: Share of notes with broken frontmatter
+        noise: Files per noise directory
+        transcripts: Number of large transcript notes (on top of notes)
+
+    Returns:
+        Dict of generated counts
+    """
+    rng = random.Random(seed)
+    root = Path(output_dir)
+    now = time.time()
+
+    n_mocs = max(1, notes // max(1, moc_size) // 2)
+    n_daily = notes * 15 // 100
+    n_efforts = notes * 10 // 100
+    n_concepts = max(1, notes - n_mocs - n_daily - n_efforts - 2)
+
+    concepts = [
+        f'{rng.choice(ADJECTIVES)} {rng.choice(WORDS).capitalize()} {i}'
+        for i in range(n_concepts)
+    ]
+    mocs = [f'{rng.choice(WORDS).capitalize()} {i} MOC' for i in range(n_mocs)]
+
+    # Zipf-like popularity: a few concepts get most of the links
+    cum_weights = []
+    total = 0.0
+    for rank in range(n_concepts):
+        total += 1.0 / (rank + 1)
+        cum_weights.append(total)
+
+    def pick_links(count, folder='Atlas/Dots'):
+        targets = rng.choices(concepts, cum_weights=cum_weights, k=count)
+        links = [render_link(rng, name, folder) for name in targets]
+        if rng.random() < 0.02:
+            links.append(f'[[Missing {rng.choice(WORDS).capitalize()}]]')
+        return links
+
+    def random_age():
+        return rng.random() * MAX_AGE
+
+    def date_of(age):
+        return time.strftime('%Y-%m-%d', time.gmtime(DATE_ANCHOR - age))
+
+    stats = {'notes': 0, 'links': 0, 'mocs': n_mocs, 'noise_files': 0}
+
+    def note(path, content, age):
+        write(root / path, content, now - age)
+        stats['notes'] += 1
+        stats['links'] += content.count('[[')
+
+    # Root notes
+    note('Home.md', '---\nup: []\ncreated: 2020-01-01\n---\n# Home\n[[Ideaverse Map]]\n', 0)
+    note(
+        'Atlas/Maps/Ideaverse Map.md',
+        '---\nup:\n  - "[[Home]]"\nin:\n  - "[[Maps]]"\ncreated: 2020-01-01\n---\n# Ideaverse Map\n'
+        + '\n'.join(f'- [[{moc}]]' for moc in mocs) + '\n',
+        0,
+    )
+
+    # MOCs: members are assigned round-robin; sizes vary so some are bloated
+    members = [[] for _ in mocs]
+    home_moc = []
+    for i, concept in enumerate(concepts):
+        m = rng.randrange(n_mocs) if rng.random() < 0.5 else i % n_mocs
+        members[m].append(concept)
+        home_moc.append(mocs[m])
+    for moc, group in zip(mocs, members):
+        age = random_age()
+        fm = make_frontmatter(rng, 'Ideaverse Map', date_of(age), frontmatter_error_rate,
+                              extra='in:\n  - "[[Maps]]"')
+        body = f'# {moc}\n\n' + '\n'.join(f'- [[{name}]]' for name in group) + '\n'
+        note(f'Atlas/Maps/{moc}.md', fm + body, age)
+
+    # Concepts
+    for concept, moc in zip(concepts, home_moc):
+        age = random_age()
+        fm = make_frontmatter(rng, moc, date_of(age), frontmatter_error_rate)
+        links = pick_links(rng.randint(0, 2 * links_per_note))
+        note(f'Atlas/Dots/{concept}.md', fm + make_body(rng, concept, links, rng.randint(30, 600)), age)
+
+    # Daily notes, one per day going back
+    for i in range(n_daily):
+        age = i * 86400
+        day = date_of(age)
+        fm = make_frontmatter(rng, None, day, frontmatter_error_rate)
+        links = pick_links(rng.randint(0, links_per_note))
+        note(f'Calendar/Daily/{day}.md', fm + make_body(rng, day, links, rng.randint(20, 200)), age)
+
+    # Efforts
+    for i in range(n_efforts):
+        age = random_age()
+        name = f'Project {rng.choice(WORDS).capitalize()} {i}'
+        folder = 'Efforts/Ongoing' if rng.random() < 0.6 else 'Efforts/Simmering'
+        fm = make_frontmatter(rng, rng.choice(mocs), date_of(age), frontmatter_error_rate)
+        links = pick_links(rng.randint(0, links_per_note))
+        note(f'{folder}/{name}.md', fm + make_body(rng, name, links, rng.randint(10, 300)), age)
+
+    # Transcripts, counted on top of --notes so they don't change the rest
+    for i in range(transcripts):
+        age = random_age()
+        day = date_of(age)
+        fm = make_frontmatter(rng, None, day, frontmatter_error_rate)
+        title = f'{day} Meeting {i}'
+        links = pick_links(rng.randint(0, 4 * links_per_note))
+        note(f'Calendar/Meetings/{title}.md',
+             fm + make_transcript(rng, title, links, TRANSCRIPT_BYTES), age)
+
+    # Noise the audits must skip
+    noise_dirs = [
+        'node_modules/left-pad',
+        'docs-site/node_modules/markdown-it',
+        'dist',
+        'build/html',
+        '.obsidian/plugins/dataview',
+        'private',
+        'vendor/handbook',
+    ]
+    for folder in noise_dirs:
+        for i in range(noise):
+            write(root / folder / f'README-{i}.md', f'# Noise {i}\n[[Noise Target {i}]]\n')
+            stats['noise_files'] += 1
+    write(root / '.gitignore', 'private/\n*.log\n')
+    write(root / '.gitmodules', '[submodule "vendor/handbook"]\n'
+          '\tpath = vendor/handbook\n'
+          '\turl = https://example.com/handbook.git\n')
+
+    return stats
+
+def main():
+    args = get_args()
+
+    if args.output_dir.exists() and not args.force:
+        print(f"Error: Path already exists: {args.output_dir} (use --force)", file=sys.stderr)
+        sys.exit(1)
+
+    stats = generate_vault(
+        args.output_dir,
+        notes=args.notes,
+        seed=args.seed,
+        links_per_note=args.links_per_note,
+        moc_size=args.moc_size,
+        frontmatter_error_rate=args.frontmatter_error_rate,
+        noise=args.noise,
+        transcripts=args.transcripts,
+    )
+    print(f"Generated {stats['notes']} notes ({stats['links']} links, {stats['mocs']} MOCs) "
+          f"and {stats['noise_files']} noise files in {args.output_dir}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Benchmark the audit scripts and vault_utils primitives on synthetic vaults.
+
+Usage:
+    ./run_benchmarks.py [--sizes 1000,10000,100000] [--repeat N] [--transcripts N]
+                        [--output report.json] [--work-dir DIR] [--keep]
+    python3 run_benchmarks.py --sizes 1000 --repeat 1
+
+For each vault size a vault is generated with generate_vault.py, then:
+- Primitives are timed in-process: loading ignore patterns, walking the
+  vault, matching every file path against the ignore patterns, scanning
+  every note, resolving every link, and building a VaultIndex (no cache,
+  cold cache and warm cache)
+- Each audit script and run_all.py is timed end to end as a subprocess,
+  once without the cache and once with a warm cache
+
+Every measurement is repeated --repeat times; the report keeps all runs
+plus their minimum and median. The JSON report also records the Python
+version, platform and CPU count so runs on different machines can be
+told apart.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import statistics
+import subprocess
+import tempfile
+import argparse
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+SCRIPTS_DIR = BENCH_DIR.parent / 'scripts'
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from generate_vault import generate_vault
+from vault_utils import (
+    AuditCache,
+    LinkGraph,
+    LinkResolver,
+    SearchIndex,
+    VaultIndex,
+    is_vault_content,
+    load_gitignore_patterns,
+    scan_note,
+    walk_vault,
+)
+
+SCRIPTS = [
+    ('find_broken_links', []),
+    ('find_orphans', []),
+    ('check_frontmatter', ['--strict']),
+    ('detect_moc_bloat', []),
+    ('validate_squeeze_points', []),
+    ('suggest_archival', []),
+    ('find_duplicates', []),
+    ('run_all', []),
+]
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the audit scripts and vault_utils primitives on synthetic vaults.'
+    )
+    parser.add_argument(
+        '--sizes',
+        default='1000,10000,100000',
+        help='Comma-separated vault sizes in notes (default: 1000,10000,100000)'
+    )
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Runs per measurement (default: 3)'
+    )
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=42,
+        help='Seed for the generated vaults (default: 42)'
+    )
+    parser.add_argument(
+        '--transcripts',
+        type=int,
+        default=0,
+        help='Large transcript notes to add to each vault (default: 0)'
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        default=Path('benchmark-report.json'),
+        help='Where to write the JSON report (default: benchmark-report.json)'
+    )
+    parser.add_argument(
+        '--work-dir',
+        type=Path,
+        default=None,
+        help='Directory for generated vaults and caches (default: a temporary directory)'
+    )
+    parser.add_argument(
+        '--keep',
+        action='store_true',
+        help='Keep generated vaults instead of deleting them'
+    )
+    return parser.parse_args()
+
+def measure(func, repeat, setup=None):
+    """Time func() repeat times (after setup(), untimed) and summarize."""
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return {
+        'min': min(runs),
+        'median': statistics.median(runs),
+        'runs': runs,
+    }
+
+def bench_primitives(vault, cache_dir, repeat):
+    """Time the vault_utils building blocks on one vault."""
+    results = {}
+    patterns = load_gitignore_patterns(vault)
+    results['load_gitignore_patterns'] = measure(lambda: load_gitignore_patterns(vault), repeat)
+    results['walk_vault'] = measure(lambda: list(walk_vault(vault, patterns)), repeat)
+
+    # Every file under the vault, noise included, like a naive rglob would see
+    all_files = [
+        Path(dirpath, name)
+        for dirpath, _, filenames in os.walk(vault)
+        for name in filenames
+    ]
+    results['is_vault_content'] = measure(
+        lambda: [is_vault_content(path, vault, patterns) for path in all_files], repeat)
+
+    contents = [path.read_text(encoding='utf-8') for path in walk_vault(vault, patterns)]
+    results['scan_note'] = measure(lambda: [scan_note(content) for content in contents], repeat)
+
+    index = VaultIndex.build(vault, patterns)
+    links = [(note, link.target) for note in index for link in note.links]
+
+    def resolve_all():
+        resolver = LinkResolver(index.notes)
+        for note, target in links:
+            resolver.resolve(target, note)
+
+    results['resolve_links'] = measure(resolve_all, repeat)
+
+    def build_graph():
+        graph = LinkGraph(index.notes, LinkResolver(index.notes))
+        graph.in_sources
+
+    results['link_graph'] = measure(build_graph, repeat)
+    results['index_no_cache'] = measure(lambda: VaultIndex.build(vault, patterns), repeat)
+
+    def clear_cache():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def build_cached():
+        VaultIndex.build(vault, patterns, cache=AuditCache.open(vault, cache_dir))
+
+    results['index_cold_cache'] = measure(build_cached, repeat, setup=clear_cache)
+    results['index_warm_cache'] = measure(build_cached, repeat)
+
+    def update_search():
+        search = SearchIndex.open(vault, cache_dir)
+        search.update(patterns)
+        search.close()
+
+    results['search_index_cold'] = measure(update_search, repeat, setup=clear_cache)
+    results['search_index_update'] = measure(update_search, repeat)
+
+    # A note title, as when checking for an existing note before creating one
+    query = index.notes[len(index) // 2].name
+    search = SearchIndex.open(vault, cache_dir)
+    results['search_query'] = measure(lambda: search.search(query), repeat)
+    search.close()
+
+    counts = {
+        'files': len(all_files),
+        'notes': len(index),
+        'links': len(links),
+        'bytes': sum(len(content.encode('utf-8')) for content in contents),
+    }
+    return results, counts
+
+def bench_scripts(vault, cache_dir, repeat):
+    """Time each audit script end to end, without and with a warm cache."""
+    env = dict(os.environ, IDEAVERSE_CACHE_DIR=str(cache_dir))
+    results = {}
+    for name, extra in SCRIPTS:
+        command = [sys.executable, str(SCRIPTS_DIR / f'{name}.py'), str(vault)] + extra
+
+        def run(*flags):
+            subprocess.run(command + list(flags), env=env, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL)
+
+        run()  # fill the cache
+        results[name] = {
+            'no_cache': measure(lambda: run('--no-cache'), repeat),
+            'warm_cache': measure(run, repeat),
+        }
+    return results
+
+def main():
+    args = get_args()
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    except ValueError:
+        print(f"Error: Invalid --sizes: {args.sizes}", file=sys.stderr)
+        sys.exit(1)
+
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix='ideaverse-bench-'))
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'transcripts': args.transcripts,
+        'sizes': {},
+    }
+
+    try:
+        for size in sizes:
+            vault = work_dir / f'vault-{size}'
+            cache_dir = work_dir / f'cache-{size}'
+            shutil.rmtree(vault, ignore_errors=True)
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+            print(f"[{size}] generating vault...", file=sys.stderr)
+            start = time.perf_counter()
+            generated = generate_vault(vault, notes=size, seed=args.seed,
+                                       transcripts=args.transcripts)
+            generate_s = time.perf_counter() - start
+
+            print(f"[{size}] timing primitives...", file=sys.stderr)
+            primitives, counts = bench_primitives(vault, cache_dir / 'primitives', args.repeat)
+            print(f"[{size}] timing scripts...", file=sys.stderr)
+            scripts = bench_scripts(vault, cache_dir / 'scripts', args.repeat)
+
+            report['sizes'][str(size)] = {
+                'generate_s': generate_s,
+                'generated': generated,
+                'counts': counts,
+                'primitives': primitives,
+                'scripts': scripts,
+            }
+
+            if not args.keep:
+                shutil.rmtree(vault, ignore_errors=True)
+                shutil.rmtree(cache_dir, ignore_errors=True)
+    finally:
+        if not args.keep and args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    args.output.write_text(json.dumps(report, indent=2) + '\n')
+
+    # Short summary: median seconds per measurement
+    for size, data in report['sizes'].items():
+        print(f"\n{size} notes ({data['counts']['links']} links):")
+        for name, timing in data['primitives'].items():
+            print(f"  {name:28} {timing['median']:8.3f}s")
+        for name, timing in data['scripts'].items():
+            print(f"  {name + '.py':28} {timing['no_cache']['median']:8.3f}s "
+                  f"(warm cache {timing['warm_cache']['median']:.3f}s)")
+    print(f"\nReport written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+Serve the vault audits from a warm index over JSON-RPC (stdio or a Unix socket).
+
+Usage:
+    ./audit_server.py [vault_path]                          # JSON-RPC on stdin/stdout
+    ./audit_server.py [vault_path] --socket /tmp/vault.sock # JSON-RPC on a Unix socket
+    ./audit_server.py --socket /tmp/vault.sock --call broken_links [--params '{"suggestions": 3}']
+
+The vault is indexed once at startup. Before each request the server
+checks which notes were added, modified or removed since the last one
+(see VaultMonitor) and re-reads only those, so answers always reflect
+the vault on disk without paying for interpreter startup, pattern
+loading and a full parse on every call. Results are kept until the
+vault changes, so repeated calls are answered from memory.
+
+Requests are JSON-RPC 2.0 objects (or batches), one per line; each
+response is one line. Methods, with their optional params:
+
+- broken_links {suggestions: 3, suggestion_threshold: 0.4}
+- orphans {reachability: false, follow_up: false}
+- frontmatter {strict: false}
+- moc_bloat {threshold: 50}
+- squeeze_points {threshold: 10}
+- archival {days: 180, date_source: "mtime"}
+- backlinks {note}: the notes linking to a note (name or path)
+- status: note count and what the last check found changed
+- shutdown: stop the server
+
+Results are the same records as the scripts' --json output.
+
+--call is a small client for shells: it sends one request to a running
+server's socket and prints the result as JSON, exiting 1 on an error.
+
+This script audits only vault content, excluding:
+- node_modules/ directories (package dependencies)
+- Build artifacts (dist/, build/, .next/, etc.)
+- Version control (.git/, .github/)
+- Other non-vault content matching .gitignore
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import socket
+import inspect
+import threading
+import socketserver
+from pathlib import Path
+from vault_utils import (
+    LiveLinkGraph, TrigramIndex, VaultIndex, VaultMonitor, add_index_args, build_index, git_commit_dates,
+    load_gitignore_patterns,
+)
+import argparse
+
+import check_frontmatter
+import detect_moc_bloat
+import find_broken_links
+import find_orphans
+import suggest_archival
+import validate_squeeze_points
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+AUDIT_ERROR = -32000
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Serve the vault audits from a warm index over JSON-RPC (stdio or a Unix socket).'
+    )
+    parser.add_argument(
+        'vault_path',
+        nargs='?',
+        type=Path,
+        default=Path.cwd(),
+        help='Path to vault (default: current directory)'
+    )
+    parser.add_argument(
+        '--socket',
+        type=Path,
+        default=None,
+        metavar='PATH',
+        help='Listen on (or with --call, connect to) this Unix socket instead of stdio'
+    )
+    parser.add_argument(
+        '--recheck-after',
+        type=float,
+        default=0.0,
+        metavar='SECONDS',
+        help='Check the vault for changes before a request only if the last check is this '
+             'old (default: 0, before every request)'
+    )
+    parser.add_argument(
+        '--call',
+        metavar='METHOD',
+        default=None,
+        help='Send one request to the server on --socket, print its result and exit'
+    )
+    parser.add_argument(
+        '--params',
+        default='{}',
+        metavar='JSON',
+        help='With --call, the request params as a JSON object or array (default: {})'
+    )
+    add_index_args(parser)
+    args = parser.parse_args()
+    if args.since:
+        parser.error("the server covers the whole vault and can't be combined with --since")
+    if args.socket is not None and not hasattr(socket, 'AF_UNIX'):
+        parser.error("Unix sockets aren't available on this platform; use stdio")
+    if args.call and args.socket is None:
+        parser.error("--call needs --socket")
+    return args
+
+class RpcError(Exception):
+    """An error to report to the client as a JSON-RPC error object."""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+# The link audits read the live link graph, so a change costs a few
+# notes' links rather than a new LinkGraph; the per-note audits keep each
+# note's findings and check only the changed notes again (see
+# AuditService.per_note). Records and their order match the scripts'.
+
+def broken_links(service, suggestions=3, suggestion_threshold=0.4):
+    index, links = service.index, service.links
+    broken = sorted((note.rel_path, link) for note in index if not note.error
+                    for link in links.unresolved(note.rel_path))
+    records = [{'source': source, 'link': link} for source, link in broken]
+    if suggestions > 0:
+        suggest = find_broken_links.link_suggester(index, suggestions, suggestion_threshold,
+                                                   names=service.note_names() if broken else None)
+        for record in records:
+            record['suggestions'] = suggest(record['link'])
+    return records
+
+def orphans(service, reachability=False, follow_up=False):
+    index, links = service.index, service.links
+    if reachability:
+        return find_orphans.find_islands(index.vault_root, index, follow_up)
+    found = [(note.name, note.path) for note in index
+             if find_orphans.is_orphan(note, links.in_degree(note.rel_path))]
+    found.sort(key=lambda x: (x[0], str(x[1])))
+    return list(find_orphans.to_records(found, index.vault_root))
+
+def frontmatter(service, strict=False):
+    def audit(index):
+        found = {}
+        for issue in check_frontmatter.iter_frontmatter_issues(index.vault_root, strict, index=index):
+            found.setdefault(issue['path'], []).append(issue)
+        return found
+    
+    found = service.per_note(('frontmatter', strict), audit)
+    return [issue for note in service.index for issue in found.get(note.rel_path, ())]
+
+def moc_bloat(service, threshold=50):
+    def audit(index):
+        mocs = detect_moc_bloat.iter_moc_bloat(index.vault_root, threshold, index=index)
+        return {moc['path']: [moc] for moc in mocs}
+    
+    found = service.per_note(('moc_bloat', threshold), audit)
+    results = [moc for note in service.index for moc in found.get(note.rel_path, ())]
+    results.sort(key=lambda x: x['link_count'], reverse=True)
+    return results
+
+def squeeze_points(service, threshold=10):
+    index, links = service.index, service.links
+    existing_mocs = validate_squeeze_points.find_existing_mocs(index)
+    results = []
+    for note in index:
+        ref_count = links.in_degree(note.rel_path)
+        if not validate_squeeze_points.is_squeeze_candidate(note, ref_count, threshold,
+                                                            existing_mocs):
+            continue
+        # The first ten of the sorted sources (once per link) come from
+        # the ten first distinct ones, so the rest needn't be sorted
+        counts = links.backlinks(note.rel_path)
+        sources = [source for source in heapq.nsmallest(10, counts) for _ in range(counts[source])]
+        results.append({
+            'term': note.name,
+            'reference_count': ref_count,
+            'sources': sources[:10],
+            'total_sources': ref_count
+        })
+    results.sort(key=lambda x: (-x['reference_count'], x['term']))
+    return results
+
+def archival(service, days=180, date_source='mtime'):
+    index = service.index
+    if date_source not in suggest_archival.DATE_SOURCES:
+        raise RpcError(INVALID_PARAMS, f"date_source must be one of {', '.join(suggest_archival.DATE_SOURCES)}")
+    git_dates = None
+    if date_source == 'git':
+        try:
+            git_dates = git_commit_dates(Path(index.vault_root))
+        except RuntimeError as e:
+            raise RpcError(AUDIT_ERROR, f"date_source git: {e}") from None
+    return suggest_archival.suggest_archival(index.vault_root, days, index=index,
+                                             date_source=date_source, git_dates=git_dates)
+
+def backlinks(service, note):
+    """The notes linking to note (a link target: name, path or path with .md)."""
+    target = service.index.resolver.resolve(str(note))
+    if target is None:
+        raise RpcError(AUDIT_ERROR, f"no note matches {note!r}")
+    return {
+        'note': target.rel_path,
+        'backlinks': [
+            {'path': path, 'count': count}
+            for path, count in sorted(service.links.backlinks(target.rel_path).items())
+        ],
+    }
+
+def status(service):
+    return {
+        'vault': str(Path(service.index.vault_root).resolve()),
+        'notes': len(service.index),
+        'last_check': service.last_changes,
+    }
+
+def shutdown(service):
+    service.stopping = True
+    return True
+
+METHODS = {
+    'broken_links': broken_links,
+    'orphans': orphans,
+    'frontmatter': frontmatter,
+    'moc_bloat': moc_bloat,
+    'squeeze_points': squeeze_points,
+    'archival': archival,
+    'backlinks': backlinks,
+    'status': status,
+    'shutdown': shutdown,
+}
+
+# Results that depend on more than the notes (today's date, git history)
+# or on the server itself are never reused
+UNCACHED = {'archival', 'status', 'shutdown'}
+
+# How check_params names the JSON types it expects
+_TYPE_NAMES = {bool: 'a boolean', int: 'an integer', float: 'a number', str: 'a string'}
+
+def check_params(func, params):
+    """
+    Bind request params to a method's arguments and check their types.
+
+    Each argument must have the type of its default (an int is accepted
+    for a float, a bool for nothing else), or be a string if it has none.
+
+    Returns:
+        The params as {argument name: value}
+
+    Raises:
+        RpcError: INVALID_PARAMS if they don't fit the method
+    """
+    signature = inspect.signature(func)
+    try:
+        if isinstance(params, dict):
+            bound = signature.bind(None, **params)
+        else:
+            bound = signature.bind(None, *params)
+    except TypeError as e:
+        raise RpcError(INVALID_PARAMS, str(e)) from None
+    
+    checked = {}
+    for name, value in list(bound.arguments.items())[1:]:
+        default = signature.parameters[name].default
+        expected = str if default is inspect.Parameter.empty else type(default)
+        if expected is float and type(value) is int:
+            value = float(value)
+        elif (expected is not bool and isinstance(value, bool)) or not isinstance(value, expected):
+            raise RpcError(INVALID_PARAMS, f"{name} must be {_TYPE_NAMES[expected]}, "
+                                           f"not {json.dumps(value)}")
+        checked[name] = value
+    return checked
+
+class AuditService:
+    """
+    A warm vault index that answers JSON-RPC requests.
+
+    Thread-safe: requests are handled one at a time.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.stopping = False
+        self.last_changes = {'added': 0, 'modified': 0, 'removed': 0}
+        self._lock = threading.Lock()
+        self._results = {}  # (method, params) -> result, cleared when the vault changes
+        self._findings = {}  # per_note() key -> (audit, {path: findings})
+        self._names = None  # TrigramIndex for suggestions, until notes are added or removed
+        self._load()
+
+    def _load(self):
+        """Index the vault from scratch (through the audit cache)."""
+        # The monitor looks first, so a note saved while indexing shows up
+        # on the next check rather than being missed
+        self.monitor = VaultMonitor(self.args.vault_path, load_gitignore_patterns(self.args.vault_path))
+        self.index = build_index(self.args)
+        self.links = LiveLinkGraph(self.index)
+        self._results.clear()
+        self._findings.clear()
+        self._names = None
+        self._checked = time.monotonic()
+
+    def revalidate(self):
+        """Re-read the notes whose mtime or size changed since the last check."""
+        if time.monotonic() - self._checked < self.args.recheck_after:
+            return
+        if self.monitor.config_changed():
+            self._load()
+            return
+        added, modified, removed = self.monitor.poll()
+        self._checked = time.monotonic()
+        self.last_changes = {'added': len(added), 'modified': len(modified), 'removed': len(removed)}
+        if added or modified or removed:
+            new_notes, modified_notes = self.index.update(added | modified, removed, self.args.jobs)
+            self.links.update(new_notes, modified_notes, removed)
+            self._results.clear()
+            if new_notes or removed:
+                self._names = None
+            
+            # Check the changed notes again, as an index of just those notes
+            notes = new_notes + modified_notes
+            changed = VaultIndex(self.index.vault_root, notes, self.index.ignore_patterns)
+            for audit, found in self._findings.values():
+                for path in removed:
+                    found.pop(path, None)
+                for note in notes:
+                    found.pop(note.rel_path, None)
+                found.update(audit(changed))
+
+    def note_names(self):
+        """TrigramIndex of the note names, for broken link suggestions."""
+        if self._names is None:
+            self._names = TrigramIndex(self.index.notes)
+        return self._names
+
+    def per_note(self, key, audit):
+        """
+        Findings of a per-note audit, kept current as notes change.
+
+        audit(index) returns {path: findings} for the notes of a
+        VaultIndex; it runs over the whole vault on the first call for
+        key, and over just the changed notes after that.
+        """
+        if key not in self._findings:
+            self._findings[key] = (audit, audit(self.index))
+        return self._findings[key][1]
+
+    def call(self, method, params):
+        """Run one method; raises RpcError."""
+        func = METHODS.get(method)
+        if func is None:
+            raise RpcError(METHOD_NOT_FOUND, f"unknown method {method!r}")
+        if params is None:
+            params = {}
+        if not isinstance(params, (dict, list)):
+            raise RpcError(INVALID_PARAMS, "params must be an object or an array")
+        params = check_params(func, params)
+        
+        with self._lock:
+            if method != 'shutdown':
+                self.revalidate()
+            key = (method, json.dumps(params, sort_keys=True))
+            if key in self._results:
+                return self._results[key]
+            result = func(self, **params)
+            if method not in UNCACHED:
+                self._results[key] = result
+            return result
+
+    def handle(self, line):
+        """Answer one line of input; returns the response line, or None for notifications."""
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            return json.dumps(error_response(None, PARSE_ERROR, f"parse error: {e}"))
+        if isinstance(message, list):
+            if not message:
+                return json.dumps(error_response(None, INVALID_REQUEST, "empty batch"))
+            responses = [r for r in (self._respond(m) for m in message) if r is not None]
+            return json.dumps(responses) if responses else None
+        response = self._respond(message)
+        return json.dumps(response) if response is not None else None
+
+    def _respond(self, message):
+        """Response object for one request object (None for a notification)."""
+        if not isinstance(message, dict) or not isinstance(message.get('method'), str):
+            return error_response(None, INVALID_REQUEST, "not a JSON-RPC request")
+        request_id = message.get('id')
+        try:
+            result = self.call(message['method'], message.get('params'))
+        except RpcError as e:
+            response = error_response(request_id, e.code, e.message)
+        except Exception as e:  # a failing audit must not take the server down
+            response = error_response(request_id, AUDIT_ERROR, f"{type(e).__name__}: {e}")
+        else:
+            response = {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+        return response if 'id' in message else None
+
+def error_response(request_id, code, message):
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+def serve_stdio(service):
+    """Answer requests from stdin until EOF or shutdown."""
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        response = service.handle(line)
+        if response is not None:
+            sys.stdout.write(response + '\n')
+            sys.stdout.flush()
+        if service.stopping:
+            break
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """One client connection: newline-delimited requests and responses."""
+
+    def handle(self):
+        service = self.server.service
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = service.handle(line.decode('utf-8', errors='replace'))
+            if response is not None:
+                self.wfile.write(response.encode('utf-8') + b'\n')
+                self.wfile.flush()
+            if service.stopping:
+                threading.Thread(target=self.server.shutdown).start()
+                break
+
+class _SocketServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def open_socket(path):
+    """
+    Listen on a Unix socket, taking over the socket file of a server
+    that is gone (but not of a live one, which exits with an error).
+    """
+    path = str(path)
+    if os.path.exists(path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+        else:
+            print(f"Error: a server is already listening on {path}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            probe.close()
+    return _SocketServer(path, _RequestHandler)
+
+def serve_socket(server, service):
+    """Answer requests on a listening socket until shutdown or Ctrl-C."""
+    server.service = service
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(server.server_address):
+            os.unlink(server.server_address)
+
+def call_server(path, method, params):
+    """Send one request to the server on path; returns its response object."""
+    request = {'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params}
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(str(path))
+        conn.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with conn.makefile('rb') as reply:
+            return json.loads(reply.readline())
+
+def main():
+    args = get_args()
+    
+    if args.call:
+        try:
+            params = json.loads(args.params)
+        except ValueError as e:
+            print(f"Error: --params is not valid JSON: {e}", file=sys.stderr)
+            sys.exit(2)
+        try:
+            response = call_server(args.socket, args.call, params)
+        except (OSError, ValueError) as e:
+            print(f"Error: no answer from a server on {args.socket}: {e}", file=sys.stderr)
+            sys.exit(2)
+        if 'error' in response:
+            print(f"Error: {response['error']['message']}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(response['result'], indent=2))
+        sys.exit(0)
+    
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    # Claim the socket before indexing; clients connecting meanwhile wait
+    server = open_socket(args.socket) if args.socket is not None else None
+    service = AuditService(args)
+    where = args.socket if args.socket is not None else 'stdio'
+    # stdout carries the protocol, so messages go to stderr
+    print(f"Serving {len(service.index)} notes in {args.vault_path} on {where}", file=sys.stderr)
+    if args.stats:
+        service.index.stats.report()
+    
+    try:
+        if server is not None:
+            serve_socket(server, service)
+        else:
+            serve_stdio(service)
+    except KeyboardInterrupt:
+        pass
+    sys.exit(0)
+
+if __name__ == '__main__':
+    main()
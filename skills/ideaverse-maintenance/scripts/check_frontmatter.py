@@ -3,27 +3,59 @@
 Check for missing frontmatter properties in notes.
 
 Usage:
-    ./check_frontmatter.py [vault_path] [--strict] [--json]
+    ./check_frontmatter.py [vault_path] [--strict] [--format text|json|ndjson]
     python3 check_frontmatter.py [vault_path] [--strict] [--json]
+    ./check_frontmatter.py [vault_path] --fix [--dry-run] [--created-from git|birth]
 
 Checks for:
 - Missing 'up:' property (except for Home and root notes)
 - Missing 'created:' date
 - MOCs missing 'in:' property (strict mode)
 
+With --fix, missing 'created' and 'up' properties are filled in (and a
+header is added to notes without one):
+- created: the date of the commit that added the note (git, following
+  renames), or for notes git doesn't know and with --created-from
+  birth, the file's creation time where the platform records it (else
+  its modification time)
+- up: the MOC with the most links to the note, or else the MOC of its
+  folder (or of the nearest parent folder that has one): a MOC named
+  after the folder, or the only MOC in it
+
+Only the header is rewritten; the rest of each file is copied through
+unchanged, and files are replaced atomically, in batches. Each issue
+in the output then says how it was fixed ("fix"), and issues that
+couldn't be fixed remain.
+
 This script audits only vault content, excluding:
 - node_modules/ directories (package dependencies)
 - Build artifacts and documentation files
 - Other non-vault content matching .gitignore
 """
 
+import os
 import re
 import sys
 import json
-from pathlib import Path
-from vault_utils import load_gitignore_patterns, is_vault_content, should_check_frontmatter, ROOT_NOTES
+import shutil
+from collections import Counter
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from vault_utils import (
+    AtomicBatch, VaultIndex, add_index_args, add_output_args, attach_stats, build_index,
+    git_first_commit_dates, write_ndjson, should_check_frontmatter, ROOT_NOTES, FRONTMATTER_CHUNK_SIZE,
+)
 import argparse
 
+from detect_moc_bloat import is_moc
+
+# Notes written per AtomicBatch commit with --fix
+FIX_BATCH = 256
+
+# The 'up:' key (whatever follows it on the line) and any list items
+# under it; --fix replaces it only when it holds no parent
+_UP_BLOCK_RE = re.compile(rb'^up:[^\n]*\n?(?:[ \t]*-[^\n]*\n?)*', re.MULTILINE)
+
 def get_args():
     parser = argparse.ArgumentParser(
         description='Check for missing frontmatter properties in notes.'
@@ -40,148 +72,318 @@ def get_args():
         action='store_true',
         help='Check MOCs for required "in" property'
     )
-    parser.add_argument(
-        '--json',
+    group = parser.add_argument_group('fix options')
+    group.add_argument(
+        '--fix',
         action='store_true',
-        dest='json_output',
-        help='Output results as JSON'
+        help="Fill in missing 'created' and 'up' properties"
+    )
+    group.add_argument(
+        '--created-from',
+        choices=('git', 'birth'),
+        default='git',
+        help="Where 'created' dates come from: the commit that added the note, falling back "
+             "to the file's creation time, or always the file's creation time (default: git)"
     )
-    return parser.parse_args()
+    group.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='With --fix, report the fixes without changing any file'
+    )
+    add_output_args(parser)
+    add_index_args(parser)
+    args = parser.parse_args()
+    if args.dry_run and not args.fix:
+        parser.error("--dry-run needs --fix")
+    if args.fix and args.since:
+        parser.error("--fix looks for each note's MOC across the vault and can't be combined with --since")
+    return args
 
-def parse_frontmatter(content):
-    """Extract YAML frontmatter as dict."""
-    if not content.startswith('---'):
-        return None
-    
-    parts = content.split('---', 2)
-    if len(parts) < 3:
-        return None
-    
-    yaml_text = parts[1].strip()
-    if not yaml_text:
-        return {}
-    
-    # Simple YAML parsing (no dependencies)
-    props = {}
-    current_key = None
-    current_list = None
+def needs_up(note):
+    """True unless the note is a root note or a daily log, which have no parent."""
+    is_daily = 'Calendar' in note.rel_path and re.match(r'\d{4}-\d{2}-\d{2}', note.name)
+    return note.name not in ROOT_NOTES and not is_daily
+
+def iter_frontmatter_issues(vault_path, strict=False, index=None):
+    """Yield frontmatter issues as they are found, in vault walk order."""
+    vault = Path(vault_path)
+    if index is None:
+        index = VaultIndex.build(vault, header_only=True)
     
-    for line in yaml_text.split('\n'):
-        line = line.rstrip()
-        if not line:
+    for note in index:
+        # With --since, only changed notes are checked
+        if not index.is_changed(note):
             continue
         
-        # Check for list item
-        if line.startswith('  - '):
-            if current_key and current_list is not None:
-                current_list.append(line[4:].strip().strip('"'))
+        # Skip library files that don't need frontmatter
+        if not should_check_frontmatter(note.path, vault):
             continue
         
-        # Check for key: value or key:
-        match = re.match(r'^(\w+):\s*(.*)', line)
-        if match:
-            current_key = match.group(1)
-            value = match.group(2).strip()
-            
-            if value == '' or value == '[]':
-                props[current_key] = []
-                current_list = props[current_key]
-            elif value.startswith('[') and value.endswith(']'):
-                # Inline array
-                props[current_key] = [v.strip().strip('"') for v in value[1:-1].split(',') if v.strip()]
-                current_list = None
-            else:
-                props[current_key] = value.strip('"')
-                current_list = None
-    
-    return props
-
-def check_frontmatter(vault_path, strict=False):
-    vault = Path(vault_path)
-    ignore_patterns = load_gitignore_patterns(vault)
-    issues = []
-    
-    for md_file in vault.rglob('*.md'):
-        if not is_vault_content(md_file, vault, ignore_patterns):
+        rel_path = note.rel_path
+        
+        if note.error:
+            yield {
+                'path': rel_path,
+                'issue': f'read error: {note.error}',
+                'severity': 'error'
+            }
             continue
         
-        # Skip library files that don't need frontmatter
-        if not should_check_frontmatter(md_file, vault):
+        props = note.frontmatter
+        
+        # Check: No frontmatter at all
+        if props is None:
+            yield {
+                'path': rel_path,
+                'issue': 'missing frontmatter',
+                'severity': 'error'
+            }
             continue
         
-        try:
-            content = md_file.read_text(encoding='utf-8')
-            props = parse_frontmatter(content)
-            rel_path = str(md_file.relative_to(vault_path))
-            note_name = md_file.stem
-            
-            # Check: No frontmatter at all
-            if props is None:
-                issues.append({
-                    'path': rel_path,
-                    'issue': 'missing frontmatter',
-                    'severity': 'error'
-                })
-                continue
-            
-            # Check: Missing 'created' date
-            if 'created' not in props:
-                issues.append({
+        # Check: Missing 'created' date
+        if 'created' not in props:
+            yield {
+                'path': rel_path,
+                'issue': "missing 'created' date",
+                'severity': 'warning'
+            }
+        
+        # Check: Missing 'up' property (except root notes and daily logs)
+        if needs_up(note):
+            up_val = props.get('up', [])
+            if not up_val or (isinstance(up_val, list) and len(up_val) == 0):
+                yield {
                     'path': rel_path,
-                    'issue': "missing 'created' date",
+                    'issue': "missing 'up' property",
                     'severity': 'warning'
-                })
-            
-            # Check: Missing 'up' property (except root notes and daily logs)
-            is_root = note_name in ROOT_NOTES
-            is_daily = 'Calendar' in rel_path and re.match(r'\d{4}-\d{2}-\d{2}', note_name)
-            
-            if not is_root and not is_daily:
-                up_val = props.get('up', [])
-                if not up_val or (isinstance(up_val, list) and len(up_val) == 0):
-                    issues.append({
-                        'path': rel_path,
-                        'issue': "missing 'up' property",
-                        'severity': 'warning'
-                    })
-            
-            # Check: MOCs should have 'in' property (strict mode)
-            if strict:
-                is_moc = 'MOC' in note_name or 'Map' in note_name or 'Maps' in rel_path
-                if is_moc:
-                    in_val = props.get('in', [])
-                    if not in_val or (isinstance(in_val, list) and len(in_val) == 0):
-                        issues.append({
-                            'path': rel_path,
-                            'issue': "MOC missing 'in' property",
-                            'severity': 'info'
-                        })
+                }
         
-        except (IOError, OSError, UnicodeDecodeError) as e:
-            issues.append({
-                'path': str(md_file.relative_to(vault_path)),
-                'issue': f'read error: {e}',
-                'severity': 'error'
-            })
-    
-    return issues
+        # Check: MOCs should have 'in' property (strict mode)
+        if strict:
+            if is_moc(note):
+                in_val = props.get('in', [])
+                if not in_val or (isinstance(in_val, list) and len(in_val) == 0):
+                    yield {
+                        'path': rel_path,
+                        'issue': "MOC missing 'in' property",
+                        'severity': 'info'
+                    }
 
-def main():
-    args = get_args()
+def check_frontmatter(vault_path, strict=False, index=None):
+    return list(iter_frontmatter_issues(vault_path, strict, index))
+
+def created_dates(vault_path, created_from):
+    """Map note paths to the time git first committed them ({} if not wanted or unavailable)."""
+    if created_from != 'git':
+        return {}
+    try:
+        return git_first_commit_dates(Path(vault_path))
+    except RuntimeError as e:
+        print(f"Note: no git history ({e}); 'created' comes from file times", file=sys.stderr)
+        return {}
+
+def birth_time(path):
+    """(timestamp, source) for when a file was created, or last modified where that isn't recorded."""
+    st = os.stat(path)
+    birth = getattr(st, 'st_birthtime', None)
+    if birth:
+        return birth, 'birth time'
+    return st.st_mtime, 'mtime'
+
+def up_finder(index):
+    """
+    Return a function picking the parent MOC for a note missing 'up'.
+
+    It maps a note to (link, source) or None, where link is the
+    [[wikilink]] to write and source says how the MOC was chosen:
+    'linking MOC' for the MOC with the most links to the note (then
+    the first by path), 'folder MOC' for the MOC of the note's folder or
+    the nearest parent folder that has one (a MOC named after the folder,
+    or the folder's only MOC).
+    """
+    graph = index.graph
+    mocs = [is_moc(note) for note in graph.notes]
+    by_folder = {}
+    for note, moc in zip(graph.notes, mocs):
+        if moc:
+            by_folder.setdefault(PurePosixPath(note.rel_path).parent, []).append(note)
     
-    if not args.vault_path.exists():
-        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
-        sys.exit(1)
+    def link(moc):
+        # The bare name, unless other notes share it
+        text = moc.name
+        if index.resolver.is_ambiguous(text):
+            text = PurePosixPath(moc.rel_path).with_suffix('').as_posix()
+        return f'[[{text}]]'
     
-    issues = check_frontmatter(args.vault_path, args.strict)
+    def folder_moc(folder, note):
+        candidates = [moc for moc in by_folder.get(folder, ()) if moc is not note]
+        names = {folder.name.lower(), f'{folder.name} moc'.lower(), f'{folder.name} map'.lower()}
+        named = [moc for moc in candidates if moc.name.lower() in names]
+        if named:
+            return named[0]
+        return candidates[0] if len(candidates) == 1 else None
     
-    if args.json_output:
-        print(json.dumps(issues, indent=2))
-        sys.exit(1 if issues else 0)
+    def find(note):
+        i = graph.node(note)
+        counts = Counter(j for j in graph.in_neighbors(i) if mocs[j])
+        if counts:
+            best = min(counts, key=lambda j: (-counts[j], graph.notes[j].rel_path))
+            return link(graph.notes[best]), 'linking MOC'
+        for folder in PurePosixPath(note.rel_path).parents:
+            if folder == PurePosixPath('.'):
+                break  # notes at the top level have no folder MOC
+            moc = folder_moc(folder, note)
+            if moc is not None:
+                return link(moc), 'folder MOC'
+        return None
+    
+    return find
+
+def plan_fixes(index, issues, created_from='git'):
+    """
+    Work out the fix for each issue --fix can handle.
+
+    Adds 'fix' to every issue: a list of {'property', 'value', 'source'}
+    to set (empty if it can't be fixed). A note given a header but no
+    'up' gets a "missing 'up' property" issue of its own, appended to
+    issues, as checking it again would find.
+
+    Returns:
+        {path: [(property, value)]} for every note to rewrite
+    """
+    notes = {note.rel_path: note for note in index}
+    dates = created_dates(index.vault_root, created_from)
+    find_up = None  # the link graph is only built if a note needs 'up'
+    fixes = {}
+    unfixed = []
+    for issue in issues:
+        issue['fix'] = []
+        note = notes[issue['path']]
+        wanted = []
+        if issue['issue'] in ("missing 'created' date", 'missing frontmatter'):
+            wanted.append('created')
+        if issue['issue'] == "missing 'up' property" or (issue['issue'] == 'missing frontmatter'
+                                                         and needs_up(note)):
+            wanted.append('up')
+        for prop in wanted:
+            if prop == 'created':
+                timestamp, source = dates.get(note.rel_path), 'git'
+                if timestamp is None:
+                    timestamp, source = birth_time(note.path)
+                value = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+            else:
+                if find_up is None:
+                    find_up = up_finder(index)
+                found = find_up(note)
+                if found is None:
+                    if issue['issue'] == 'missing frontmatter':
+                        unfixed.append({'path': note.rel_path, 'issue': "missing 'up' property",
+                                        'severity': 'warning', 'fix': []})
+                    continue
+                value, source = found
+            issue['fix'].append({'property': prop, 'value': value, 'source': source})
+            fixes.setdefault(note.rel_path, []).append((prop, value))
+    issues.extend(unfixed)
+    return fixes
+
+def fixed_header(header, props, newline):
+    """
+    The new header bytes for a note.
+
+    Args:
+        header: The note's header up to and including the closing '---',
+            or None if it has none
+        props: (property, value) pairs to add
+        newline: The note's line ending
+    """
+    lines = []
+    for prop, value in props:
+        if prop == 'up':
+            lines += [b'up:', b'  - "' + value.encode('utf-8') + b'"']
+        else:
+            lines.append(prop.encode('utf-8') + b': ' + value.encode('utf-8'))
+    added = newline.join(lines) + newline
+    if header is None:
+        return b'---' + newline + added + b'---' + newline
     
+    yaml = header[3:-3]
+    if any(prop == 'up' for prop, _ in props):
+        yaml = _UP_BLOCK_RE.sub(b'', yaml)
+    if not yaml.endswith(b'\n'):
+        yaml += newline
+    return b'---' + yaml + added + b'---'
+
+def rewrite_header(batch, note, props):
+    """
+    Stage a note with props added to its header in batch.
+
+    Only the header is read into memory; the rest of the file is copied
+    through unchanged. Returns False, staging nothing, if the file
+    changed since it was indexed.
+    """
+    with open(note.path, 'rb') as src:
+        st = os.fstat(src.fileno())
+        if st.st_mtime != note.mtime or st.st_size != note.size:
+            return False
+        buf = src.read(FRONTMATTER_CHUNK_SIZE)
+        header = None
+        if note.frontmatter is not None:
+            # The closing '---', found the way parse_frontmatter() finds it
+            end = buf.find(b'---', 3)
+            while end == -1:
+                chunk = src.read(FRONTMATTER_CHUNK_SIZE)
+                if not chunk:
+                    return False
+                # It may straddle the chunk boundary
+                search_from = max(3, len(buf) - 2)
+                buf += chunk
+                end = buf.find(b'---', search_from)
+            header, buf = buf[:end + 3], buf[end + 3:]
+        newline = b'\r\n' if b'\r\n' in (header or buf) else b'\n'
+        with batch.open(note.path) as dst:
+            dst.write(fixed_header(header, props, newline))
+            dst.write(buf)
+            shutil.copyfileobj(src, dst)
+    return True
+
+def apply_fixes(index, fixes):
+    """
+    Rewrite the headers of the notes in fixes, FIX_BATCH notes at a time.
+
+    Returns:
+        Paths of the notes skipped because they changed since indexing
+
+    Raises:
+        OSError: if a note can't be written; earlier batches are kept
+    """
+    notes = {note.rel_path: note for note in index}
+    skipped = []
+    paths = sorted(fixes)
+    for start in range(0, len(paths), FIX_BATCH):
+        with AtomicBatch() as batch:
+            for path in paths[start:start + FIX_BATCH]:
+                if not rewrite_header(batch, notes[path], fixes[path]):
+                    skipped.append(path)
+    return skipped
+
+def print_fixes(issues, dry_run):
+    """Print how many issues were (or would be) fixed, by property and source."""
+    fixed = [issue for issue in issues if issue['fix']]
+    files = len({issue['path'] for issue in fixed})
+    if dry_run:
+        print(f"Would fix {len(fixed)} issue(s) in {files} file(s) (dry run, nothing changed):")
+    else:
+        print(f"Fixed {len(fixed)} issue(s) in {files} file(s):")
+    counts = Counter((fix['property'], fix['source']) for issue in fixed for fix in issue['fix'])
+    for (prop, source), count in sorted(counts.items()):
+        print(f"  {prop} from {source}: {count}")
+    print()
+
+def print_report(issues):
+    """Print issues grouped by type. Returns the exit code."""
     if not issues:
         print("All notes have required frontmatter properties.")
-        sys.exit(0)
+        return 0
     
     # Group by issue type
     by_issue = {}
@@ -200,7 +402,76 @@ def main():
             print(f"    ... and {len(paths) - 10} more")
         print()
     
-    sys.exit(1 if issues else 0)
+    return 1
+
+def fix(args):
+    """Fix what can be fixed, report every issue with its fix, and exit."""
+    # Finding MOCs that link to a note needs every note's links
+    index = build_index(args)
+    with index.stats.phase('analysis'):
+        issues = check_frontmatter(args.vault_path, args.strict, index=index)
+        fixes = plan_fixes(index, issues, args.created_from)
+    
+    if not args.dry_run:
+        try:
+            skipped = apply_fixes(index, fixes)
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(2)
+        for path in skipped:
+            print(f"Skipped {path}: changed while being fixed; run again", file=sys.stderr)
+            for issue in issues:
+                if issue['path'] == path:
+                    issue['fix'] = []
+    
+    remaining = [issue for issue in issues if not issue['fix']]
+    if args.format == 'ndjson':
+        write_ndjson(issues, group_by=('severity', lambda issue: issue['severity']),
+                     stats=index.stats if args.stats else None)
+    elif args.format == 'json':
+        print(json.dumps(attach_stats(issues, index.stats) if args.stats else issues, indent=2))
+    else:
+        print_fixes(issues, args.dry_run)
+        if remaining:
+            print_report(remaining)
+        if args.stats:
+            index.stats.report()
+    sys.exit(1 if remaining else 0)
+
+def main():
+    args = get_args()
+    
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.fix:
+        fix(args)
+    
+    # Only headers are needed, so notes not in the cache are read header-only
+    index = build_index(args, header_only=True)
+    
+    if args.format == 'ndjson':
+        # Issues come out in walk order either way, so --sort changes nothing
+        with index.stats.phase('analysis'):
+            summary = write_ndjson(
+                iter_frontmatter_issues(args.vault_path, args.strict, index=index),
+                group_by=('severity', lambda issue: issue['severity']),
+                stats=index.stats if args.stats else None,
+            )
+        sys.exit(1 if summary['count'] else 0)
+    
+    with index.stats.phase('analysis'):
+        issues = check_frontmatter(args.vault_path, args.strict, index=index)
+    
+    if args.format == 'json':
+        print(json.dumps(attach_stats(issues, index.stats) if args.stats else issues, indent=2))
+        sys.exit(1 if issues else 0)
+    
+    exit_code = print_report(issues)
+    if args.stats:
+        index.stats.report()
+    sys.exit(exit_code)
 
 if __name__ == '__main__':
     main()
@@ -3,26 +3,40 @@
 Detect MOC bloat - find Maps of Content with too many direct links.
 
 Usage:
-    ./detect_moc_bloat.py [vault_path] [--threshold N] [--json]
+    ./detect_moc_bloat.py [vault_path] [--threshold N] [--format text|json|ndjson]
     python3 detect_moc_bloat.py [vault_path] [--threshold N] [--json]
 
 MOCs with 50+ links are considered bloated and should be split.
 Default threshold: 50 (warning at 40)
 
+With --suggest-splits, each MOC reported is also given a proposed
+split into child MOCs. Its linked notes are clustered (Louvain
+modularity) by their links to each other and the notes they link to
+in common, and each cluster of MIN_SPLIT or more notes is proposed as
+a child MOC, titled after its most central note. Notes that fit no
+cluster stay in the MOC.
+
 This script audits only vault content, excluding:
 - node_modules/ directories (package dependencies)
 - Build artifacts and documentation files
 - Other non-vault content matching .gitignore
 """
 
-import os
-import re
 import sys
 import json
+from collections import defaultdict, deque
 from pathlib import Path
-from vault_utils import load_gitignore_patterns, is_vault_content, extract_wikilinks_set
+from vault_utils import (
+    VaultIndex, add_index_args, add_output_args, attach_stats, build_index, write_ndjson,
+)
 import argparse
 
+# Smallest cluster proposed as a child MOC with --suggest-splits
+MIN_SPLIT = 3
+
+# Member notes listed per proposed child MOC in text output
+SHOW_NOTES = 5
+
 def get_args():
     parser = argparse.ArgumentParser(
         description='Detect MOC bloat - find Maps of Content with too many direct links.'
@@ -41,103 +55,305 @@ def get_args():
         help='Link count to consider bloated (default: 50)'
     )
     parser.add_argument(
-        '--json',
+        '--suggest-splits',
         action='store_true',
-        dest='json_output',
-        help='Output results as JSON'
+        help='Propose child MOCs for each MOC reported, from clusters of the notes it links to'
     )
+    add_output_args(parser)
+    add_index_args(parser)
     return parser.parse_args()
 
-def is_moc(file_path, content):
+def is_moc(note):
     """Determine if a note is a Map of Content."""
-    name = file_path.stem
+    name = note.name
     
     # Check name patterns
     if 'MOC' in name or name.endswith(' Map'):
         return True
     
-    # Check if it's in a Maps folder
-    if 'Maps' in str(file_path):
+    # Check if it's in a Maps folder (within the vault; the folders the
+    # vault itself sits in don't count)
+    if 'Maps' in Path(note.rel_path).parent.parts:
         return True
     
     # Check frontmatter for 'in: [[Maps]]' pattern
-    if re.search(r'in:\s*\n\s*-\s*["\']?\[\[Maps\]\]["\']?', content):
-        return True
+    return note.in_maps
+
+def neighborhood(graph, moc):
+    """
+    The weighted graph of the notes a MOC links to.
+
+    Two notes are tied by each link between them (weight 1 per
+    direction) and by each note both link to (weight 1/(n-1) for a note
+    linked from n members, so every shared note adds about as much in
+    total as one link per member). Links back to the MOC, and notes more
+    than half the members link to, say nothing about how to split it
+    and are left out.
+
+    Args:
+        graph: The vault's LinkGraph
+        moc: Node number of the MOC
+
+    Returns:
+        (members, adjacency): the members' node numbers in ascending
+        order, and for each member {member position: weight}, symmetric
+    """
+    members = sorted(set(graph.out_neighbors(moc)) - {moc})
+    position = {j: k for k, j in enumerate(members)}
+    adjacency = [defaultdict(float) for _ in members]
+    linkers = defaultdict(list)
+    for k, j in enumerate(members):
+        for target in set(graph.out_neighbors(j)):
+            if target == moc:
+                continue
+            other = position.get(target)
+            if other is not None:
+                adjacency[k][other] += 1
+                adjacency[other][k] += 1
+            linkers[target].append(k)
+    
+    for shared in linkers.values():
+        if not 1 < len(shared) <= len(members) / 2:
+            continue
+        weight = 1 / (len(shared) - 1)
+        for a in shared:
+            row = adjacency[a]
+            for b in shared:
+                if a != b:
+                    row[b] += weight
+    return members, adjacency
+
+def _louvain_level(adjacency, resolution=1.0):
+    """
+    Move nodes between communities while modularity improves.
+
+    Nodes are visited in order, then only the neighbors of nodes that
+    moved are visited again, until none moves.
+
+    Args:
+        adjacency: For each node, {node: weight}, symmetric; self-loops
+            hold the weight inside an aggregated node
+
+    Returns:
+        (moved, community of each node)
+    """
+    degree = [sum(row.values()) for row in adjacency]
+    total_weight = sum(degree)
+    labels = list(range(len(adjacency)))
+    totals = degree[:]
+    moved = False
+    queue = deque(range(len(adjacency)))
+    queued = [True] * len(adjacency)
+    while queue:
+        i = queue.popleft()
+        queued[i] = False
+        current = labels[i]
+        weights = defaultdict(float)
+        for j, weight in adjacency[i].items():
+            if j != i:
+                weights[labels[j]] += weight
+        totals[current] -= degree[i]
+        # Gain of joining community c, up to terms that don't depend on c
+        scale = resolution * degree[i] / total_weight
+        best, best_gain = current, weights.get(current, 0.0) - scale * totals[current]
+        for c, weight in weights.items():
+            gain = weight - scale * totals[c]
+            if gain > best_gain + 1e-9:
+                best, best_gain = c, gain
+        totals[best] += degree[i]
+        if best != current:
+            labels[i] = best
+            moved = True
+            for j in adjacency[i]:
+                if not queued[j] and labels[j] != best:
+                    queue.append(j)
+                    queued[j] = True
+    return moved, labels
+
+def louvain(adjacency, resolution=1.0):
+    """
+    Cluster a weighted graph by Louvain modularity optimisation.
+
+    Alternates moving single nodes between communities and merging each
+    community into one node, until no move improves modularity. Runs in
+    roughly linear time in the number of edges, and visits nodes in
+    order, so the result is deterministic.
+
+    Args:
+        adjacency: For each node, {node: weight}, symmetric, no self-loops
+        resolution: Above 1 favours more, smaller communities
+
+    Returns:
+        Communities as lists of nodes, each in ascending order
+    """
+    communities = [[i] for i in range(len(adjacency))]
+    if not any(adjacency):
+        return communities
     
-    return False
+    while True:
+        moved, labels = _louvain_level(adjacency, resolution)
+        if not moved:
+            return communities
+        number = {}
+        for label in labels:
+            number.setdefault(label, len(number))
+        merged = [[] for _ in number]
+        aggregated = [defaultdict(float) for _ in number]
+        for i, row in enumerate(adjacency):
+            c = number[labels[i]]
+            merged[c].extend(communities[i])
+            for j, weight in row.items():
+                aggregated[c][number[labels[j]]] += weight
+        communities = [sorted(members) for members in merged]
+        adjacency = aggregated
+
+def suggest_splits(graph, moc):
+    """
+    Propose child MOCs for a MOC from clusters of the notes it links to.
 
-def detect_moc_bloat(vault_path, threshold):
+    Returns:
+        (splits, remaining): a record per proposed child MOC, largest
+        first, with its 'title', the 'hub' it is named after (its most
+        central note: most weight to the rest of the cluster, then most
+        links in from the vault) and its member 'notes', hub first; and
+        the paths of the notes left in the MOC
+    """
+    members, adjacency = neighborhood(graph, moc)
+    splits = []
+    remaining = []
+    for community in louvain(adjacency):
+        paths = [graph.notes[members[k]].rel_path for k in community]
+        if len(community) < MIN_SPLIT or len(community) == len(members):
+            remaining.extend(paths)
+            continue
+        inside = set(community)
+        centrality = {k: sum(w for j, w in adjacency[k].items() if j in inside) for k in community}
+        order = sorted(range(len(community)), key=lambda n: (
+            -centrality[community[n]], -graph.in_degree(members[community[n]]), paths[n]))
+        hub = graph.notes[members[community[order[0]]]]
+        title = hub.name if is_moc(hub) else f'{hub.name} MOC'
+        splits.append({'title': title, 'hub': hub.rel_path, 'notes': [paths[n] for n in order]})
+    splits.sort(key=lambda split: (-len(split['notes']), split['title']))
+    return splits, sorted(remaining)
+
+def iter_moc_bloat(vault_path, threshold, index=None, splits=False):
+    """Yield bloated and near-bloated MOCs as they are found (with proposed splits if asked)."""
     vault = Path(vault_path)
-    ignore_patterns = load_gitignore_patterns(vault)
+    if index is None:
+        index = VaultIndex.build(vault)
     warning_threshold = int(threshold * 0.8)
-    results = []
     
-    for md_file in vault.rglob('*.md'):
-        if not is_vault_content(md_file, vault, ignore_patterns):
+    for note in index:
+        if not index.is_changed(note):
             continue
         
-        try:
-            content = md_file.read_text(encoding='utf-8')
-            
-            if not is_moc(md_file, content):
-                continue
-            
-            links = extract_wikilinks_set(content)
-            link_count = len(links)
-            
-            if link_count >= warning_threshold:
-                rel_path = md_file.relative_to(vault_path)
-                status = 'bloated' if link_count >= threshold else 'warning'
-                results.append({
-                    'path': str(rel_path),
-                    'name': md_file.stem,
-                    'link_count': link_count,
-                    'status': status
-                })
+        if note.error:
+            print(f"Error reading {note.path}: {note.error}", file=sys.stderr)
+            continue
+        
+        if not is_moc(note):
+            continue
         
-        except (IOError, OSError, UnicodeDecodeError) as e:
-            print(f"Error reading {md_file}: {e}", file=sys.stderr)
+        link_count = len({link.text for link in note.links})
+        
+        if link_count >= warning_threshold:
+            status = 'bloated' if link_count >= threshold else 'warning'
+            result = {
+                'path': note.rel_path,
+                'name': note.name,
+                'link_count': link_count,
+                'status': status
+            }
+            if splits:
+                result['splits'], result['remaining'] = suggest_splits(index.graph,
+                                                                       index.graph.node(note))
+            yield result
+
+def detect_moc_bloat(vault_path, threshold, index=None, splits=False):
+    results = list(iter_moc_bloat(vault_path, threshold, index, splits))
     
     # Sort by link count descending
     results.sort(key=lambda x: x['link_count'], reverse=True)
     return results
 
-def main():
-    args = get_args()
-    
-    if not args.vault_path.exists():
-        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
-        sys.exit(1)
-    
-    results = detect_moc_bloat(args.vault_path, args.threshold)
-    
-    if args.json_output:
-        print(json.dumps(results, indent=2))
-        sys.exit(1 if any(r['status'] == 'bloated' for r in results) else 0)
+def print_splits(result):
+    """Print the child MOCs proposed for a MOC."""
+    splits = result['splits']
+    if not splits:
+        print("    No clear clusters among its notes to split off.")
+        return
     
+    print(f"    Suggested split: {len(splits)} child MOC(s), "
+          f"{len(result['remaining'])} note(s) staying:")
+    for split in splits:
+        notes = split['notes']
+        names = ', '.join(Path(path).stem for path in notes[:SHOW_NOTES])
+        more = f", ... and {len(notes) - SHOW_NOTES} more" if len(notes) > SHOW_NOTES else ''
+        print(f"      - {split['title']} ({len(notes)} notes): {names}{more}")
+
+def print_report(results, threshold):
+    """Print bloated and warning MOCs. Returns the exit code."""
     if not results:
-        print(f"No MOC bloat detected (threshold: {args.threshold} links).")
-        sys.exit(0)
+        print(f"No MOC bloat detected (threshold: {threshold} links).")
+        return 0
     
     bloated = [r for r in results if r['status'] == 'bloated']
     warnings = [r for r in results if r['status'] == 'warning']
     
     if bloated:
-        print(f"🔴 BLOATED MOCs (>= {args.threshold} links):\n")
+        print(f"🔴 BLOATED MOCs (>= {threshold} links):\n")
         for r in bloated:
             print(f"  {r['path']}: {r['link_count']} links")
+            if 'splits' in r:
+                print_splits(r)
         print()
     
     if warnings:
-        warning_threshold = int(args.threshold * 0.8)
+        warning_threshold = int(threshold * 0.8)
         print(f"🟡 Warning (>= {warning_threshold} links):\n")
         for r in warnings:
             print(f"  {r['path']}: {r['link_count']} links")
+            if 'splits' in r:
+                print_splits(r)
         print()
     
     print("Recommendation: Split bloated MOCs into focused child MOCs.")
     
-    sys.exit(1 if bloated else 0)
+    return 1 if bloated else 0
+
+def main():
+    args = get_args()
+    
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    index = build_index(args)
+    
+    if args.format == 'ndjson':
+        with index.stats.phase('analysis'):
+            if args.sort:
+                results = detect_moc_bloat(args.vault_path, args.threshold, index=index,
+                                           splits=args.suggest_splits)
+            else:
+                results = iter_moc_bloat(args.vault_path, args.threshold, index=index,
+                                         splits=args.suggest_splits)
+            summary = write_ndjson(results, group_by=('status', lambda r: r['status']),
+                                   stats=index.stats if args.stats else None)
+        sys.exit(1 if summary['by_status'].get('bloated') else 0)
+    
+    with index.stats.phase('analysis'):
+        results = detect_moc_bloat(args.vault_path, args.threshold, index=index,
+                                   splits=args.suggest_splits)
+    
+    if args.format == 'json':
+        print(json.dumps(attach_stats(results, index.stats) if args.stats else results, indent=2))
+        sys.exit(1 if any(r['status'] == 'bloated' for r in results) else 0)
+    
+    exit_code = print_report(results, args.threshold)
+    if args.stats:
+        index.stats.report()
+    sys.exit(exit_code)
 
 if __name__ == '__main__':
     main()
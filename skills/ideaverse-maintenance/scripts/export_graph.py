@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Export the resolved vault link graph to a SQLite snapshot file.
+
+Usage:
+    ./export_graph.py [vault_path] --output graph.sqlite
+    python3 export_graph.py [vault_path] -o graph.sqlite [--jobs N]
+
+Other tools (dashboards, agents, later audit runs) can query the
+snapshot instead of re-parsing the vault. It holds:
+
+- notes(id, path, name, size, mtime, content_hash, error): one row per
+  note; content_hash is the SHA-256 hex digest of the file's bytes, so
+  consumers can tell which notes changed since the export
+- links(source, target, count): resolved wikilinks between notes (by id),
+  with how often source links to target; self-links are left out
+- unresolved(source, link, count): broken links, by link text
+- properties(source, key, link, target): wikilinks in the up: and in:
+  frontmatter properties; target is NULL if the link is broken
+- meta(key, value): format version, vault path, export time and totals
+
+Note ids are numbered in vault walk order and are only stable within one
+snapshot. The file is written to a temporary path and moved into place,
+so readers never see a half-written snapshot.
+
+This script covers only vault content, excluding:
+- node_modules/ directories (package dependencies)
+- Build artifacts (dist/, build/, .next/, etc.)
+- Version control (.git/, .github/)
+- Other non-vault content matching .gitignore
+"""
+
+import os
+import sys
+import sqlite3
+import time
+from collections import Counter
+from pathlib import Path
+from vault_utils import add_index_args, build_index
+import argparse
+
+# Bump when the tables change incompatibly
+FORMAT_VERSION = 1
+
+# Frontmatter properties exported as parent/collection edges
+EDGE_PROPERTIES = ('up', 'in')
+
+GRAPH_SCHEMA = '''
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+CREATE TABLE notes (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    content_hash TEXT,
+    error TEXT
+);
+CREATE TABLE links (
+    source INTEGER NOT NULL,
+    target INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (source, target)
+) WITHOUT ROWID;
+CREATE TABLE unresolved (
+    source INTEGER NOT NULL,
+    link TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (source, link)
+) WITHOUT ROWID;
+CREATE TABLE properties (
+    source INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    link TEXT NOT NULL,
+    target INTEGER,
+    PRIMARY KEY (source, key, link)
+) WITHOUT ROWID;
+CREATE INDEX notes_name ON notes (name);
+CREATE INDEX links_target ON links (target, source);
+CREATE INDEX properties_target ON properties (target);
+'''
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Export the resolved vault link graph to a SQLite snapshot file.'
+    )
+    parser.add_argument(
+        'vault_path',
+        nargs='?',
+        type=Path,
+        default=Path.cwd(),
+        help='Path to vault (default: current directory)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        type=Path,
+        required=True,
+        help='Snapshot file to write (replaced if it exists)'
+    )
+    add_index_args(parser)
+    args = parser.parse_args()
+    if args.since:
+        parser.error("the graph snapshot covers the whole vault and can't be combined with --since")
+    return args
+
+def note_rows(graph):
+    for i, note in enumerate(graph.notes):
+        yield i, note.rel_path, note.name, note.size, note.mtime, note.content_hash, note.error
+
+def link_rows(graph):
+    for i in range(len(graph)):
+        for target, count in sorted(Counter(graph.out_neighbors(i)).items()):
+            yield i, target, count
+
+def unresolved_rows(graph):
+    for i in range(len(graph)):
+        for link, count in sorted(Counter(graph.unresolved(i)).items()):
+            yield i, link, count
+
+def property_rows(index):
+    graph = index.graph
+    for i, note in enumerate(graph.notes):
+        for key in EDGE_PROPERTIES:
+            for link in note.property_links(key):
+                target = index.resolver.resolve(link.target, note)
+                yield i, key, link.text, graph.node(target) if target is not None else None
+
+def export_graph(index, output):
+    """
+    Write index's link graph to a SQLite snapshot at output.
+    
+    Returns a dict of the row counts written per table.
+    """
+    output = Path(output)
+    graph = index.graph
+    tmp_path = output.with_name(f'.{output.name}.{os.getpid()}.tmp')
+    
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        # A fresh file that only becomes visible once complete needs no journal
+        conn.execute('PRAGMA journal_mode=OFF')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.executescript(GRAPH_SCHEMA)
+        with conn:
+            conn.executemany('INSERT INTO notes VALUES (?, ?, ?, ?, ?, ?, ?)', note_rows(graph))
+            conn.executemany('INSERT INTO links VALUES (?, ?, ?)', link_rows(graph))
+            conn.executemany('INSERT INTO unresolved VALUES (?, ?, ?)', unresolved_rows(graph))
+            conn.executemany('INSERT OR IGNORE INTO properties VALUES (?, ?, ?, ?)',
+                             property_rows(index))
+            
+            counts = {
+                table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for table in ('notes', 'links', 'unresolved', 'properties')
+            }
+            meta = {
+                'format': FORMAT_VERSION,
+                'vault': Path(index.vault_root).resolve(),
+                'exported': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'content_hash': 'sha256',
+                'link_count': graph.link_count,
+                **{f'{table}_rows': n for table, n in counts.items()},
+            }
+            conn.executemany('INSERT INTO meta VALUES (?, ?)',
+                             [(key, str(value)) for key, value in meta.items()])
+        conn.close()
+        os.replace(str(tmp_path), str(output))
+    except BaseException:
+        conn.close()
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+    
+    return counts
+
+def main():
+    args = get_args()
+    
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    index = build_index(args)
+    
+    for note in index:
+        if note.error:
+            print(f"Error reading {note.path}: {note.error}", file=sys.stderr)
+    
+    with index.stats.phase('analysis'):
+        try:
+            counts = export_graph(index, args.output)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Error: could not write {args.output}: {e}", file=sys.stderr)
+            sys.exit(1)
+    
+    print(f"Exported {counts['notes']} notes, {index.graph.link_count} links "
+          f"({counts['links']} note pairs), {counts['unresolved']} unresolved link(s) and "
+          f"{counts['properties']} up/in link(s) to {args.output}")
+    if args.stats:
+        index.stats.report()
+    sys.exit(0)
+
+if __name__ == '__main__':
+    main()
@@ -3,8 +3,13 @@
 Find broken links - wikilinks that point to non-existent notes.
 
 Usage:
-    ./find_broken_links.py [vault_path]
-    python3 find_broken_links.py [vault_path]
+    ./find_broken_links.py [vault_path] [--format text|json|ndjson]
+    ./find_broken_links.py [vault_path] [--suggestions N] [--suggestion-threshold X]
+    python3 find_broken_links.py [vault_path] [--json]
+
+Each broken link comes with up to --suggestions existing notes whose
+names are closest to it ("did you mean"), by character trigram
+similarity; useful after renames.
 
 This script audits only vault content, excluding:
 - node_modules/ directories (package dependencies)
@@ -13,11 +18,13 @@ This script audits only vault content, excluding:
 - Other non-vault content matching .gitignore
 """
 
-import os
-import re
 import sys
+import json
 from pathlib import Path
-from vault_utils import load_gitignore_patterns, is_vault_content, extract_wikilinks
+from vault_utils import (
+    TrigramIndex, VaultIndex, add_index_args, add_output_args, attach_stats, build_index,
+    write_ndjson,
+)
 import argparse
 
 def get_args():
@@ -31,58 +38,120 @@ def get_args():
         default=Path.cwd(),
         help='Path to vault (default: current directory)'
     )
+    parser.add_argument(
+        '--suggestions',
+        type=int,
+        default=3,
+        metavar='N',
+        help='Suggest up to N existing notes for each broken link (0 = none, default: 3)'
+    )
+    parser.add_argument(
+        '--suggestion-threshold',
+        type=float,
+        default=0.4,
+        metavar='X',
+        help='Least name similarity (0-1) for a suggestion (default: 0.4)'
+    )
+    add_output_args(parser)
+    add_index_args(parser)
     return parser.parse_args()
 
-def find_broken_links(vault_path):
+def iter_broken_links(vault_path, index=None):
+    """Yield (source_file, broken_link) pairs as they are found."""
     vault = Path(vault_path)
-    ignore_patterns = load_gitignore_patterns(vault)
+    if index is None:
+        index = VaultIndex.build(vault)
     
-    # Build set of all existing note names (vault content only)
-    existing_notes = set()
-    
-    for md_file in vault.rglob('*.md'):
-        if not is_vault_content(md_file, vault, ignore_patterns):
-            continue
-        existing_notes.add(md_file.stem)
+    graph = index.graph
     
     # Find broken links (vault content only)
-    broken = []  # (source_file, broken_link)
-    
-    for md_file in vault.rglob('*.md'):
-        if not is_vault_content(md_file, vault, ignore_patterns):
+    for i, note in enumerate(graph.notes):
+        # With --since, only changed notes and notes linking into them
+        if not index.is_link_source(note):
+            continue
+        
+        if note.error:
+            print(f"Error reading {note.path}: {note.error}", file=sys.stderr)
             continue
         
-        try:
-            content = md_file.read_text(encoding='utf-8')
-            links = extract_wikilinks(content)
-            
-            for link in links:
-                # Handle path-style links (Folder/Note)
-                link_name = Path(link).stem if '/' in link else link
-                
-                # Skip headings/blocks (links with #)
-                if '#' in link_name:
-                    link_name = link_name.split('#')[0]
-                
-                if link_name and link_name not in existing_notes:
-                    broken.append((md_file, link))
-        except (IOError, OSError, UnicodeDecodeError) as e:
-            print(f"Error reading {md_file}: {e}", file=sys.stderr)
-    
-    return broken
+        # Headings/blocks (#anchor) are split off before resolving, and
+        # [[#anchor]] alone points into the note itself, so never breaks
+        for link in graph.unresolved(i):
+            yield note.path, link
 
-def main():
-    args = get_args()
+def find_broken_links(vault_path, index=None):
+    return list(iter_broken_links(vault_path, index))
+
+def sort_broken_links(broken):
+    """Order broken links by source file, then link (the JSON output order)."""
+    return sorted(broken, key=lambda b: (str(b[0]), b[1]))
+
+def link_suggester(index, limit=3, threshold=0.4, names=None):
+    """
+    Return a function listing the notes a broken link most likely meant.
+
+    It maps a broken link's text to up to limit records {'path',
+    'link', 'similarity'}, most similar first, where link is what to
+    write between [[ ]] instead (keeping any #anchor). names is a
+    TrigramIndex of index.notes to reuse, if one was already built.
+    """
+    memo = {}
     
-    if not args.vault_path.exists():
-        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
-        sys.exit(1)
+    def suggest(link):
+        nonlocal names
+        if link not in memo:
+            if names is None:
+                # Built on the first broken link, so clean vaults never pay for it
+                names = TrigramIndex(index.notes)
+            target, hash_sign, anchor = link.partition('#')
+            suggestions = []
+            for note, similarity in names.similar(target, limit, threshold):
+                # The bare name, unless other notes share it
+                text = note.name
+                if index.resolver.is_ambiguous(text):
+                    text = Path(note.rel_path).with_suffix('').as_posix()
+                suggestions.append({
+                    'path': note.rel_path,
+                    'link': text + hash_sign + anchor,
+                    'similarity': round(similarity, 3),
+                })
+            memo[link] = suggestions
+        return memo[link]
+    
+    return suggest
+
+def to_records(broken, vault_path, suggest=None):
+    """Convert (source_file, broken_link) pairs to JSON records, with suggestions if given."""
+    for source, link in broken:
+        record = {'source': str(source.relative_to(vault_path)), 'link': link}
+        if suggest is not None:
+            record['suggestions'] = suggest(link)
+        yield record
+
+def find_ambiguous_links(vault_path, index=None):
+    """Find links whose target matches more than one note."""
+    vault = Path(vault_path)
+    if index is None:
+        index = VaultIndex.build(vault)
     
-    broken = find_broken_links(args.vault_path)
+    resolver = index.resolver
+    ambiguous = []  # (source_file, link, [candidate rel paths, chosen first])
+    
+    for note in index:
+        if note.error or not index.is_link_source(note):
+            continue
+        for link in note.links:
+            if link.target and resolver.is_ambiguous(link.target):
+                candidates = resolver.candidates(link.target, note)
+                ambiguous.append((note.path, link.text, [c.rel_path for c in candidates]))
     
+    return ambiguous
+
+def print_report(broken, vault_path, suggest=None):
+    """Print broken links grouped by source file, with suggestions if given. Returns the exit code."""
     if not broken:
         print("No broken links found.")
-        sys.exit(0)
+        return 0
     
     # Group by source file
     by_source = {}
@@ -96,9 +165,58 @@ def main():
     for source, links in sorted(by_source.items()):
         print(f"  {source}:")
         for link in sorted(set(links)):
-            print(f"    -> [[{link}]]")
+            suggestions = suggest(link) if suggest is not None else []
+            if suggestions:
+                meant = ', '.join(f"[[{s['link']}]]" for s in suggestions)
+                print(f"    -> [[{link}]]  (did you mean {meant}?)")
+            else:
+                print(f"    -> [[{link}]]")
+    
+    return 1
+
+def main():
+    args = get_args()
+    
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    index = build_index(args)
+    suggest = None
+    if args.suggestions > 0:
+        with index.stats.phase('analysis'):
+            suggest = link_suggester(index, args.suggestions, args.suggestion_threshold)
+    
+    if args.format == 'ndjson':
+        with index.stats.phase('analysis'):
+            broken = iter_broken_links(args.vault_path, index=index)
+            if args.sort:
+                broken = sort_broken_links(broken)
+            summary = write_ndjson(to_records(broken, args.vault_path, suggest),
+                                   stats=index.stats if args.stats else None)
+        sys.exit(1 if summary['count'] else 0)
+    
+    with index.stats.phase('analysis'):
+        broken = find_broken_links(args.vault_path, index=index)
+        ambiguous = find_ambiguous_links(args.vault_path, index=index)
+    
+    if args.format == 'json':
+        records = list(to_records(sort_broken_links(broken), args.vault_path, suggest))
+        print(json.dumps(attach_stats(records, index.stats) if args.stats else records, indent=2))
+        sys.exit(1 if broken else 0)
+    
+    exit_code = print_report(broken, args.vault_path, suggest)
+    
+    # Ambiguous links still resolve, so they're a note rather than a failure
+    if ambiguous:
+        print(f"\nNote: {len(ambiguous)} link(s) match more than one note:\n")
+        for source, link, candidates in ambiguous:
+            print(f"  {source.relative_to(args.vault_path)}: [[{link}]]")
+            print(f"    -> {candidates[0]} (also: {', '.join(candidates[1:])})")
     
-    sys.exit(1 if broken else 0)
+    if args.stats:
+        index.stats.report()
+    sys.exit(exit_code)
 
 if __name__ == '__main__':
     main()
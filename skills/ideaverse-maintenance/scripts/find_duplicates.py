@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Find near-duplicate notes - notes whose text largely overlaps.
+
+Usage:
+    ./find_duplicates.py [vault_path] [--threshold 0.8] [--format text|json|ndjson]
+    python3 find_duplicates.py [vault_path] [--shingle-size N] [--min-words N] [--json]
+
+Each note body (without frontmatter) is lowercased and split into words,
+and every run of --shingle-size consecutive words is a shingle. Two notes
+are near-duplicates when the Jaccard similarity of their shingle sets
+(shared shingles / all shingles) is at least --threshold.
+
+Comparing every pair of notes is out of reach for large vaults, so each
+note gets a MinHash signature instead, and locality-sensitive hashing
+(LSH) puts the signatures into buckets band by band: only notes sharing
+a bucket become candidate pairs. The band size is picked so that a pair
+right at the threshold becomes a candidate 95% of the time, and more
+similar pairs almost always do. Candidates are then checked with the
+exact Jaccard similarity, so no pair below the threshold is reported.
+
+Signatures are cached by note content hash (see --no-cache), so reruns
+only read notes that changed.
+
+Use references/duplicate-detection.md in the enrichment skill to decide
+whether to merge, redirect or differentiate each pair.
+
+This script audits only vault content, excluding:
+- node_modules/ directories (package dependencies)
+- Build artifacts (dist/, build/, .next/, etc.)
+- Version control (.git/, .github/)
+- Other non-vault content matching .gitignore
+"""
+
+import re
+import sys
+import json
+import bisect
+import hashlib
+import functools
+from array import array
+from pathlib import Path
+from vault_utils import (
+    DerivedCache, VaultIndex, add_index_args, add_output_args, attach_stats, build_index,
+    map_files, note_body, write_ndjson,
+)
+import argparse
+
+# Signature length; a power of two, as notes are split into this many bins
+NUM_HASHES = 128
+_BIN_SHIFT = 64 - (NUM_HASHES.bit_length() - 1)
+_VALUE_MASK = 0xFFFFFFFF
+
+# Bump when signatures are computed differently, to invalidate cached ones
+SIGNATURE_VERSION = 1
+
+# Probability that a pair exactly at the threshold becomes a candidate
+CANDIDATE_RECALL = 0.95
+
+# Buckets holding more notes than this are shared boilerplate (templates,
+# embedded snippets) rather than duplicates, and would make the candidate
+# pairs quadratic; they are skipped
+MAX_BUCKET_SIZE = 100
+
+_WORD_RE = re.compile(r'\w+')
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Find near-duplicate notes - notes whose text largely overlaps.'
+    )
+    parser.add_argument(
+        'vault_path',
+        nargs='?',
+        type=Path,
+        default=Path.cwd(),
+        help='Path to vault (default: current directory)'
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.8,
+        help='Jaccard similarity of shingle sets to count as duplicates (default: 0.8)'
+    )
+    parser.add_argument(
+        '--shingle-size',
+        type=int,
+        default=3,
+        help='Words per shingle (default: 3)'
+    )
+    parser.add_argument(
+        '--min-words',
+        type=int,
+        default=30,
+        help='Skip notes with fewer words, such as stubs and empty templates (default: 30)'
+    )
+    add_output_args(parser)
+    add_index_args(parser)
+    args = parser.parse_args()
+    if not 0 < args.threshold <= 1:
+        parser.error('--threshold must be between 0 and 1')
+    if args.shingle_size < 1:
+        parser.error('--shingle-size must be at least 1')
+    if args.since:
+        parser.error("duplicates are found across the whole vault; --since is not supported")
+    return args
+
+def shingles(content, shingle_size):
+    """Return the set of a note's word shingles, as tuples of shingle_size words."""
+    words = _WORD_RE.findall(note_body(content).lower())
+    if len(words) < shingle_size:
+        return {tuple(words)} if words else set()
+    return set(zip(*[words[i:] for i in range(shingle_size)]))
+
+def shingle_hash(shingle):
+    """Stable 64-bit hash of a shingle (the same in every process and run)."""
+    digest = hashlib.blake2b(' '.join(shingle).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+def minhash(note_shingles):
+    """
+    Return the MinHash signature of a set of shingles, or None if empty.
+
+    Uses one-permutation hashing: the top bits of each hash pick one of
+    NUM_HASHES bins and each bin keeps its smallest hash, so a signature
+    costs one pass instead of one per hash function. Empty bins borrow the
+    value of the next filled bin, offset by the distance to it, so two
+    notes still agree on a bin with probability about their similarity.
+    """
+    if not note_shingles:
+        return None
+    
+    # Descending order leaves each bin holding its smallest hash
+    hashes = sorted(map(shingle_hash, note_shingles), reverse=True)
+    smallest = {h >> _BIN_SHIFT: h for h in hashes}
+    value_shift = _BIN_SHIFT - 32
+    filled = sorted(smallest)
+    signature = array('I', [0]) * NUM_HASHES
+    for b in range(NUM_HASHES):
+        h = smallest.get(b)
+        if h is not None:
+            signature[b] = (h >> value_shift) & _VALUE_MASK
+            continue
+        donor = filled[bisect.bisect_right(filled, b) % len(filled)]
+        distance = (donor - b) % NUM_HASHES
+        value = (smallest[donor] >> value_shift) & _VALUE_MASK
+        signature[b] = (value + distance * 0x9E3779B9) & _VALUE_MASK
+    return signature
+
+def _read_shingles(path, shingle_size):
+    """Shingles of one note, or None if it can't be read."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return shingles(f.read(), shingle_size)
+    except (IOError, OSError, UnicodeDecodeError):
+        return None
+
+def _signature_file(path, shingle_size):
+    """Signature bytes of one note, b'' for notes without words, None if unreadable."""
+    note_shingles = _read_shingles(path, shingle_size)
+    if note_shingles is None:
+        return None
+    signature = minhash(note_shingles)
+    return signature.tobytes() if signature is not None else b''
+
+def compute_signatures(notes, shingle_size, jobs=1, cache=None):
+    """
+    Return {position in notes: signature} for notes with at least one shingle.
+
+    Signatures come from cache when it has the note's content hash; the
+    rest are computed, across jobs processes (see map_files).
+    """
+    results = {}
+    missing = []
+    for i, note in enumerate(notes):
+        data = cache.get(note.content_hash) if cache else None
+        if data is None:
+            missing.append(i)
+        else:
+            results[i] = data
+    
+    compute = functools.partial(_signature_file, shingle_size=shingle_size)
+    computed = map_files(compute, [str(notes[i].path) for i in missing], jobs)
+    for i, data in zip(missing, computed):
+        if data is None:
+            print(f"Error reading {notes[i].path}", file=sys.stderr)
+            continue
+        results[i] = data
+        if cache:
+            cache.put(notes[i].content_hash, data)
+    
+    signatures = {}
+    for i, data in results.items():
+        if data:
+            signature = array('I')
+            signature.frombytes(data)
+            signatures[i] = signature
+    return signatures
+
+def lsh_bands(threshold, num_hashes=NUM_HASHES, recall=CANDIDATE_RECALL):
+    """
+    Return (bands, rows) for banding signatures of num_hashes values.
+
+    A pair with similarity s shares at least one of the bands with
+    probability 1 - (1 - s**rows)**bands. More rows per band mean fewer
+    dissimilar candidates, so take the most rows that still give a pair
+    at the threshold that probability of at least recall.
+    """
+    best = 1
+    for rows in range(1, num_hashes + 1):
+        bands = num_hashes // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            best = rows
+    return num_hashes // best, best
+
+def candidate_pairs(signatures, bands, rows, max_bucket_size=MAX_BUCKET_SIZE):
+    """
+    Return the sorted (i, j) pairs, i < j, sharing a bucket in any band.
+
+    Also returns the set of notes in buckets over max_bucket_size, which
+    are skipped: (pairs, crowded).
+    """
+    pairs = set()
+    crowded = set()
+    for band in range(bands):
+        start = band * rows
+        buckets = {}
+        for i, signature in signatures.items():
+            buckets.setdefault(signature[start:start + rows].tobytes(), []).append(i)
+        for members in buckets.values():
+            if len(members) > max_bucket_size:
+                crowded.update(members)
+            elif len(members) > 1:
+                members.sort()
+                for a in range(len(members)):
+                    for b in range(a + 1, len(members)):
+                        pairs.add((members[a], members[b]))
+    return sorted(pairs), crowded
+
+def iter_duplicates(vault_path, threshold=0.8, shingle_size=3, min_words=30, index=None,
+                    jobs=1, cache=None):
+    """
+    Yield near-duplicate pairs once candidates are found, in vault walk order.
+
+    Yields {'similarity': Jaccard similarity, 'notes': [rel path, rel path]}.
+    cache is an optional DerivedCache for signatures (see signature_kind);
+    it is committed and closed afterwards.
+    """
+    vault = Path(vault_path)
+    if index is None:
+        index = VaultIndex.build(vault)
+    
+    for note in index:
+        if note.error:
+            print(f"Error reading {note.path}: {note.error}", file=sys.stderr)
+    
+    # The word count is known without reading the note again
+    notes = [note for note in index
+             if not note.error and note.content_hash and note.word_count >= min_words]
+    signatures = compute_signatures(notes, shingle_size, jobs, cache)
+    if cache:
+        cache.commit({note.content_hash for note in index if note.content_hash})
+    
+    bands, rows = lsh_bands(threshold)
+    loaded = {}
+    
+    def shingles_of(i):
+        if i not in loaded:
+            loaded[i] = _read_shingles(notes[i].path, shingle_size) or set()
+        return loaded[i]
+    
+    pairs, crowded = candidate_pairs(signatures, bands, rows)
+    if crowded:
+        print(f"Warning: {len(crowded)} note(s) share text with over {MAX_BUCKET_SIZE} others "
+              f"(templates or boilerplate?); pairs matching only on that text are not "
+              f"reported, e.g. {notes[min(crowded)].rel_path}", file=sys.stderr)
+    
+    for i, j in pairs:
+        a, b = shingles_of(i), shingles_of(j)
+        if not a or not b:
+            continue
+        similarity = len(a & b) / len(a | b)
+        if similarity >= threshold:
+            yield {
+                'similarity': round(similarity, 3),
+                'notes': sorted((notes[i].rel_path, notes[j].rel_path)),
+            }
+
+def find_duplicates(vault_path, threshold=0.8, shingle_size=3, min_words=30, index=None,
+                    jobs=1, cache=None):
+    duplicates = list(iter_duplicates(vault_path, threshold, shingle_size, min_words, index,
+                                      jobs, cache))
+    
+    # Most similar first
+    duplicates.sort(key=lambda d: (-d['similarity'], d['notes']))
+    return duplicates
+
+def signature_kind(shingle_size):
+    """DerivedCache kind for signatures computed with these parameters."""
+    return f'minhash{NUM_HASHES}:{shingle_size}:v{SIGNATURE_VERSION}'
+
+def open_signature_cache(args):
+    """DerivedCache for signatures per the index options, or None with --no-cache."""
+    if args.no_cache:
+        return None
+    return DerivedCache.open(args.vault_path, signature_kind(args.shingle_size),
+                             args.cache_dir, rebuild=args.rebuild_cache)
+
+def print_report(duplicates, threshold):
+    """Print near-duplicate pairs, most similar first. Returns the exit code."""
+    if not duplicates:
+        print(f"No near-duplicate notes found (similarity >= {threshold:.0%}).")
+        return 0
+    
+    print(f"Found {len(duplicates)} near-duplicate pair(s) (similarity >= {threshold:.0%}):\n")
+    for item in duplicates[:50]:
+        a, b = item['notes']
+        print(f"  {item['similarity']:4.0%}  {a}")
+        print(f"        {b}")
+    if len(duplicates) > 50:
+        print(f"\n  ... and {len(duplicates) - 50} more")
+    
+    return 1
+
+def main():
+    args = get_args()
+    
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    index = build_index(args)
+    options = dict(threshold=args.threshold, shingle_size=args.shingle_size,
+                   min_words=args.min_words, index=index, jobs=args.jobs)
+    
+    if args.format == 'ndjson':
+        with index.stats.phase('analysis'):
+            cache = open_signature_cache(args)
+            if args.sort:
+                duplicates = find_duplicates(args.vault_path, cache=cache, **options)
+            else:
+                duplicates = iter_duplicates(args.vault_path, cache=cache, **options)
+            summary = write_ndjson(duplicates, stats=index.stats if args.stats else None)
+        sys.exit(1 if summary['count'] else 0)
+    
+    with index.stats.phase('analysis'):
+        duplicates = find_duplicates(args.vault_path, cache=open_signature_cache(args), **options)
+    
+    if args.format == 'json':
+        print(json.dumps(attach_stats(duplicates, index.stats) if args.stats else duplicates, indent=2))
+        sys.exit(1 if duplicates else 0)
+    
+    exit_code = print_report(duplicates, args.threshold)
+    if args.stats:
+        index.stats.report()
+    sys.exit(exit_code)
+
+if __name__ == '__main__':
+    main()
@@ -3,8 +3,16 @@
 Find orphan notes - notes with no incoming links from other notes.
 
 Usage:
-    ./find_orphans.py [vault_path]
-    python3 find_orphans.py [vault_path]
+    ./find_orphans.py [vault_path] [--format text|json|ndjson]
+    ./find_orphans.py [vault_path] --reachability [--follow-up]
+    python3 find_orphans.py [vault_path] [--json]
+
+With --reachability, finds every note that can't be reached by following
+links from the root notes (Home, Ideaverse Map), including islands of
+notes that link to each other but not back to the rest of the vault.
+Each island is reported with its size and the notes to link to so that
+all of it becomes reachable. --follow-up also treats a note's up:
+property as a link from the parent to the note.
 
 This script audits only vault content, excluding:
 - node_modules/ directories (package dependencies)
@@ -13,11 +21,15 @@ This script audits only vault content, excluding:
 - Other non-vault content matching .gitignore
 """
 
-import os
-import re
 import sys
+import json
+from array import array
+from collections import deque
 from pathlib import Path
-from vault_utils import load_gitignore_patterns, is_vault_content, extract_wikilinks, ROOT_NOTES
+from vault_utils import (
+    VaultIndex, add_index_args, add_output_args, attach_stats, build_index, write_ndjson,
+    ROOT_NOTES,
+)
 import argparse
 
 def get_args():
@@ -31,65 +43,330 @@ def get_args():
         default=Path.cwd(),
         help='Path to vault (default: current directory)'
     )
-    return parser.parse_args()
+    parser.add_argument(
+        '--reachability',
+        action='store_true',
+        help='Report notes not reachable by links from the root notes, grouped into islands'
+    )
+    parser.add_argument(
+        '--follow-up',
+        action='store_true',
+        help="With --reachability, also reach notes through their parents' up: links"
+    )
+    add_output_args(parser)
+    add_index_args(parser)
+    args = parser.parse_args()
+    if args.reachability and args.since:
+        parser.error("--reachability needs the whole vault and can't be combined with --since")
+    return args
+
+def is_orphan(note, in_degree):
+    """True if a note with in_degree incoming links is an orphan (root notes never are)."""
+    return in_degree == 0 and note.name not in ROOT_NOTES
 
-def find_orphans(vault_path):
+def iter_orphans(vault_path, index=None):
+    """Yield (name, path) for each orphan note, in vault walk order."""
     vault = Path(vault_path)
-    ignore_patterns = load_gitignore_patterns(vault)
+    if index is None:
+        index = VaultIndex.build(vault)
     
-    # Collect all notes and their incoming links (vault content only)
-    notes = {}  # filename (no ext) -> file path
-    incoming_links = {}  # filename -> set of files that link to it
+    for note in index:
+        if note.error:
+            print(f"Error reading {note.path}: {note.error}", file=sys.stderr)
     
-    for md_file in vault.rglob('*.md'):
-        if not is_vault_content(md_file, vault, ignore_patterns):
+    # Find orphans (notes no other note links to); with --since, only
+    # notes whose every possible linker was read
+    graph = index.graph
+    for i, note in enumerate(graph.notes):
+        if not index.has_known_incoming(note):
             continue
-        
-        note_name = md_file.stem
-        notes[note_name] = md_file
-        incoming_links[note_name] = set()
-    
-    # Build incoming link graph (vault content only)
-    for note_name, file_path in notes.items():
-        try:
-            content = file_path.read_text(encoding='utf-8')
-            links = extract_wikilinks(content)
-            for link in links:
-                # Normalize link (handle paths like Folder/Note)
-                link_name = Path(link).stem if '/' in link else link
-                if link_name in incoming_links:
-                    incoming_links[link_name].add(note_name)
-        except (IOError, OSError, UnicodeDecodeError) as e:
-            print(f"Error reading {file_path}: {e}", file=sys.stderr)
-    
-    # Find orphans (notes with no incoming links)
-    orphans = []
-    
-    for note_name, linkers in incoming_links.items():
-        if not linkers and note_name not in ROOT_NOTES:
-            orphans.append((note_name, notes[note_name]))
-    
-    return sorted(orphans, key=lambda x: x[0])
+        if is_orphan(note, graph.in_degree(i)):
+            yield note.name, note.path
 
-def main():
-    args = get_args()
+def find_orphans(vault_path, index=None):
+    return sorted(iter_orphans(vault_path, index), key=lambda x: (x[0], str(x[1])))
+
+def to_records(orphans, vault_path):
+    """Convert (name, path) pairs to JSON records."""
+    for name, path in orphans:
+        yield {'name': name, 'path': str(path.relative_to(vault_path))}
+
+def link_successors(index, follow_up=False):
+    """
+    Return a function listing the nodes of index.graph each node leads to.
+
+    That is the notes it links to, and with follow_up also the notes
+    listing it as a parent under up:.
+    """
+    graph = index.graph
+    if not follow_up:
+        return graph.out_neighbors
     
-    if not args.vault_path.exists():
-        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
-        sys.exit(1)
+    children = {}
+    for i, note in enumerate(graph.notes):
+        for link in note.property_links('up'):
+            parent = index.resolver.resolve(link.target, note)
+            if parent is not None and parent is not note:
+                children.setdefault(graph.node(parent), array('i')).append(i)
+    
+    def successors(i):
+        targets = graph.out_neighbors(i)
+        return targets + children[i] if i in children else targets
+    
+    return successors
+
+def reachable_from(roots, successors, size):
+    """Breadth-first search; returns a bytearray of size marking the reachable nodes."""
+    seen = bytearray(size)
+    queue = deque(roots)
+    for root in roots:
+        seen[root] = 1
+    while queue:
+        for target in successors(queue.popleft()):
+            if not seen[target]:
+                seen[target] = 1
+                queue.append(target)
+    return seen
+
+def strong_components(nodes, successors, member):
+    """
+    Tarjan's algorithm (iterative) over the subgraph of nodes where member[n].
+
+    Returns a list mapping each member node to its component number (-1
+    for other nodes).
+    """
+    order = [-1] * len(member)
+    low = [0] * len(member)
+    component = [-1] * len(member)
+    on_stack = bytearray(len(member))
+    stack = []
+    counter = 0
+    components = 0
+    for root in nodes:
+        if order[root] != -1:
+            continue
+        work = [(root, 0, successors(root))]
+        while work:
+            node, i, targets = work[-1]
+            if i == 0:
+                order[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = 1
+            while i < len(targets):
+                target = targets[i]
+                i += 1
+                if not member[target]:
+                    continue
+                if order[target] == -1:
+                    work[-1] = (node, i, targets)
+                    work.append((target, 0, successors(target)))
+                    break
+                if on_stack[target]:
+                    low[node] = min(low[node], order[target])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == order[node]:
+                    while True:
+                        member_node = stack.pop()
+                        on_stack[member_node] = 0
+                        component[member_node] = components
+                        if member_node == node:
+                            break
+                    components += 1
+    return component
+
+def iter_islands(vault_path, index=None, follow_up=False):
+    """
+    Yield islands of notes not reachable from the root notes, largest first.
+
+    An island is a set of unreachable notes connected by links in either
+    direction. Its entries are the fewest notes that, once linked from a
+    reachable note, make the whole island reachable: one per group of
+    mutually linked notes that nothing else in the island links to,
+    preferring the note with the most outgoing links.
+
+    Yields {'size': n, 'entries': [rel paths], 'notes': [rel paths]}.
+    """
+    vault = Path(vault_path)
+    if index is None:
+        index = VaultIndex.build(vault)
+    
+    for note in index:
+        if note.error:
+            print(f"Error reading {note.path}: {note.error}", file=sys.stderr)
+    
+    notes = index.graph.notes
+    successors = link_successors(index, follow_up)
+    roots = [i for i, note in enumerate(notes) if note.name in ROOT_NOTES]
+    if not roots:
+        print(f"Warning: no root note ({', '.join(sorted(ROOT_NOTES))}) found; "
+              "nothing is reachable", file=sys.stderr)
+    
+    reachable = reachable_from(roots, successors, len(notes))
+    unreachable = [i for i in range(len(notes)) if not reachable[i]]
+    if not unreachable:
+        return
+    member = bytearray(1 - seen for seen in reachable)
     
-    orphans = find_orphans(args.vault_path)
+    # Islands: union-find over links between unreachable notes
+    island = list(range(len(notes)))
     
+    def find(i):
+        while island[i] != i:
+            island[i] = island[island[i]]
+            i = island[i]
+        return i
+    
+    for i in unreachable:
+        for target in successors(i):
+            if member[target]:
+                a, b = find(i), find(target)
+                if a != b:
+                    island[a] = b
+    
+    # Entries: strongly connected components no other component links into
+    component = strong_components(unreachable, successors, member)
+    linked_into = set()
+    for i in unreachable:
+        for target in successors(i):
+            if member[target] and component[target] != component[i]:
+                linked_into.add(component[target])
+    
+    groups = {}
+    best_entry = {}
+    for i in unreachable:
+        groups.setdefault(find(i), []).append(i)
+        c = component[i]
+        if c not in linked_into:
+            key = (-len(successors(i)), notes[i].rel_path)
+            if c not in best_entry or key < best_entry[c][0]:
+                best_entry[c] = (key, i)
+    entries = {}
+    for _, i in best_entry.values():
+        entries.setdefault(find(i), []).append(notes[i].rel_path)
+    
+    results = [
+        {
+            'size': len(members),
+            'entries': sorted(entries[root]),
+            'notes': sorted(notes[i].rel_path for i in members),
+        }
+        for root, members in groups.items()
+    ]
+    results.sort(key=lambda r: (-r['size'], r['notes'][0]))
+    yield from results
+
+def find_islands(vault_path, index=None, follow_up=False):
+    return list(iter_islands(vault_path, index, follow_up))
+
+def print_islands(islands):
+    """Print unreachable islands, largest first. Returns the exit code."""
+    if not islands:
+        print("All notes are reachable from the root notes.")
+        return 0
+    
+    total = sum(island['size'] for island in islands)
+    print(f"Found {total} unreachable note(s) in {len(islands)} island(s):\n")
+    
+    groups = [island for island in islands if island['size'] > 1]
+    for island in groups[:20]:
+        entries = island['entries']
+        print(f"  {island['size']} notes, reachable by linking to:")
+        for path in entries:
+            print(f"    + {path}")
+        entry_set = set(entries)
+        others = [path for path in island['notes'] if path not in entry_set]
+        for path in others[:10]:
+            print(f"    - {path}")
+        if len(others) > 10:
+            print(f"    ... and {len(others) - 10} more")
+        print()
+    if len(groups) > 20:
+        print(f"  ... and {len(groups) - 20} more island(s)\n")
+    
+    singles = [island['notes'][0] for island in islands if island['size'] == 1]
+    if singles:
+        print(f"  {len(singles)} isolated note(s), not linked to or from other unreachable notes:")
+        for path in sorted(singles)[:10]:
+            print(f"    - {path}")
+        if len(singles) > 10:
+            print(f"    ... and {len(singles) - 10} more")
+        print()
+    
+    return 1
+
+def print_report(orphans, vault_path):
+    """Print orphan note paths. Returns the exit code."""
     if not orphans:
         print("No orphan notes found.")
-        sys.exit(0)
+        return 0
     
     print(f"Found {len(orphans)} orphan note(s):\n")
     for name, path in orphans:
         rel_path = path.relative_to(vault_path)
         print(f"  - {rel_path}")
     
-    sys.exit(1 if orphans else 0)
+    return 1
+
+def report_islands(args, index):
+    """Output --reachability results in args.format. Returns the exit code."""
+    if args.format == 'ndjson':
+        # Islands come out largest first either way, so --sort changes nothing
+        with index.stats.phase('analysis'):
+            summary = write_ndjson(iter_islands(args.vault_path, index, args.follow_up),
+                                   stats=index.stats if args.stats else None)
+        return 1 if summary['count'] else 0
+    
+    with index.stats.phase('analysis'):
+        islands = find_islands(args.vault_path, index, args.follow_up)
+    
+    if args.format == 'json':
+        print(json.dumps(attach_stats(islands, index.stats) if args.stats else islands, indent=2))
+        return 1 if islands else 0
+    
+    exit_code = print_islands(islands)
+    if args.stats:
+        index.stats.report()
+    return exit_code
+
+def main():
+    args = get_args()
+    
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    index = build_index(args)
+    
+    if args.reachability:
+        sys.exit(report_islands(args, index))
+    
+    if args.format == 'ndjson':
+        with index.stats.phase('analysis'):
+            if args.sort:
+                orphans = find_orphans(args.vault_path, index=index)
+            else:
+                orphans = iter_orphans(args.vault_path, index=index)
+            summary = write_ndjson(to_records(orphans, args.vault_path),
+                                   stats=index.stats if args.stats else None)
+        sys.exit(1 if summary['count'] else 0)
+    
+    with index.stats.phase('analysis'):
+        orphans = find_orphans(args.vault_path, index=index)
+    
+    if args.format == 'json':
+        records = list(to_records(orphans, args.vault_path))
+        print(json.dumps(attach_stats(records, index.stats) if args.stats else records, indent=2))
+        sys.exit(1 if orphans else 0)
+    
+    exit_code = print_report(orphans, args.vault_path)
+    if args.stats:
+        index.stats.report()
+    sys.exit(exit_code)
 
 if __name__ == '__main__':
     main()
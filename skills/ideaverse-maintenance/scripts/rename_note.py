@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Rename notes - move or rename notes and rewrite every link to them.
+
+Usage:
+    ./rename_note.py vault_path "Old Name" "New Name"            # rename in place
+    ./rename_note.py vault_path "Old Name" "Folder/New Name"     # move (and rename)
+    ./rename_note.py vault_path --batch renames.csv [--dry-run]
+
+Each old name is a link target as you would write it, so a bare name
+works when it is unique and a path (with or without .md) picks one of
+several notes sharing a name. A new name without a '/' keeps the note
+in its folder; with one, it is the note's new path in the vault. The
+batch CSV has one old,new pair per row (an "old,new" header row, blank
+rows and rows starting with # are skipped).
+
+Links are found through the vault's reverse link index, so only the
+notes that link to a renamed note are read and rewritten, each once,
+however many notes a batch renames. [[Old]], [[Old|alias]],
+[[Old#heading]], ![[Old]] and [[Folder/Old]] links (in the body and in
+properties like up:) keep their form: a bare name stays a bare name
+unless another note now shares it, a path keeps as many folders as it
+had, and ./ and ../ paths stay relative. Links in code are left alone.
+Notes that link to another note with one of the new names are checked
+as well, and their links are given a path where they would otherwise
+switch to the renamed note.
+
+Every file is written atomically. Nothing is changed if any rename is
+invalid (no such note, an ambiguous name, a new path that already
+exists) or a note to rewrite can't be read; --dry-run shows the renames
+and a diff of every file that would change, and changes nothing.
+
+This script only touches vault content, excluding:
+- node_modules/ directories (package dependencies)
+- Build artifacts (dist/, build/, .next/, etc.)
+- Version control (.git/, .github/)
+- Other non-vault content matching .gitignore
+"""
+
+import os
+import sys
+import csv
+import json
+import difflib
+import posixpath
+from dataclasses import replace
+from pathlib import Path
+from vault_utils import (
+    LinkResolver, add_index_args, add_output_args, atomic_write, attach_stats, build_index,
+    find_link_spans, write_ndjson,
+)
+import argparse
+
+# Characters Obsidian doesn't allow in note names (they mean something in links)
+INVALID_NAME_CHARS = '[]|#^'
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Rename notes - move or rename notes and rewrite every link to them.'
+    )
+    parser.add_argument(
+        'vault_path',
+        type=Path,
+        help='Path to vault'
+    )
+    parser.add_argument(
+        'old',
+        nargs='?',
+        help='Note to rename: its name, or its path when the name is not unique'
+    )
+    parser.add_argument(
+        'new',
+        nargs='?',
+        help='New name (same folder), or new path in the vault'
+    )
+    parser.add_argument(
+        '--batch',
+        type=Path,
+        metavar='CSV',
+        help='Rename every old,new pair in a CSV file, in one pass over the vault'
+    )
+    parser.add_argument(
+        '--dry-run', '-n',
+        action='store_true',
+        help='Show the renames and a diff of every file that would change; change nothing'
+    )
+    add_output_args(parser)
+    add_index_args(parser)
+    args = parser.parse_args()
+    if args.since:
+        parser.error("renaming needs every link in the vault and can't be combined with --since")
+    if args.batch is not None and args.old is not None:
+        parser.error("give either OLD NEW or --batch, not both")
+    if args.batch is None and args.new is None:
+        parser.error("give OLD NEW, or --batch CSV")
+    return args
+
+def read_renames(csv_path):
+    """
+    Read (old, new) pairs from a CSV file.
+
+    Raises:
+        OSError: if the file can't be read
+        ValueError: for a row without exactly two fields
+    """
+    renames = []
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        for row in reader:
+            fields = [field.strip() for field in row]
+            if not any(fields) or fields[0].startswith('#'):
+                continue
+            if not renames and [field.lower() for field in fields] == ['old', 'new']:
+                continue
+            if len(fields) != 2:
+                raise ValueError(f"line {reader.line_num}: expected old,new")
+            renames.append((fields[0], fields[1]))
+    return renames
+
+def new_rel_path(note, new):
+    """Vault-relative path (with .md) for renaming note to new; ValueError if new is invalid."""
+    new = new.strip().replace('\\', '/')
+    if new.lower().endswith('.md'):
+        new = new[:-3]
+    if '/' not in new:
+        new = posixpath.join(posixpath.dirname(note.rel_path), new)
+    parts = new.split('/')
+    if new.startswith('/') or any(part in ('', '.', '..') for part in parts):
+        raise ValueError(f"{new!r} is not a path inside the vault")
+    bad = sorted(set(parts[-1]) & set(INVALID_NAME_CHARS))
+    if bad:
+        raise ValueError(f"a note name can't contain {' '.join(bad)}")
+    return new + '.md'
+
+def plan_renames(index, renames):
+    """
+    Check a list of renames against the vault.
+
+    Args:
+        index: The VaultIndex
+        renames: (old, new) pairs as given by the user
+
+    Returns:
+        ({rel path: new rel path}, [error messages]); the plan is only
+        usable if there are no errors
+    """
+    resolver = index.resolver
+    vault = Path(index.vault_root)
+    plan = {}
+    errors = []
+    destinations = {}
+    for old, new in renames:
+        note = resolver.resolve(old)
+        if note is None:
+            errors.append(f"{old}: no note matches")
+            continue
+        if resolver.is_ambiguous(old):
+            paths = ', '.join(n.rel_path for n in resolver.candidates(old))
+            errors.append(f"{old}: matches several notes ({paths}); give its path")
+            continue
+        if note.rel_path in plan:
+            errors.append(f"{old}: {note.rel_path} is renamed more than once")
+            continue
+        try:
+            rel_path = new_rel_path(note, new)
+        except ValueError as e:
+            errors.append(f"{old}: {e}")
+            continue
+        if rel_path == note.rel_path:
+            continue
+        if rel_path in destinations:
+            errors.append(f"{old}: {rel_path} is also the new path of {destinations[rel_path]}")
+            continue
+        dest = vault / rel_path
+        if dest.exists() and not os.path.samefile(dest, note.path):
+            errors.append(f"{old}: {rel_path} already exists")
+            continue
+        destinations[rel_path] = note.rel_path
+        plan[note.rel_path] = rel_path
+    return plan, errors
+
+def link_target(path, written, source_path, resolve):
+    """
+    Return the link target to write for a link to the note at path.
+
+    Keeps the form of the target as written: relative paths stay
+    relative (to source_path), and otherwise the shortest path suffix
+    with at least as many folders as written is used that resolve()
+    maps to path, so a bare name stays bare unless it would be
+    ambiguous. A written '.md' suffix or leading '/' is kept.
+
+    Args:
+        path: New vault-relative path of the linked note
+        written: The link target as it was written
+        source_path: New vault-relative path of the linking note
+        resolve: Function mapping a target to the path it resolves to
+    """
+    suffix = written[-3:] if written.lower().endswith('.md') else ''
+    stem = path[:-3]
+    if written.startswith(('./', '../')):
+        target = posixpath.relpath(stem, posixpath.dirname(source_path) or '.')
+        if not target.startswith('../'):
+            target = './' + target
+        if resolve(target + suffix) == path:
+            return target + suffix
+    else:
+        prefix = '/' if written.startswith('/') else ''
+        parts = stem.split('/')
+        depth = min(written.strip('/').count('/') + 1, len(parts))
+        for n in range(depth, len(parts) + 1):
+            target = prefix + '/'.join(parts[-n:]) + suffix
+            if resolve(target) == path:
+                return target
+    return stem + suffix
+
+def plan_edits(index, plan):
+    """
+    Work out the new text of every note the renames affect.
+
+    Args:
+        index: The VaultIndex
+        plan: {rel path: new rel path} from plan_renames()
+
+    Returns:
+        ([(note, new rel path, old text, new text, links rewritten)], [error messages]),
+        one entry per renamed or rewritten note, ordered by path
+    """
+    graph = index.graph
+    renamed = {}  # rel path -> the note as it will be
+    for note in index.notes:
+        if note.rel_path in plan:
+            rel_path = plan[note.rel_path]
+            renamed[note.rel_path] = replace(note, path=Path(index.vault_root) / rel_path,
+                                             rel_path=rel_path, name=posixpath.basename(rel_path)[:-3])
+    after = [renamed.get(note.rel_path, note) for note in index.notes]
+    old_resolver = index.resolver
+    new_resolver = LinkResolver(after)
+    
+    # The reverse link index gives the notes linking to each renamed
+    # note; notes linking to a note that shares a new name are checked
+    # too, in case their links would now resolve to a renamed note
+    new_names = {note.name.lower() for note in renamed.values()}
+    sources = set()
+    for i, note in enumerate(graph.notes):
+        if note.rel_path in plan:
+            sources.add(i)
+        if note.rel_path in plan or note.name.lower() in new_names:
+            sources.update(graph.in_neighbors(i))
+    
+    edits = []
+    errors = []
+    for note in sorted((graph.notes[i] for i in sources), key=lambda n: n.rel_path):
+        source = renamed.get(note.rel_path, note)
+        try:
+            with open(note.path, 'rb') as f:
+                text = f.read().decode('utf-8')
+        except (OSError, UnicodeDecodeError) as e:
+            errors.append(f"{note.rel_path}: {e}")
+            continue
+        
+        def resolve(target):
+            match = new_resolver.resolve(target, source)
+            return match.rel_path if match is not None else None
+        
+        pieces = []
+        pos = 0
+        count = 0
+        for start, end, link in find_link_spans(text):
+            if not link.target:
+                continue  # [[#heading]] stays within the note
+            target = old_resolver.resolve(link.target, note)
+            if target is None:
+                continue  # broken links stay broken
+            path = plan.get(target.rel_path, target.rel_path)
+            if resolve(link.target) == path:
+                continue
+            # Replace just the target, keeping the spacing, #anchor and |alias
+            inner = text[start:end]
+            written = inner.split('|', 1)[0].split('#', 1)[0]
+            lead = len(written) - len(written.lstrip())
+            start += lead
+            pieces.append(text[pos:start])
+            pieces.append(link_target(path, link.target, source.rel_path, resolve))
+            pos = start + len(link.target)
+            count += 1
+        
+        if count or note.rel_path in plan:
+            pieces.append(text[pos:])
+            edits.append((note, source.rel_path, text, ''.join(pieces), count))
+    return edits, errors
+
+def apply_edit(vault, edit):
+    """Move a renamed note, then write its new text atomically; raises OSError."""
+    note, rel_path, old_text, new_text, _ = edit
+    path = Path(vault) / rel_path
+    if rel_path != note.rel_path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and not os.path.samefile(path, note.path):
+            raise FileExistsError(f"{rel_path} already exists")
+        os.rename(note.path, path)
+    if new_text != old_text:
+        atomic_write(path, new_text.encode('utf-8'))
+
+def to_records(edits):
+    """Convert edits to JSON records."""
+    for note, rel_path, _, _, count in edits:
+        yield {'path': note.rel_path, 'new_path': rel_path, 'links': count}
+
+def print_diff(edits):
+    """Print each edit as a unified diff, with git-style rename headers."""
+    for note, rel_path, old_text, new_text, _ in edits:
+        if rel_path != note.rel_path:
+            print(f"rename from {note.rel_path}")
+            print(f"rename to {rel_path}")
+        if new_text != old_text:
+            sys.stdout.writelines(difflib.unified_diff(
+                old_text.splitlines(keepends=True), new_text.splitlines(keepends=True),
+                f"a/{note.rel_path}", f"b/{rel_path}"))
+            if not new_text.endswith('\n'):
+                print()
+
+def print_report(edits, dry_run):
+    """Print what was (or would be) renamed and rewritten."""
+    renamed = [(note.rel_path, rel_path) for note, rel_path, _, _, _ in edits
+               if rel_path != note.rel_path]
+    rewritten = [(rel_path, count) for _, rel_path, _, _, count in edits if count]
+    links = sum(count for _, count in rewritten)
+    verb = 'Would rename' if dry_run else 'Renamed'
+    print(f"{verb} {len(renamed)} note(s) and {'rewrite' if dry_run else 'rewrote'} "
+          f"{links} link(s) in {len(rewritten)} file(s).")
+    for old, new in renamed:
+        print(f"  {old} -> {new}")
+    if dry_run:
+        print("Dry run: nothing was changed.")
+
+def main():
+    args = get_args()
+    
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.batch is not None:
+        try:
+            renames = read_renames(args.batch)
+        except (OSError, UnicodeDecodeError, ValueError) as e:
+            print(f"Error: {args.batch}: {e}", file=sys.stderr)
+            sys.exit(2)
+    else:
+        renames = [(args.old, args.new)]
+    
+    index = build_index(args)
+    with index.stats.phase('analysis'):
+        plan, errors = plan_renames(index, renames)
+        edits = []
+        if not errors:
+            edits, errors = plan_edits(index, plan)
+    if errors:
+        for error in errors:
+            print(f"Error: {error}", file=sys.stderr)
+        print("Nothing was changed.", file=sys.stderr)
+        sys.exit(1)
+    
+    if not args.dry_run:
+        done = 0
+        try:
+            for edit in edits:
+                apply_edit(index.vault_root, edit)
+                done += 1
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            print(f"Stopped after {done} of {len(edits)} file(s); "
+                  f"run find_broken_links.py to see what still points to old names.", file=sys.stderr)
+            sys.exit(2)
+    
+    if args.format == 'ndjson':
+        write_ndjson(to_records(edits), stats=index.stats if args.stats else None)
+    elif args.format == 'json':
+        records = list(to_records(edits))
+        print(json.dumps(attach_stats(records, index.stats) if args.stats else records, indent=2))
+    else:
+        if args.dry_run:
+            print_diff(edits)
+        print_report(edits, args.dry_run)
+        if args.stats:
+            index.stats.report()
+    sys.exit(0)
+
+if __name__ == '__main__':
+    main()
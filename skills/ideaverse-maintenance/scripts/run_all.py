@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Run the full diagnostic suite off a single vault index.
+
+Usage:
+    ./run_all.py [vault_path] [--strict] [--moc-threshold N]
+                 [--squeeze-threshold N] [--days N] [--date-source SOURCE]
+                 [--format text|json|ndjson]
+    python3 run_all.py [vault_path] [--json]
+
+Runs, in order:
+- Broken links (find_broken_links.py)
+- Orphan notes (find_orphans.py)
+- Frontmatter compliance (check_frontmatter.py)
+- MOC bloat (detect_moc_bloat.py)
+- Squeeze points (validate_squeeze_points.py)
+- Archival candidates (suggest_archival.py)
+
+The vault is walked and every note read exactly once; all six audits
+share the resulting VaultIndex instead of rescanning the vault.
+
+Exit code is 1 if any audit that signals issues through its exit code
+found issues, 0 otherwise.
+
+With --format ndjson every record carries an "audit" field naming the
+audit it came from; the trailer counts records per audit.
+"""
+
+import sys
+import json
+from pathlib import Path
+from vault_utils import (
+    VaultIndex, add_index_args, add_output_args, attach_stats, build_index, write_ndjson,
+)
+import argparse
+
+import check_frontmatter
+import detect_moc_bloat
+import find_broken_links
+import find_orphans
+import suggest_archival
+import validate_squeeze_points
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Run the full diagnostic suite off a single vault index.'
+    )
+    parser.add_argument(
+        'vault_path',
+        nargs='?',
+        type=Path,
+        default=Path.cwd(),
+        help='Path to vault (default: current directory)'
+    )
+    parser.add_argument(
+        '--strict',
+        action='store_true',
+        help='Check MOCs for required "in" property'
+    )
+    parser.add_argument(
+        '--moc-threshold',
+        type=int,
+        default=50,
+        help='Link count to consider a MOC bloated (default: 50)'
+    )
+    parser.add_argument(
+        '--squeeze-threshold',
+        type=int,
+        default=10,
+        help='Reference count threshold to consider a squeeze point (default: 10)'
+    )
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=180,
+        dest='stale_days',
+        help='Staleness threshold in days (default: 180)'
+    )
+    suggest_archival.add_date_source_arg(parser)
+    add_output_args(parser)
+    add_index_args(parser)
+    return parser.parse_args()
+
+def run_all(vault_path, strict=False, moc_threshold=50, squeeze_threshold=10,
+            stale_days=180, index=None, date_source='mtime', git_dates=None):
+    """Run all six audits and return their results keyed by audit name."""
+    vault = Path(vault_path)
+    if index is None:
+        index = VaultIndex.build(vault)
+
+    return {
+        'broken_links': find_broken_links.find_broken_links(vault, index=index),
+        'orphans': find_orphans.find_orphans(vault, index=index),
+        'frontmatter': check_frontmatter.check_frontmatter(vault, strict, index=index),
+        'moc_bloat': detect_moc_bloat.detect_moc_bloat(vault, moc_threshold, index=index),
+        'squeeze_points': validate_squeeze_points.validate_squeeze_points(
+            vault, squeeze_threshold, index=index),
+        'archival': suggest_archival.suggest_archival(
+            vault, stale_days, index=index, date_source=date_source, git_dates=git_dates),
+    }
+
+def iter_run_all(vault_path, strict=False, moc_threshold=50, squeeze_threshold=10,
+                 stale_days=180, index=None, sort=False, date_source='mtime', git_dates=None):
+    """
+    Yield (audit name, JSON record) pairs for all six audits, audit by audit.
+
+    Records stream out as each audit finds them; with sort=True each
+    audit's records come in the same order as in the JSON output.
+    """
+    vault = Path(vault_path)
+    if index is None:
+        index = VaultIndex.build(vault)
+
+    if sort:
+        broken = find_broken_links.sort_broken_links(
+            find_broken_links.iter_broken_links(vault, index=index))
+        orphans = find_orphans.find_orphans(vault, index=index)
+        moc_bloat = detect_moc_bloat.detect_moc_bloat(vault, moc_threshold, index=index)
+        squeeze = validate_squeeze_points.validate_squeeze_points(
+            vault, squeeze_threshold, index=index)
+        archival = suggest_archival.suggest_archival(
+            vault, stale_days, index=index, date_source=date_source, git_dates=git_dates)
+    else:
+        broken = find_broken_links.iter_broken_links(vault, index=index)
+        orphans = find_orphans.iter_orphans(vault, index=index)
+        moc_bloat = detect_moc_bloat.iter_moc_bloat(vault, moc_threshold, index=index)
+        squeeze = validate_squeeze_points.iter_squeeze_points(
+            vault, squeeze_threshold, index=index)
+        archival = suggest_archival.iter_archival_candidates(
+            vault, stale_days, index=index, date_source=date_source, git_dates=git_dates)
+
+    audits = [
+        ('broken_links', lambda: find_broken_links.to_records(broken, vault)),
+        ('orphans', lambda: find_orphans.to_records(orphans, vault)),
+        ('frontmatter', lambda: check_frontmatter.iter_frontmatter_issues(
+            vault, strict, index=index)),
+        ('moc_bloat', lambda: moc_bloat),
+        ('squeeze_points', lambda: squeeze),
+        ('archival', lambda: archival),
+    ]
+    for name, records in audits:
+        for record in records():
+            yield name, record
+
+def to_json(results, vault_path):
+    """Convert the tuple-based results of the link audits to JSON records."""
+    payload = dict(results)
+    payload['broken_links'] = list(find_broken_links.to_records(
+        find_broken_links.sort_broken_links(results['broken_links']), vault_path))
+    payload['orphans'] = list(find_orphans.to_records(results['orphans'], vault_path))
+    return payload
+
+def main():
+    args = get_args()
+
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+
+    index = build_index(args)
+    with index.stats.phase('analysis'):
+        git_dates = suggest_archival.load_git_dates(args.vault_path, args.date_source)
+
+    if args.format == 'ndjson':
+        bloated = 0
+
+        def records():
+            nonlocal bloated
+            for audit, record in iter_run_all(
+                args.vault_path,
+                strict=args.strict,
+                moc_threshold=args.moc_threshold,
+                squeeze_threshold=args.squeeze_threshold,
+                stale_days=args.stale_days,
+                index=index,
+                sort=args.sort,
+                date_source=args.date_source,
+                git_dates=git_dates,
+            ):
+                if audit == 'moc_bloat' and record['status'] == 'bloated':
+                    bloated += 1
+                yield {'audit': audit, **record}
+
+        with index.stats.phase('analysis'):
+            summary = write_ndjson(records(), group_by=('audit', lambda r: r['audit']),
+                                   stats=index.stats if args.stats else None)
+        counts = summary['by_audit']
+        has_issues = bool(bloated or any(
+            counts.get(audit)
+            for audit in ('broken_links', 'orphans', 'frontmatter', 'squeeze_points')
+        ))
+        sys.exit(1 if has_issues else 0)
+
+    with index.stats.phase('analysis'):
+        results = run_all(
+            args.vault_path,
+            strict=args.strict,
+            moc_threshold=args.moc_threshold,
+            squeeze_threshold=args.squeeze_threshold,
+            stale_days=args.stale_days,
+            index=index,
+            date_source=args.date_source,
+            git_dates=git_dates,
+        )
+
+    has_issues = bool(
+        results['broken_links']
+        or results['orphans']
+        or results['frontmatter']
+        or any(r['status'] == 'bloated' for r in results['moc_bloat'])
+        or results['squeeze_points']
+    )
+
+    if args.format == 'json':
+        payload = to_json(results, args.vault_path)
+        if args.stats:
+            payload = attach_stats(payload, index.stats)
+        print(json.dumps(payload, indent=2))
+        sys.exit(1 if has_issues else 0)
+
+    sections = [
+        ('Broken links', lambda: find_broken_links.print_report(
+            results['broken_links'], args.vault_path)),
+        ('Orphan notes', lambda: find_orphans.print_report(
+            results['orphans'], args.vault_path)),
+        ('Frontmatter', lambda: check_frontmatter.print_report(
+            results['frontmatter'])),
+        ('MOC bloat', lambda: detect_moc_bloat.print_report(
+            results['moc_bloat'], args.moc_threshold)),
+        ('Squeeze points', lambda: validate_squeeze_points.print_report(
+            results['squeeze_points'], args.squeeze_threshold)),
+        ('Archival candidates', lambda: suggest_archival.print_report(
+            results['archival'], args.stale_days)),
+    ]
+    for title, print_section in sections:
+        print(f"=== {title} ===\n")
+        print_section()
+        print()
+
+    if args.stats:
+        index.stats.report()
+    sys.exit(1 if has_issues else 0)
+
+if __name__ == '__main__':
+    main()
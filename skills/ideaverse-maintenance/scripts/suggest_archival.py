@@ -3,7 +3,8 @@
 Suggest notes for archival based on staleness indicators.
 
 Usage:
-    ./suggest_archival.py [vault_path] [--days N] [--json]
+    ./suggest_archival.py [vault_path] [--days N] [--date-source git|mtime|frontmatter]
+                          [--format text|json|ndjson]
     python3 suggest_archival.py [vault_path] [--days N] [--json]
 
 Staleness indicators:
@@ -12,6 +13,12 @@ Staleness indicators:
 - Located in Efforts/ and potentially complete
 - Minimal content (< 100 words)
 
+Last-modified dates come from the file's mtime by default. After a fresh
+clone or checkout every mtime is "now", so --date-source git uses the
+last commit that touched each note instead, and --date-source frontmatter
+uses its 'updated:' or 'created:' property; notes without one fall back
+to the mtime.
+
 This script audits only vault content, excluding:
 - node_modules/ directories (package dependencies)
 - Build artifacts and documentation files  
@@ -22,8 +29,11 @@ import re
 import sys
 import json
 from pathlib import Path
-from datetime import datetime, timedelta
-from vault_utils import load_gitignore_patterns, is_vault_content, extract_wikilinks
+from datetime import datetime
+from vault_utils import (
+    VaultIndex, add_index_args, add_output_args, attach_stats, build_index, write_ndjson,
+    git_commit_dates,
+)
 import argparse
 
 def get_args():
@@ -44,38 +54,67 @@ def get_args():
         dest='stale_days',
         help='Staleness threshold in days (default: 180)'
     )
+    add_date_source_arg(parser)
+    add_output_args(parser)
+    add_index_args(parser)
+    return parser.parse_args()
+
+DATE_SOURCES = ('mtime', 'git', 'frontmatter')
+
+# Frontmatter properties holding a last-modified date, in order of preference
+DATE_PROPS = ('updated', 'created')
+
+_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+def add_date_source_arg(parser):
+    """Add --date-source (shared with run_all.py)."""
     parser.add_argument(
-        '--json',
-        action='store_true',
-        dest='json_output',
-        help='Output results as JSON'
+        '--date-source',
+        choices=DATE_SOURCES,
+        default='mtime',
+        help='Where last-modified dates come from: file mtime, last git commit, '
+             "or the 'updated'/'created' frontmatter property (default: mtime)"
     )
-    return parser.parse_args()
 
-def get_modification_date(file_path):
-    """Get file modification date."""
-    return datetime.fromtimestamp(file_path.stat().st_mtime)
+def load_git_dates(vault_path, date_source):
+    """
+    Look up git commit dates if date_source needs them, else return None.
+    Prints an error and exits with status 2 if git can't provide them.
+    """
+    if date_source != 'git':
+        return None
+    try:
+        return git_commit_dates(Path(vault_path))
+    except RuntimeError as e:
+        print(f"Error: --date-source git: {e}", file=sys.stderr)
+        sys.exit(2)
 
-def count_words(content):
-    """Count words in content body (excluding frontmatter)."""
-    if content.startswith('---'):
-        parts = content.split('---', 2)
-        if len(parts) >= 3:
-            content = parts[2]
-    
-    # Remove wikilinks formatting but keep text
-    content = re.sub(r'\[\[([^\]|]+)\|([^\]]+)\]\]', r'\2', content)
-    content = re.sub(r'\[\[([^\]]+)\]\]', r'\1', content)
-    
-    # Remove other markdown
-    content = re.sub(r'[#*`~\[\]()]', '', content)
-    
-    words = content.split()
-    return len(words)
+def frontmatter_date(note):
+    """Date from the note's 'updated' or 'created' property, or None."""
+    props = note.frontmatter or {}
+    for prop in DATE_PROPS:
+        value = props.get(prop)
+        if isinstance(value, list):
+            value = value[0] if value else None
+        match = _DATE_RE.search(str(value)) if value else None
+        if match:
+            try:
+                return datetime.strptime(match.group(), '%Y-%m-%d')
+            except ValueError:
+                continue
+    return None
 
-def count_outgoing_links(content: str) -> int:
-    """Count outgoing wikilinks."""
-    return len(set(extract_wikilinks(content)))
+def get_modification_date(note, date_source='mtime', git_dates=None):
+    """Get note modification date, falling back to the file's mtime."""
+    if date_source == 'git' and git_dates:
+        timestamp = git_dates.get(note.rel_path)
+        if timestamp is not None:
+            return datetime.fromtimestamp(timestamp)
+    elif date_source == 'frontmatter':
+        date = frontmatter_date(note)
+        if date is not None:
+            return date
+    return datetime.fromtimestamp(note.mtime)
 
 def is_in_efforts(file_path, vault_path):
     """Check if file is in Efforts/ directory."""
@@ -122,18 +161,29 @@ def calculate_staleness_score(note_info, stale_days):
     
     return score, reasons
 
-def suggest_archival(vault_path, stale_days):
+def iter_archival_candidates(vault_path, stale_days, index=None, date_source='mtime',
+                             git_dates=None):
+    """
+    Yield archival candidates as they are found.
+
+    With date_source='git', pass git_dates from load_git_dates() to reuse
+    one lookup across calls; otherwise it is looked up here.
+    """
     vault = Path(vault_path)
-    ignore_patterns = load_gitignore_patterns(vault)
+    if index is None:
+        index = VaultIndex.build(vault)
+    if date_source == 'git' and git_dates is None:
+        git_dates = git_commit_dates(vault)
     now = datetime.now()
-    candidates = []
     
     # Skip certain folders entirely
     skip_patterns = {'Templates', 'templates', 'Archive', 'archive', 'Archived'}
     
-    for md_file in vault.rglob('*.md'):
-        # Skip ignored and non-vault content
-        if not is_vault_content(md_file, vault, ignore_patterns):
+    for note in index:
+        md_file = note.path
+        
+        # With --since, only changed notes
+        if not index.is_changed(note):
             continue
         
         # Skip already archived
@@ -144,58 +194,60 @@ def suggest_archival(vault_path, stale_days):
         if any(pattern in str(md_file) for pattern in skip_patterns):
             continue
         
-        try:
-            content = md_file.read_text(encoding='utf-8')
-            mod_date = get_modification_date(md_file)
-            days_old = (now - mod_date).days
-            
-            note_info = {
-                'path': str(md_file.relative_to(vault_path)),
-                'name': md_file.stem,
-                'days_since_modified': days_old,
-                'last_modified': mod_date.strftime('%Y-%m-%d'),
-                'word_count': count_words(content),
-                'outgoing_links': count_outgoing_links(content),
-                'in_efforts': is_in_efforts(md_file, vault_path)
-            }
-            
-            score, reasons = calculate_staleness_score(note_info, stale_days)
-            
-            if score >= 30:  # Threshold for suggestion
-                note_info['staleness_score'] = score
-                note_info['reasons'] = reasons
-                candidates.append(note_info)
+        if note.error:
+            print(f"Error reading {md_file}: {note.error}", file=sys.stderr)
+            continue
+        
+        mod_date = get_modification_date(note, date_source, git_dates)
+        days_old = (now - mod_date).days
         
-        except (IOError, OSError, UnicodeDecodeError) as e:
-            print(f"Error reading {md_file}: {e}", file=sys.stderr)
+        note_info = {
+            'path': note.rel_path,
+            'name': note.name,
+            'days_since_modified': days_old,
+            'last_modified': mod_date.strftime('%Y-%m-%d'),
+            'word_count': note.word_count,
+            'outgoing_links': len({link.text for link in note.links}),
+            'in_efforts': is_in_efforts(md_file, vault_path)
+        }
+        
+        score, reasons = calculate_staleness_score(note_info, stale_days)
+        
+        if score >= 30:  # Threshold for suggestion
+            note_info['staleness_score'] = score
+            note_info['reasons'] = reasons
+            yield note_info
+
+def suggest_archival(vault_path, stale_days, index=None, date_source='mtime', git_dates=None):
+    candidates = list(iter_archival_candidates(vault_path, stale_days, index,
+                                               date_source, git_dates))
     
     # Sort by staleness score descending
     candidates.sort(key=lambda x: x['staleness_score'], reverse=True)
     return candidates
 
-def main():
-    args = get_args()
-    
-    if not args.vault_path.exists():
-        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
-        sys.exit(1)
-    
-    candidates = suggest_archival(args.vault_path, args.stale_days)
-    
-    if args.json_output:
-        print(json.dumps(candidates, indent=2))
-        sys.exit(0)
-    
+def priority(candidate):
+    """Priority bucket of a candidate, as grouped in the text report."""
+    score = candidate['staleness_score']
+    if score >= 60:
+        return 'high'
+    if score >= 40:
+        return 'medium'
+    return 'low'
+
+
+def print_report(candidates, stale_days):
+    """Print archival candidates grouped by priority. Returns the exit code."""
     if not candidates:
-        print(f"No archival candidates found (stale threshold: {args.stale_days} days).")
-        sys.exit(0)
+        print(f"No archival candidates found (stale threshold: {stale_days} days).")
+        return 0
     
     print(f"Found {len(candidates)} potential archival candidate(s):\n")
     
     # Group by score ranges
-    high = [c for c in candidates if c['staleness_score'] >= 60]
-    medium = [c for c in candidates if 40 <= c['staleness_score'] < 60]
-    low = [c for c in candidates if c['staleness_score'] < 40]
+    high = [c for c in candidates if priority(c) == 'high']
+    medium = [c for c in candidates if priority(c) == 'medium']
+    low = [c for c in candidates if priority(c) == 'low']
     
     if high:
         print("🔴 High priority (score >= 60):\n")
@@ -222,6 +274,44 @@ def main():
     
     print("Recommendation: Review high-priority candidates for archival.")
     print("Before archiving, extract any reusable knowledge to Atlas/.")
+    return 0
+
+def main():
+    args = get_args()
+    
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    index = build_index(args)
+    with index.stats.phase('analysis'):
+        git_dates = load_git_dates(args.vault_path, args.date_source)
+    
+    if args.format == 'ndjson':
+        with index.stats.phase('analysis'):
+            if args.sort:
+                candidates = suggest_archival(args.vault_path, args.stale_days, index=index,
+                                              date_source=args.date_source, git_dates=git_dates)
+            else:
+                candidates = iter_archival_candidates(
+                    args.vault_path, args.stale_days, index=index,
+                    date_source=args.date_source, git_dates=git_dates)
+            write_ndjson(candidates, group_by=('priority', priority),
+                         stats=index.stats if args.stats else None)
+        sys.exit(0)
+    
+    with index.stats.phase('analysis'):
+        candidates = suggest_archival(args.vault_path, args.stale_days, index=index,
+                                      date_source=args.date_source, git_dates=git_dates)
+    
+    if args.format == 'json':
+        print(json.dumps(attach_stats(candidates, index.stats) if args.stats else candidates, indent=2))
+        sys.exit(0)
+    
+    exit_code = print_report(candidates, args.stale_days)
+    if args.stats:
+        index.stats.report()
+    sys.exit(exit_code)
 
 if __name__ == '__main__':
     main()
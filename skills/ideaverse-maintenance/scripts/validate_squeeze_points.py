@@ -3,7 +3,7 @@
 Validate squeeze points - find unstructured note clusters that need MOCs.
 
 Usage:
-    ./validate_squeeze_points.py [vault_path] [--threshold N] [--json]
+    ./validate_squeeze_points.py [vault_path] [--threshold N] [--format text|json|ndjson]
     python3 validate_squeeze_points.py [vault_path] [--threshold N] [--json]
 
 A squeeze point occurs when 10+ notes reference the same concept without
@@ -15,15 +15,16 @@ This script audits only vault content, excluding:
 - Other non-vault content matching .gitignore
 """
 
-import os
-import re
 import sys
 import json
 from pathlib import Path
-from collections import defaultdict
-from vault_utils import load_gitignore_patterns, is_vault_content, extract_wikilinks
+from vault_utils import (
+    VaultIndex, add_index_args, add_output_args, attach_stats, build_index, write_ndjson,
+)
 import argparse
 
+import detect_moc_bloat
+
 def get_args():
     parser = argparse.ArgumentParser(
         description='Validate squeeze points - find unstructured note clusters that need MOCs.'
@@ -41,29 +42,10 @@ def get_args():
         default=10,
         help='Reference count threshold to consider a squeeze point (default: 10)'
     )
-    parser.add_argument(
-        '--json',
-        action='store_true',
-        dest='json_output',
-        help='Output results as JSON'
-    )
+    add_output_args(parser)
+    add_index_args(parser)
     return parser.parse_args()
 
-def extract_wikilinks_normalized(content: str) -> list:
-    """Extract wikilinks and normalize them (handle paths, remove anchors)."""
-    links = extract_wikilinks(content)
-    normalized = []
-    for link in links:
-        # Handle path-style links (Folder/Note)
-        if '/' in link:
-            link = Path(link).stem
-        # Remove heading anchors
-        if '#' in link:
-            link = link.split('#')[0]
-        if link:
-            normalized.append(link)
-    return normalized
-
 def is_moc(note_name, file_path, existing_mocs):
     """Check if a note is an MOC."""
     if note_name in existing_mocs:
@@ -74,119 +56,72 @@ def is_moc(note_name, file_path, existing_mocs):
         return True
     return False
 
-def find_existing_mocs(vault_path):
-    """Build set of existing MOC names."""
-    vault = Path(vault_path)
-    ignore_patterns = load_gitignore_patterns(vault)
-    mocs = set()
-    
-    for md_file in vault.rglob('*.md'):
-        if not is_vault_content(md_file, vault, ignore_patterns):
-            continue
-        
-        name = md_file.stem
-        if 'MOC' in name or name.endswith(' Map') or 'Maps' in str(md_file):
-            mocs.add(name)
-        
-        # Also check frontmatter for 'in: [[Maps]]'
-        try:
-            content = md_file.read_text(encoding='utf-8')
-            if re.search(r'in:\s*\n\s*-\s*["\']?\[\[Maps\]\]["\']?', content):
-                mocs.add(name)
-        except:
-            pass
-    
-    return mocs
+def find_existing_mocs(index):
+    """Build set of existing MOC names (see detect_moc_bloat.is_moc)."""
+    return {note.name for note in index if detect_moc_bloat.is_moc(note)}
 
-def find_existing_notes(vault_path):
-    """Build set of all existing note names."""
-    vault = Path(vault_path)
-    ignore_patterns = load_gitignore_patterns(vault)
-    notes = set()
+def is_squeeze_candidate(note, ref_count, threshold, existing_mocs):
+    """True if a note referenced ref_count times is a squeeze point: heavily linked, with no MOC."""
+    if ref_count < threshold or ref_count == 0:
+        return False
     
-    for md_file in vault.rglob('*.md'):
-        if not is_vault_content(md_file, vault, ignore_patterns):
-            continue
-        notes.add(md_file.stem)
+    target = note.name
     
-    return notes
+    # Skip if this IS an MOC
+    if target in existing_mocs:
+        return False
+    
+    # Skip if there's an MOC for this concept (e.g., "X MOC" exists)
+    return f"{target} MOC" not in existing_mocs and f"{target} Map" not in existing_mocs
 
-def validate_squeeze_points(vault_path, threshold):
+def iter_squeeze_points(vault_path, threshold, index=None):
+    """Yield squeeze points once all references are counted, in vault walk order."""
     vault = Path(vault_path)
-    ignore_patterns = load_gitignore_patterns(vault)
+    if index is None:
+        index = VaultIndex.build(vault)
     
-    # Count references to each link target
-    link_references = defaultdict(list)  # target -> list of source files
+    existing_mocs = find_existing_mocs(index)
     
-    existing_mocs = find_existing_mocs(vault_path)
-    existing_notes = find_existing_notes(vault_path)
+    for note in index:
+        if note.error:
+            print(f"Error reading {note.path}: {note.error}", file=sys.stderr)
     
-    for md_file in vault.rglob('*.md'):
-        if not is_vault_content(md_file, vault, ignore_patterns):
-            continue
-        
-        try:
-            content = md_file.read_text(encoding='utf-8')
-            links = extract_wikilinks_normalized(content)
-            source_name = md_file.stem
-            
-            for link in links:
-                # Don't count self-links
-                if link != source_name:
-                    link_references[link].append(str(md_file.relative_to(vault_path)))
-        
-        except (IOError, OSError, UnicodeDecodeError) as e:
-            print(f"Error reading {md_file}: {e}", file=sys.stderr)
+    # References to each note are its incoming links (broken links can't
+    # be squeeze points; self-links don't count)
+    graph = index.graph
     
     # Find squeeze points: heavily referenced terms without MOCs
-    squeeze_points = []
-    
-    for target, sources in link_references.items():
-        ref_count = len(sources)
+    for i, note in enumerate(graph.notes):
+        ref_count = graph.in_degree(i)
         
-        if ref_count < threshold:
+        if not is_squeeze_candidate(note, ref_count, threshold, existing_mocs):
             continue
         
-        # Skip if this IS an MOC
-        if target in existing_mocs:
+        # With --since, only terms whose every reference was read
+        if not index.has_known_incoming(note):
             continue
         
-        # Skip if target note doesn't exist (broken link)
-        if target not in existing_notes:
-            continue
-        
-        # Skip if there's an MOC for this concept (e.g., "X MOC" exists)
-        if f"{target} MOC" in existing_mocs or f"{target} Map" in existing_mocs:
-            continue
-        
-        squeeze_points.append({
-            'term': target,
+        sources = sorted(graph.notes[j].rel_path for j in graph.in_neighbors(i))
+        yield {
+            'term': note.name,
             'reference_count': ref_count,
-            'sources': sorted(sources)[:10],  # Limit for readability
+            'sources': sources[:10],  # Limit for readability
             'total_sources': ref_count
-        })
+        }
+
+def validate_squeeze_points(vault_path, threshold, index=None):
+    squeeze_points = list(iter_squeeze_points(vault_path, threshold, index))
     
-    # Sort by reference count descending
-    squeeze_points.sort(key=lambda x: x['reference_count'], reverse=True)
+    # Sort by reference count descending, then by term
+    squeeze_points.sort(key=lambda x: (-x['reference_count'], x['term']))
     return squeeze_points
 
-def main():
-    args = get_args()
-    
-    if not args.vault_path.exists():
-        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
-        sys.exit(1)
-    
-    squeeze_points = validate_squeeze_points(args.vault_path, args.threshold)
-    
-    if args.json_output:
-        print(json.dumps(squeeze_points, indent=2))
-        sys.exit(1 if squeeze_points else 0)
-    
+def print_report(squeeze_points, threshold):
+    """Print squeeze points with sample sources. Returns the exit code."""
     if not squeeze_points:
-        print(f"No squeeze points found (threshold: {args.threshold} references).")
+        print(f"No squeeze points found (threshold: {threshold} references).")
         print("Your vault structure is healthy!")
-        sys.exit(0)
+        return 0
     
     print(f"Found {len(squeeze_points)} squeeze point(s) - concepts needing MOCs:\n")
     
@@ -202,7 +137,38 @@ def main():
     print("Recommendation: Create MOCs for these terms to improve navigation.")
     print("Follow the MOC creation workflow in the ideaverse skill.")
     
-    sys.exit(1 if squeeze_points else 0)
+    return 1
+
+def main():
+    args = get_args()
+    
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    index = build_index(args)
+    
+    if args.format == 'ndjson':
+        with index.stats.phase('analysis'):
+            if args.sort:
+                squeeze_points = validate_squeeze_points(args.vault_path, args.threshold, index=index)
+            else:
+                squeeze_points = iter_squeeze_points(args.vault_path, args.threshold, index=index)
+            summary = write_ndjson(squeeze_points, stats=index.stats if args.stats else None)
+        sys.exit(1 if summary['count'] else 0)
+    
+    with index.stats.phase('analysis'):
+        squeeze_points = validate_squeeze_points(args.vault_path, args.threshold, index=index)
+    
+    if args.format == 'json':
+        payload = attach_stats(squeeze_points, index.stats) if args.stats else squeeze_points
+        print(json.dumps(payload, indent=2))
+        sys.exit(1 if squeeze_points else 0)
+    
+    exit_code = print_report(squeeze_points, args.threshold)
+    if args.stats:
+        index.stats.report()
+    sys.exit(exit_code)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Search the vault - full-text search over note titles, aliases and bodies.
+
+Usage:
+    ./vault_search.py vault_path "spaced repetition" [--limit N] [--format text|json|ndjson]
+    ./vault_search.py vault_path 'title:"spaced repetition" OR srs*' --raw
+    ./vault_search.py vault_path            # just bring the index up to date
+
+Notes are ranked with BM25, matches in titles counting most, then
+aliases, then body text. Terms are case- and accent-insensitive and
+stemmed, so "notes" also finds "note".
+
+The index is kept on disk next to the audit cache. Each run first
+re-indexes the notes added, changed or removed since the last one (by
+modification time and size), so only the first run on a vault reads
+every note; --no-update skips even that check and answers straight
+from the index.
+
+Use it before creating a note, to find the existing notes on a concept
+(see the enrichment skill's Search Before Creating step).
+
+This script indexes only vault content, excluding:
+- node_modules/ directories (package dependencies)
+- Build artifacts (dist/, build/, .next/, etc.)
+- Version control (.git/, .github/)
+- Other non-vault content matching .gitignore
+"""
+
+import sys
+import json
+import sqlite3
+from pathlib import Path
+from vault_utils import SearchIndex, Stats, add_output_args, attach_stats, write_ndjson
+import argparse
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Search the vault - full-text search over note titles, aliases and bodies.'
+    )
+    parser.add_argument(
+        'vault_path',
+        type=Path,
+        help='Path to vault'
+    )
+    parser.add_argument(
+        'query',
+        nargs='?',
+        default=None,
+        help='Words to search for (omit to only update the index)'
+    )
+    parser.add_argument(
+        '--limit', '-n',
+        type=int,
+        default=10,
+        metavar='N',
+        help='Show the N best matches (default: 10)'
+    )
+    parser.add_argument(
+        '--raw',
+        action='store_true',
+        help='Treat the query as SQLite FTS5 query syntax (phrases, AND/OR/NOT, prefix*, title:)'
+    )
+    group = parser.add_argument_group('index options')
+    group.add_argument(
+        '--no-update',
+        action='store_true',
+        help="Search the index as it is, without checking for changed notes"
+    )
+    group.add_argument(
+        '--rebuild-index',
+        action='store_true',
+        help='Discard the search index and re-index every note'
+    )
+    group.add_argument(
+        '--cache-dir',
+        type=Path,
+        default=None,
+        help='Index location (default: $IDEAVERSE_CACHE_DIR or ~/.cache/ideaverse-maintenance)'
+    )
+    group.add_argument(
+        '--stats',
+        action='store_true',
+        help='Report per-phase timings and counts (to stderr, or under "stats" in json/ndjson output)'
+    )
+    add_output_args(parser)
+    args = parser.parse_args()
+    if args.no_update and args.rebuild_index:
+        parser.error("--rebuild-index re-indexes every note and can't be combined with --no-update")
+    return args
+
+def print_update(counts):
+    """Print what update() changed in the index."""
+    print(f"Indexed {counts['notes']} notes ({counts['added']} added, "
+          f"{counts['updated']} updated, {counts['removed']} removed).")
+
+def print_report(results, query):
+    """Print search results, best first. Returns the exit code."""
+    if not results:
+        print(f"No notes match: {query}")
+        return 1
+    
+    for rank, result in enumerate(results, 1):
+        print(f"{rank:3}. {result['path']}  ({result['score']:.2f})")
+        if result['snippet']:
+            print(f"     {result['snippet']}")
+    
+    return 0
+
+def main():
+    args = get_args()
+    
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    stats = Stats()
+    try:
+        with stats.phase('cache'):
+            index = SearchIndex.open(args.vault_path, args.cache_dir, rebuild=args.rebuild_index)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error: search index unavailable ({e}); Python's SQLite needs FTS5", file=sys.stderr)
+        sys.exit(2)
+    
+    try:
+        counts = None
+        if not args.no_update:
+            counts = index.update(stats=stats)
+        
+        if args.query is None:
+            if counts is None:
+                counts = {'notes': len(index), 'added': 0, 'updated': 0, 'removed': 0}
+            if args.format == 'text':
+                print_update(counts)
+                if args.stats:
+                    stats.report()
+            else:
+                print(json.dumps(attach_stats(counts, stats) if args.stats else counts, indent=2))
+            sys.exit(0)
+        
+        with stats.phase('analysis'):
+            try:
+                results = index.search(args.query, args.limit, raw=args.raw)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(2)
+    finally:
+        index.close()
+    
+    # Ranked output is already ordered, so --sort changes nothing
+    if args.format == 'ndjson':
+        summary = write_ndjson(results, stats=stats if args.stats else None)
+        sys.exit(0 if summary['count'] else 1)
+    
+    if args.format == 'json':
+        print(json.dumps(attach_stats(results, stats) if args.stats else results, indent=2))
+        sys.exit(0 if results else 1)
+    
+    exit_code = print_report(results, args.query)
+    if args.stats:
+        stats.report()
+    sys.exit(exit_code)
+
+if __name__ == '__main__':
+    main()
@@ -10,43 +10,554 @@ Exclusions:
 - Built-in patterns for common non-vault content (node_modules, dist, etc.)
 
 Usage:
-    from vault_utils import load_gitignore_patterns, is_vault_content, extract_wikilinks
-    
-    ignore_patterns = load_gitignore_patterns(vault_root)
-    for md_file in vault_root.rglob('*.md'):
-        if not is_vault_content(md_file, vault_root, ignore_patterns):
+    from vault_utils import VaultIndex
+
+    index = VaultIndex.build(vault_root)
+    for note in index:
+        if note.error:
             continue
+        # note.stats (links, frontmatter, word_count, ...), note.mtime ...
+    graph = index.graph  # resolved links as integer adjacency arrays
+
+    The lower-level helpers are still available for one-off checks:
+
+    from vault_utils import load_gitignore_patterns, walk_vault, extract_wikilinks
+
+    ignore_patterns = load_gitignore_patterns(vault_root)
+    for md_file in walk_vault(vault_root, ignore_patterns):
         links = extract_wikilinks(md_file.read_text())
         # Process vault content
 """
 
+from array import array
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Set
+from typing import BinaryIO, Callable, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+import argparse
+import bisect
+import codecs
+import collections
+import concurrent.futures
+import contextlib
 import fnmatch
+import functools
+import hashlib
+import itertools
+import json
+import math
+import mmap
+import os
+import posixpath
 import re
+import sqlite3
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
 # Shared constants
 ROOT_NOTES = {'Home', 'Home Basic', 'Ideaverse Map'}
 WIKILINK_PATTERN = r'\[\[([^\]|]+)(?:\|[^\]]+)?\]\]'
 
+# Tokenizer patterns used by scan_note. Each starts with a literal so the
+# regex engine can skip quickly over plain text; line-start constructs match
+# their leading newline (scan_note prepends one to the body).
+_LINK_RE = re.compile(r'\[\[([^\]\n]+)\]\]')
+_CODE_START_RE = re.compile(r'\n[ ]{0,3}(?P<fence>`{3,}|~{3,})|(?P<code>`+)')
+_HEADING_RE = re.compile(r'\n[ ]{0,3}(#{1,6})(?:[ \t]+([^\n]*?))?(?:[ \t]+#+)?[ \t]*(?=\n|$)')
+_TAG_RE = re.compile(r'#([\w/-]+)')
+_YAML_KEY_RE = re.compile(r'^(\w+):\s*(.*)')
+# Characters stripped from words when counting (markdown formatting)
+_MARKUP_CHARS = '#*`~[]()'
+
+
+class Link(NamedTuple):
+    """
+    One wikilink occurrence.
+
+    [[Folder/Note#Heading|Alias]] has target 'Folder/Note', anchor
+    'Heading' and alias 'Alias'; ![[...]] embeds set embed. [[#Heading]]
+    links within the same note and has an empty target.
+    """
+    target: str
+    anchor: Optional[str] = None
+    alias: Optional[str] = None
+    embed: bool = False
+
+    @property
+    def text(self) -> str:
+        """The link as written, without alias: 'Target' or 'Target#anchor'."""
+        if self.anchor is None:
+            return self.target
+        return f'{self.target}#{self.anchor}'
+
+
+@dataclass
+class NoteStats:
+    """
+    Everything extracted from a note's text in one scan_note() pass.
+
+    frontmatter_span is the (start, end) character range of the header
+    including its '---' delimiters, or None without a header. Headings are
+    (level, text) pairs. Links inside the header (up:, in:) are included;
+    links inside fenced code blocks and inline code are not.
+
+    content_hash is the SHA-256 hex digest of the file's bytes, filled in
+    by the parse functions; it is None for header-only stats.
+    """
+    links: List[Link] = field(default_factory=list)
+    word_count: int = 0
+    headings: List[Tuple[int, str]] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+    frontmatter: Optional[Dict[str, object]] = None
+    frontmatter_span: Optional[Tuple[int, int]] = None
+    content_hash: Optional[str] = None
+
+    @property
+    def in_maps(self) -> bool:
+        """True if the header lists [[Maps]] under in: (the MOC marker)."""
+        in_val = (self.frontmatter or {}).get('in', [])
+        if isinstance(in_val, str):
+            in_val = [in_val]
+        return any(v.strip('\'"') == '[[Maps]]' for v in in_val)
+
+    def property_links(self, key: str) -> List[Link]:
+        """Wikilinks in frontmatter property key, e.g. the parents listed under up:."""
+        value = (self.frontmatter or {}).get(key, [])
+        if isinstance(value, str):
+            value = [value]
+        links = []
+        for item in value:
+            for m in _LINK_RE.finditer(item):
+                link = _parse_link(False, m.group(1))
+                if link is not None:
+                    links.append(link)
+        return links
+
+    def to_dict(self) -> Dict[str, object]:
+        """JSON-serializable form, see from_dict()."""
+        return {
+            'links': [list(link) for link in self.links],
+            'word_count': self.word_count,
+            'headings': [list(h) for h in self.headings],
+            'tags': self.tags,
+            'frontmatter': self.frontmatter,
+            'frontmatter_span': list(self.frontmatter_span) if self.frontmatter_span else None,
+            'content_hash': self.content_hash,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, object]) -> 'NoteStats':
+        span = data['frontmatter_span']
+        return cls(
+            links=[Link(*link) for link in data['links']],
+            word_count=data['word_count'],
+            headings=[tuple(h) for h in data['headings']],
+            tags=data['tags'],
+            frontmatter=data['frontmatter'],
+            frontmatter_span=tuple(span) if span else None,
+            content_hash=data['content_hash'],
+        )
+
+
+def _parse_link(embed: bool, inner: str) -> Optional[Link]:
+    """Build a Link from the text between [[ and ]], or None if it has no target."""
+    if '|' not in inner and '#' not in inner:
+        target = inner.strip()
+        return Link(target, None, None, embed) if target else None
+    target_part, sep, alias = inner.partition('|')
+    target_part = target_part.strip()
+    if not target_part:
+        return None
+    target, hash_sign, anchor = target_part.partition('#')
+    return Link(
+        target.strip(),
+        anchor.strip() if hash_sign else None,
+        alias.strip() if sep else None,
+        embed,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _closing_backticks(ticks: str):
+    """Regex for a backtick run of exactly the given length (closes a code span)."""
+    return re.compile(r'(?<!`)' + ticks + r'(?!`)')
+
+
+@functools.lru_cache(maxsize=None)
+def _closing_fence(fence: str):
+    """Regex for the line closing a fenced code block opened with `fence`."""
+    return re.compile(r'\n[ ]{0,3}' + re.escape(fence[0]) + '{%d,}[ \\t]*(?=\n|$)' % len(fence))
+
+
+def _code_regions(body: str) -> Tuple[List[int], List[int]]:
+    """
+    Find fenced code blocks and inline code spans.
+
+    Returns parallel lists of region starts and ends (sorted, disjoint).
+    An unclosed fence runs to the end of the text; an unmatched backtick
+    run is literal text.
+    """
+    starts, ends = [], []
+    if '`' not in body and '~~~' not in body:
+        return starts, ends
+    
+    pos = 0
+    while True:
+        m = _CODE_START_RE.search(body, pos)
+        if m is None:
+            break
+        pos = m.end()
+        if m.group('fence'):
+            close = _closing_fence(m.group('fence')).search(body, pos)
+            end = close.end() if close else len(body)
+        else:
+            close = _closing_backticks(m.group('code')).search(body, pos)
+            if close is None:
+                continue
+            end = close.end()
+        starts.append(m.start())
+        ends.append(end)
+        pos = end
+    return starts, ends
+
+
+def _in_regions(pos: int, starts: List[int], ends: List[int]) -> bool:
+    i = bisect.bisect_right(starts, pos) - 1
+    return i >= 0 and pos < ends[i]
+
+
+def scan_note(content: str) -> NoteStats:
+    """
+    Scan a note once and extract everything the audits need.
+
+    Finds the frontmatter header, then collects links, headings and tags
+    from the body, ignoring anything inside fenced code blocks and
+    `inline` code. Words are counted over the body, with wikilinks counted
+    as their display text (alias, or target as written) and pure
+    formatting tokens skipped.
+
+    Each construct is found with a literal-prefixed regex, which the
+    regex engine scans far faster than one combined pattern, and constructs
+    that can't occur (no '#', no backticks) aren't searched for at all.
+
+    Args:
+        content: File content as string
+
+    Returns:
+        NoteStats for the note
+    """
+    stats = NoteStats()
+    links = stats.links
+    
+    body_start = 0
+    if content.startswith('---'):
+        end = content.find('---', 3)
+        if end != -1:
+            yaml_text = content[3:end]
+            stats.frontmatter_span = (0, end + 3)
+            stats.frontmatter = _parse_yaml_props(yaml_text)
+            for m in _LINK_RE.finditer(yaml_text):
+                link = _parse_link(yaml_text[m.start() - 1:m.start()] == '!', m.group(1))
+                if link is not None:
+                    links.append(link)
+            body_start = end + 3
+    
+    body = '\n' + content[body_start:]
+    starts, ends = _code_regions(body)
+    
+    # Words: every body token that isn't pure formatting, corrected below
+    # for links shown by their alias
+    words = sum(map(bool, map(str.strip, body.split(), itertools.repeat(_MARKUP_CHARS))))
+    
+    for m in _LINK_RE.finditer(body):
+        if starts and _in_regions(m.start(), starts, ends):
+            continue
+        inner = m.group(1)
+        link = _parse_link(body[m.start() - 1] == '!', inner)
+        if link is None:
+            continue
+        links.append(link)
+        if '|' in inner or ' ' in inner:
+            display = link.alias if link.alias is not None else inner.partition('|')[0]
+            words += len(display.split()) - len(inner.split())
+    
+    if '#' in body:
+        for m in _HEADING_RE.finditer(body):
+            if not (starts and _in_regions(m.start() + 1, starts, ends)):
+                stats.headings.append((len(m.group(1)), m.group(2) or ''))
+        for m in _TAG_RE.finditer(body):
+            # Tags start a word: 'a#b' and '#123' aren't tags
+            tag = m.group(1)
+            if (body[m.start() - 1].isspace() and not tag.isdigit()
+                    and not (starts and _in_regions(m.start(), starts, ends))):
+                stats.tags.append(tag)
+    
+    stats.word_count = words
+    return stats
+
+
+def find_link_spans(content: str) -> List[Tuple[int, int, Link]]:
+    """
+    Locate every wikilink scan_note() finds in a note.
+
+    For rewriting links in place: the text is taken as read from disk,
+    with any '\r\n' line endings, and offsets index into it unchanged.
+
+    Args:
+        content: File content as string
+
+    Returns:
+        (start, end, link) for each link in scan_note(content).links, in
+        the same order, where content[start:end] is the text between
+        [[ and ]]
+    """
+    text = content
+    dropped = None
+    if '\r' in content:
+        text = content.replace('\r\n', '\n').replace('\r', '\n')
+        # Where text lost a '\r', to map its offsets back to content's
+        dropped = [m.start() - i for i, m in enumerate(re.finditer('\r\n', content))]
+    
+    spans = []
+    body_start = 0
+    if text.startswith('---'):
+        end = text.find('---', 3)
+        if end != -1:
+            yaml_text = text[3:end]
+            for m in _LINK_RE.finditer(yaml_text):
+                link = _parse_link(yaml_text[m.start() - 1:m.start()] == '!', m.group(1))
+                if link is not None:
+                    spans.append((3 + m.start(1), 3 + m.end(1), link))
+            body_start = end + 3
+    
+    # Offsets in body are one past text's, for the newline scan_note prepends
+    body = '\n' + text[body_start:]
+    starts, ends = _code_regions(body)
+    for m in _LINK_RE.finditer(body):
+        if starts and _in_regions(m.start(), starts, ends):
+            continue
+        link = _parse_link(body[m.start() - 1] == '!', m.group(1))
+        if link is not None:
+            spans.append((body_start - 1 + m.start(1), body_start - 1 + m.end(1), link))
+    
+    if dropped:
+        spans = [(start + bisect.bisect_right(dropped, start), end + bisect.bisect_right(dropped, end), link)
+                 for start, end, link in spans]
+    return spans
+
+
+# Bytes versions of the scan_note patterns for scan_note_bytes. Text mode
+# reads turn '\r\n' into '\n', so '\r' may end a line too; bare '\r' line
+# ends aren't handled. The *_AT_START variants match the first line of a
+# note without frontmatter, which has no newline before it.
+_LINK_RE_B = re.compile(rb'\[\[([^\]\r\n]+)\]\]')
+_FENCE = rb'[ ]{0,3}(?P<fence>`{3,}|~{3,})'
+_CODE_START_RE_B = re.compile(rb'\n' + _FENCE + rb'|(?P<code>`+)')
+_FENCE_AT_START_RE_B = re.compile(_FENCE)
+_HEADING = rb'[ ]{0,3}(#{1,6})(?:[ \t]+([^\r\n]*?))?(?:[ \t]+#+)?[ \t]*(?=[\r\n]|$)'
+_HEADING_RE_B = re.compile(rb'\n' + _HEADING)
+_HEADING_AT_START_RE_B = re.compile(_HEADING)
+_BARE_CR_RE_B = re.compile(rb'\r(?!\n)')
+# Any non-ASCII byte may be part of a word character; matches are
+# trimmed to _TAG_RE after decoding
+_TAG_RE_B = re.compile(rb'#((?:[\w/-]|[\x80-\xff])+)')
+_MARKUP_BYTES = _MARKUP_CHARS.encode('ascii')
+# ASCII characters str.split() treats as whitespace but bytes.split() doesn't
+_ASCII_SEPARATORS = bytes.maketrans(b'\x1c\x1d\x1e\x1f', b'    ')
+
+# scan_note_bytes decodes at most this many bytes at a time
+SCAN_CHUNK_SIZE = 256 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def _closing_backticks_b(ticks: bytes):
+    return re.compile(rb'(?<!`)' + ticks + rb'(?!`)')
+
+
+@functools.lru_cache(maxsize=None)
+def _closing_fence_b(fence: bytes):
+    return re.compile(rb'\n[ ]{0,3}' + re.escape(fence[:1])
+                      + rb'{%d,}[ \t]*(?=[\r\n]|$)' % len(fence))
+
+
+def _code_regions_b(data, pos: int) -> Tuple[List[int], List[int]]:
+    """_code_regions() over the bytes of data from pos on."""
+    starts, ends = [], []
+    if data.find(b'`', pos) == -1 and data.find(b'~~~', pos) == -1:
+        return starts, ends
+
+    while True:
+        m = _FENCE_AT_START_RE_B.match(data) if pos == 0 else None
+        if m is None:
+            m = _CODE_START_RE_B.search(data, pos)
+        if m is None:
+            break
+        pos = m.end()
+        if m.group('fence'):
+            close = _closing_fence_b(m.group('fence')).search(data, pos)
+            end = close.end() if close else len(data)
+        else:
+            close = _closing_backticks_b(m.group('code')).search(data, pos)
+            if close is None:
+                continue
+            end = close.end()
+        starts.append(m.start())
+        ends.append(end)
+        pos = end
+    return starts, ends
+
+
+def _count_words_b(data, pos: int) -> int:
+    """
+    Count words in data[pos:] the way scan_note does, a chunk at a time.
+
+    ASCII chunks are split as bytes; others are decoded first, so a word
+    spanning two chunks is carried over rather than counted twice.
+
+    Raises:
+        UnicodeDecodeError: if data isn't valid UTF-8
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    words = 0
+    # None between words, else whether the word so far has non-markup characters
+    partial = None
+    while pos < len(data):
+        chunk = data[pos:pos + SCAN_CHUNK_SIZE]
+        pos += len(chunk)
+        if chunk.isascii() and not decoder.getstate()[0]:
+            piece, markup = chunk.translate(_ASCII_SEPARATORS), _MARKUP_BYTES
+        else:
+            piece, markup = decoder.decode(chunk), _MARKUP_CHARS
+        if not piece:
+            continue
+        counted = list(map(bool, map(type(piece).strip, piece.split(), itertools.repeat(markup))))
+        if partial is not None:
+            if piece[:1].isspace() or not counted:
+                words += partial
+            else:
+                counted[0] = counted[0] or partial
+            partial = None
+        if counted and not piece[-1:].isspace():
+            partial = counted.pop()
+        words += sum(counted)
+    decoder.decode(b'', final=True)
+    return words + bool(partial)
+
+
+def _space_before(data, pos: int, body_start: int) -> bool:
+    """True if the character before data[pos] is whitespace (or the body starts at pos)."""
+    if pos == body_start:
+        return True
+    byte = data[pos - 1]
+    if byte < 0x80:
+        return chr(byte).isspace()
+    # Back up over UTF-8 continuation bytes to the start of the character
+    start = pos - 1
+    while start > body_start and pos - start < 4 and data[start] & 0xC0 == 0x80:
+        start -= 1
+    return data[start:pos].decode('utf-8', 'replace').isspace()
+
+
+def scan_note_bytes(data) -> Optional[NoteStats]:
+    """
+    scan_note() for a note's raw UTF-8 bytes, e.g. an mmap of the file.
+
+    Gives the same NoteStats as scan_note() on the file read in text
+    mode, but runs bytes patterns over data and decodes only the header,
+    matched links, headings and tags, plus one chunk at a time for the
+    word count. Memory use stays flat however large the note is.
+
+    Args:
+        data: bytes-like object supporting the buffer protocol
+
+    Returns:
+        NoteStats for the note, or None if text follows the closing '---'
+        on the same line or lines end in a bare '\r' (scan the decoded
+        text with scan_note instead)
+
+    Raises:
+        UnicodeDecodeError: if data isn't valid UTF-8
+    """
+    stats = NoteStats()
+    links = stats.links
+
+    body_start = 0
+    if data[:3] == b'---':
+        end = data.find(b'---', 3)
+        if end != -1:
+            body_start = end + 3
+            if body_start < len(data) and data[body_start] not in b'\r\n':
+                return None
+    if _BARE_CR_RE_B.search(data, body_start):
+        return None
+    if body_start:
+        yaml_text = data[3:end].decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        stats.frontmatter_span = (0, len(yaml_text) + 6)
+        stats.frontmatter = _parse_yaml_props(yaml_text)
+        for m in _LINK_RE.finditer(yaml_text):
+            link = _parse_link(yaml_text[m.start() - 1:m.start()] == '!', m.group(1))
+            if link is not None:
+                links.append(link)
+
+    words = _count_words_b(data, body_start)
+    starts, ends = _code_regions_b(data, body_start)
+
+    for m in _LINK_RE_B.finditer(data, body_start):
+        pos = m.start()
+        if starts and _in_regions(pos, starts, ends):
+            continue
+        inner = m.group(1).decode('utf-8')
+        link = _parse_link(pos > body_start and data[pos - 1] == ord('!'), inner)
+        if link is None:
+            continue
+        links.append(link)
+        if '|' in inner or ' ' in inner:
+            display = link.alias if link.alias is not None else inner.partition('|')[0]
+            words += len(display.split()) - len(inner.split())
+
+    if data.find(b'#', body_start) != -1:
+        matches = _HEADING_RE_B.finditer(data, body_start)
+        if body_start == 0:
+            first = _HEADING_AT_START_RE_B.match(data)
+            if first is not None:
+                matches = itertools.chain([first], matches)
+        for m in matches:
+            if not (starts and _in_regions(m.start(1), starts, ends)):
+                text = m.group(2)
+                stats.headings.append((len(m.group(1)), text.decode('utf-8') if text else ''))
+        for m in _TAG_RE_B.finditer(data, body_start):
+            match = _TAG_RE.match('#' + m.group(1).decode('utf-8'))
+            if match is None:
+                continue
+            tag = match.group(1)
+            if (_space_before(data, m.start(), body_start) and not tag.isdigit()
+                    and not (starts and _in_regions(m.start(), starts, ends))):
+                stats.tags.append(tag)
+
+    stats.word_count = words
+    return stats
+
 
 def extract_wikilinks(content: str) -> List[str]:
     """
     Extract all wikilinks from content.
     
     Handles both [[Link]] and [[Link|Alias]] patterns.
-    Returns list of link targets (not aliases).
+    Returns list of link targets (not aliases), including any #anchor.
+    Links inside code blocks and inline code are skipped.
     
     Args:
         content: File content as string
     
     Returns:
-        List of wikilink targets (deduplicated if same_dedup=True not passed)
+        List of wikilink targets, in order of appearance (with duplicates)
     """
-    links = []
-    for match in re.finditer(WIKILINK_PATTERN, content):
-        links.append(match.group(1).strip())
-    return links
+    return [link.text for link in scan_note(content).links]
 
 
 def extract_wikilinks_set(content: str) -> Set[str]:
@@ -54,6 +565,151 @@ def extract_wikilinks_set(content: str) -> Set[str]:
     return set(extract_wikilinks(content))
 
 
+def _parse_yaml_props(yaml_text: str) -> Dict[str, object]:
+    """Parse the text between the frontmatter delimiters (see parse_frontmatter)."""
+    yaml_text = yaml_text.strip()
+    if not yaml_text:
+        return {}
+    
+    # Simple YAML parsing (no dependencies)
+    props = {}
+    current_key = None
+    current_list = None
+    
+    for line in yaml_text.split('\n'):
+        line = line.rstrip()
+        if not line:
+            continue
+        
+        # Check for list item, at any indent ("- x" too)
+        item = line.lstrip()
+        if item.startswith('- '):
+            if current_key and current_list is not None:
+                current_list.append(item[2:].strip().strip('"'))
+            continue
+        
+        # Check for key: value or key:
+        match = _YAML_KEY_RE.match(line)
+        if match:
+            current_key = match.group(1)
+            value = match.group(2).strip()
+            
+            if value == '' or value == '[]':
+                props[current_key] = []
+                current_list = props[current_key]
+            elif value.startswith('[') and value.endswith(']'):
+                # Inline array
+                props[current_key] = [v.strip().strip('"') for v in value[1:-1].split(',') if v.strip()]
+                current_list = None
+            else:
+                props[current_key] = value.strip('"')
+                current_list = None
+    
+    return props
+
+
+def parse_frontmatter(content: str) -> Optional[Dict[str, object]]:
+    """
+    Extract YAML frontmatter as a dict.
+
+    Only the subset of YAML used by Ideaverse notes is understood:
+    scalar values, inline arrays and list items (indented or not).
+
+    Args:
+        content: File content as string
+
+    Returns:
+        Dict of properties, {} for an empty header, None if there is no header
+    """
+    if not content.startswith('---'):
+        return None
+    
+    end = content.find('---', 3)
+    if end == -1:
+        return None
+    
+    return _parse_yaml_props(content[3:end])
+
+
+def note_body(content: str) -> str:
+    """
+    Return a note's text after its frontmatter header.
+
+    Uses the same header rule as parse_frontmatter(); content without a
+    header is returned unchanged.
+    """
+    if content.startswith('---'):
+        end = content.find('---', 3)
+        if end != -1:
+            return content[end + 3:]
+    return content
+
+
+# Header-only reads stop after this many bytes without a closing '---'
+FRONTMATTER_MAX_BYTES = 64 * 1024
+FRONTMATTER_CHUNK_SIZE = 4096
+
+
+def read_frontmatter(file_path: Path, max_bytes: int = FRONTMATTER_MAX_BYTES) -> NoteStats:
+    """
+    Read only a note's frontmatter header, never the body.
+
+    Reads the file in small chunks until the closing '---' turns up and
+    decodes just the header, so checking frontmatter costs a few KB of
+    I/O per note no matter how long the note is. Gives the same result
+    as parse_frontmatter() on the full content, except that a header
+    still unterminated after max_bytes counts as no header.
+
+    Args:
+        file_path: Path to the note
+        max_bytes: Give up looking for the closing '---' after this many bytes
+
+    Returns:
+        NoteStats with only frontmatter and frontmatter_span filled in
+
+    Raises:
+        OSError, UnicodeDecodeError: if the header can't be read
+    """
+    with open(file_path, 'rb') as f:
+        header = _read_header(f, max_bytes)
+    return _header_stats(header)
+
+
+def _read_header(f, max_bytes: int) -> Optional[bytes]:
+    """Read from a binary file up to the closing '---'; return the YAML bytes or None."""
+    buf = f.read(FRONTMATTER_CHUNK_SIZE)
+    if not buf.startswith(b'---'):
+        return None
+    search_from = 3
+    while True:
+        end = buf.find(b'---', search_from)
+        if end != -1:
+            return buf[3:end]
+        if len(buf) >= max_bytes:
+            return None
+        chunk = f.read(FRONTMATTER_CHUNK_SIZE)
+        if not chunk:
+            return None
+        # The closing '---' may straddle the chunk boundary
+        search_from = max(3, len(buf) - 2)
+        buf += chunk
+
+
+def _header_stats(header: Optional[bytes]) -> NoteStats:
+    """NoteStats for a header returned by _read_header."""
+    stats = NoteStats()
+    if header is not None:
+        yaml_text = header.decode('utf-8')
+        stats.frontmatter = _parse_yaml_props(yaml_text)
+        stats.frontmatter_span = (0, len(yaml_text) + 6)
+    return stats
+
+
+def count_words(content: str) -> int:
+    """Count words in content body (excluding frontmatter)."""
+    return scan_note(content).word_count
+
+
 def load_gitignore_patterns(vault_root: Path) -> List[str]:
     """
     Load patterns from .gitignore file and git submodules in vault root.
@@ -83,12 +739,22 @@ def load_gitignore_patterns(vault_root: Path) -> List[str]:
     except Exception:
         pass  # Continue with built-in patterns if submodule parsing fails
     
-    # Add patterns from .gitignore (optional)
-    gitignore_path = vault_root / '.gitignore'
-    if not gitignore_path.exists():
-        return patterns
+    # Add patterns from .gitignore (optional). Later patterns take
+    # precedence, so the vault's own rules can override built-ins with '!'
+    patterns.extend(_read_gitignore(vault_root / '.gitignore'))
     
-    # Parse .gitignore file
+    return patterns
+
+
+def _read_gitignore(gitignore_path: Path) -> List[str]:
+    """
+    Read the patterns of one .gitignore file.
+
+    Blank lines and comments are skipped; everything else is kept verbatim
+    (including trailing slashes and '!' negations) for IgnoreMatcher.
+    Missing or unreadable files yield no patterns.
+    """
+    patterns = []
     try:
         with open(gitignore_path, 'r', encoding='utf-8') as f:
             for line in f:
@@ -96,10 +762,7 @@ def load_gitignore_patterns(vault_root: Path) -> List[str]:
                 # Skip comments and empty lines
                 if not line or line.startswith('#'):
                     continue
-                # Remove trailing slash (gitignore convention)
-                line = line.rstrip('/')
-                if line:  # Only add non-empty patterns
-                    patterns.append(line)
+                patterns.append(line)
     except (IOError, OSError, UnicodeDecodeError):
         # Silently continue if .gitignore can't be read
         # Built-in patterns will still protect against common false positives
@@ -122,13 +785,11 @@ def _get_builtin_patterns() -> List[str]:
     """
     return [
         # Hidden directories - configuration/tooling, not vault content
-        # Matches any folder starting with . at any level
-        '.*/**',
+        # Matches any file or folder starting with . at any level
         '.*',
         
         # Package managers - primary causes of false positives
-        '**/node_modules',
-        '**/node_modules/**',
+        'node_modules/',
         '*.egg-info',
         '__pycache__',
         '.venv',
@@ -136,10 +797,10 @@ def _get_builtin_patterns() -> List[str]:
         '.pnpm-store',
         '.yarn',
         
-        # Build outputs
-        'dist/**',
-        'build/**',
-        'out/**',
+        # Build outputs (at any level, e.g. docs-site/dist)
+        'dist/',
+        'build/',
+        'out/',
         
         # OS files
         '.DS_Store',
@@ -168,7 +829,7 @@ def _load_submodule_paths(vault_root: Path) -> List[str]:
         vault_root: Path to vault root directory
     
     Returns:
-        List of glob patterns for submodule paths to exclude (may be empty)
+        List of anchored patterns for submodule paths to exclude (may be empty)
     """
     submodule_patterns = []
     gitmodules_path = vault_root / '.gitmodules'
@@ -189,9 +850,8 @@ def _load_submodule_paths(vault_root: Path) -> List[str]:
                     # Extract path value, handling both "path = " and "path="
                     submodule_path = line.split('=', 1)[1].strip()
                     if submodule_path:  # Only add non-empty paths
-                        # Add pattern to exclude submodule and all its contents
-                        submodule_patterns.append(f'{submodule_path}/**')
-                        submodule_patterns.append(submodule_path)
+                        # Anchored pattern excludes the submodule and all its contents
+                        submodule_patterns.append('/' + submodule_path.strip('/'))
     except (IOError, OSError, UnicodeDecodeError):
         # Silently return empty list if .gitmodules can't be read
         pass
@@ -199,58 +859,296 @@ def _load_submodule_paths(vault_root: Path) -> List[str]:
     return submodule_patterns
 
 
+def _is_hidden(part: str) -> bool:
+    """True for hidden path components (skips the special . and .. entries)."""
+    return part.startswith('.') and part != '.' and part != '..'
+
+
+def _glob_to_regex(glob: str) -> str:
+    """
+    Translate the path part of a gitignore pattern into a regex.
+
+    - '*' and '?' never match '/'
+    - '**/' matches zero or more directories, '/**' everything inside
+    - '[...]' character classes ('[!...]' negates)
+    - backslash escapes the next character
+    """
+    out = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if c == '*':
+            if glob.startswith('**', i):
+                j = i + 2
+                # '**' is only special as a whole path segment
+                if (i == 0 or glob[i - 1] == '/') and (j == n or glob[j] == '/'):
+                    if j == n:
+                        out.append('.*')
+                        i = j
+                    else:
+                        out.append('(?:.*/)?')
+                        i = j + 1
+                    continue
+                out.append('[^/]*')
+                i = j
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            j = glob.find(']', i + 2)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1:j].replace('\\', '\\\\')
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = j + 1
+                continue
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+            continue
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+_GLOB_CHARS = '*?[\\'
+
+
+class _RuleSet:
+    """
+    The compiled patterns of one ignore file, relative to its directory.
+
+    Most real-world patterns are plain names (node_modules), extensions
+    (*.log) or anchored paths (/drafts/old); those are looked up in dicts,
+    so their cost doesn't grow with the number of patterns. Everything
+    else is compiled into one combined regex per file type, with the
+    alternatives ordered last rule first so that the first alternative
+    that matches is the rule that wins under gitignore's "last matching
+    pattern wins" rule.
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.negated = []
+        # Each table maps a key to the index of the last rule using it;
+        # index 0 holds rules for files and directories, 1 directory-only
+        self.names = ({}, {})      # last path segment
+        self.suffixes = ({}, {})   # extension of the last path segment
+        self.paths = ({}, {})      # full path relative to this directory
+        dir_alternatives = []
+        file_alternatives = []
+        
+        for pattern in patterns:
+            negated = pattern.startswith('!')
+            if negated:
+                pattern = pattern[1:]
+            dir_only = pattern.endswith('/')
+            pattern = pattern.rstrip('/')
+            if not pattern:
+                continue
+            
+            index = len(self.negated)
+            self.negated.append(negated)
+            
+            # A slash anywhere but the end anchors the pattern to this directory
+            anchored = '/' in pattern
+            pattern = pattern.lstrip('/')
+            
+            if not any(c in _GLOB_CHARS for c in pattern):
+                table = self.paths if anchored else self.names
+                table[dir_only][pattern] = index
+                continue
+            
+            suffix = pattern[1:]
+            if (not anchored and pattern.startswith('*.') and suffix.count('.') == 1
+                    and not any(c in _GLOB_CHARS for c in suffix)):
+                self.suffixes[dir_only][suffix] = index
+                continue
+            
+            regex = _glob_to_regex(pattern)
+            if not anchored:
+                regex = '(?:.*/)?' + regex
+            alternative = f'(?P<r{index}>{regex})'
+            dir_alternatives.append(alternative)
+            if not dir_only:
+                file_alternatives.append(alternative)
+        
+        self._dir_regex = self._combine(dir_alternatives)
+        self._file_regex = self._combine(file_alternatives)
+
+    @staticmethod
+    def _combine(alternatives: List[str]):
+        if not alternatives:
+            return None
+        return re.compile('|'.join(reversed(alternatives)), re.DOTALL)
+
+    def match(self, rel_path: str, name: str, is_dir: bool) -> Optional[bool]:
+        """
+        Return True if the path is ignored, False if a '!' rule re-includes
+        it, or None if no rule in this set matches.
+        """
+        dot = name.rfind('.')
+        suffix = name[dot:] if dot >= 0 else None
+        
+        best = -1
+        for dir_only in ((0, 1) if is_dir else (0,)):
+            best = max(
+                best,
+                self.names[dir_only].get(name, -1),
+                self.paths[dir_only].get(rel_path, -1),
+                self.suffixes[dir_only].get(suffix, -1),
+            )
+        
+        regex = self._dir_regex if is_dir else self._file_regex
+        if regex is not None:
+            m = regex.fullmatch(rel_path)
+            if m is not None:
+                best = max(best, int(m.lastgroup[1:]))
+        
+        if best < 0:
+            return None
+        return not self.negated[best]
+
+
+class IgnoreMatcher:
+    """
+    Compiled gitignore matcher for a vault.
+
+    Implements gitignore semantics: patterns without a slash match at any
+    level, patterns with a slash are anchored to their .gitignore's
+    directory, '**' spans directories, a trailing '/' only matches
+    directories, and '!' re-includes paths excluded by earlier patterns.
+    Nested .gitignore files are loaded on demand and take precedence over
+    their parents. As in git, nothing inside an excluded directory can be
+    re-included. Hidden files and directories are always excluded.
+
+    Directory verdicts are cached, so checking many files in the same
+    directory only costs one match per file.
+
+    Args:
+        patterns: Root-level patterns (see load_gitignore_patterns)
+        vault_root: Vault root, used to find nested .gitignore files
+            (None disables nested .gitignore support)
+    """
+
+    def __init__(self, patterns: List[str], vault_root: Path = None):
+        self.patterns = list(patterns)
+        self.vault_root = Path(vault_root) if vault_root is not None else None
+        self._root_rules = _RuleSet(self.patterns)
+        self._chains = {}
+        self._dir_verdicts = {'': False}
+
+    def _rule_chain(self, rel_dir: str) -> List[Tuple[str, _RuleSet]]:
+        """Rule sets that apply inside rel_dir, deepest .gitignore first."""
+        chain = self._chains.get(rel_dir)
+        if chain is None:
+            if rel_dir == '':
+                chain = [('', self._root_rules)]
+            else:
+                chain = self._rule_chain(rel_dir.rpartition('/')[0])
+                nested = []
+                if self.vault_root is not None:
+                    nested = _read_gitignore(self.vault_root / rel_dir / '.gitignore')
+                if nested:
+                    chain = [(rel_dir + '/', _RuleSet(nested))] + chain
+            self._chains[rel_dir] = chain
+        return chain
+
+    def matches_entry(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        Check a single path whose parent directory is known not to be excluded.
+
+        This is what a directory walker needs: parents were already checked
+        on the way down, so only the entry itself has to be matched.
+        """
+        parent, _, name = rel_path.rpartition('/')
+        if _is_hidden(name):
+            return True
+        for base, rules in self._rule_chain(parent):
+            verdict = rules.match(rel_path[len(base):], name, is_dir)
+            if verdict is not None:
+                return verdict
+        return False
+
+    def is_dir_excluded(self, rel_dir: str) -> bool:
+        """True if the directory (or any of its parents) is excluded."""
+        verdict = self._dir_verdicts.get(rel_dir)
+        if verdict is None:
+            verdict = (
+                self.is_dir_excluded(rel_dir.rpartition('/')[0])
+                or self.matches_entry(rel_dir, is_dir=True)
+            )
+            self._dir_verdicts[rel_dir] = verdict
+        return verdict
+
+    def is_excluded(self, rel_path: str, is_dir: bool = False) -> bool:
+        """
+        True if the path is excluded, checking all its parent directories.
+
+        Args:
+            rel_path: Path relative to the vault root (forward slashes)
+            is_dir: Whether the path is a directory
+        """
+        rel_path = rel_path.replace('\\', '/').strip('/')
+        if is_dir:
+            return self.is_dir_excluded(rel_path)
+        if self.is_dir_excluded(rel_path.rpartition('/')[0]):
+            return True
+        return self.matches_entry(rel_path, is_dir=False)
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_matcher(patterns: Tuple[str, ...], vault_root: Optional[str]) -> IgnoreMatcher:
+    return IgnoreMatcher(list(patterns), vault_root)
+
+
+def compile_ignore_patterns(patterns, vault_root: Path = None) -> IgnoreMatcher:
+    """
+    Get the compiled IgnoreMatcher for a pattern list.
+
+    Matchers are cached, so calling this for every file with the same
+    pattern list compiles the patterns only once.
+
+    Args:
+        patterns: List of gitignore patterns, or an IgnoreMatcher (returned as-is)
+        vault_root: Vault root, used to find nested .gitignore files
+
+    Returns:
+        IgnoreMatcher
+    """
+    if isinstance(patterns, IgnoreMatcher):
+        return patterns
+    root = str(vault_root) if vault_root is not None else None
+    return _cached_matcher(tuple(patterns), root)
+
+
 def _path_matches_patterns(rel_path: str, patterns: List[str]) -> bool:
     """
     Check if a relative path matches any of the gitignore patterns.
-    Uses fnmatch for glob matching (standard Python library).
     
     Special handling:
-    - Hidden directories (starting with .) are excluded at any level
-    - Directory-level matching for patterns like '**/node_modules/**'
-    - File-level matching for specific patterns
+    - Hidden files and directories (starting with .) are excluded at any level
+    - A matching directory excludes everything under it
+    - '!' patterns re-include paths excluded by earlier patterns
     
-    Handles both file-level and directory-level matches:
-    - 'node_modules/package/README.md' matches '**/node_modules/**'
-    - 'dist/index.html' matches 'dist/**'
-    - '.git/config' matches '.git/**'
-    - '.agents/skills/file.md' matches '.*/**' (hidden dir at any level)
+    Examples:
+    - 'node_modules/package/README.md' matches 'node_modules/'
+    - 'docs/dist/index.html' matches 'dist/'
+    - 'dist/index.html' matches '/dist' but 'docs/dist/index.html' does not
+    - '.agents/skills/file.md' is hidden at any level
     
     Args:
         rel_path: Relative path from vault root (forward slashes)
-        patterns: List of glob patterns from gitignore
+        patterns: List of gitignore patterns
     
     Returns:
         True if path matches any pattern, False otherwise
     """
-    # Normalize to forward slashes for consistent matching
-    rel_path = rel_path.replace('\\', '/')
-    
-    # Quick check: Exclude any path with hidden directories (starting with .)
-    # This catches .agents, .github, .codex, .ralph-tui, etc.
-    path_parts = rel_path.split('/')
-    for part in path_parts:
-        if part.startswith('.') and part != '.' and part != '..':
-            # Hidden directory found - exclude this path
-            # (skip special directories . and ..)
-            return True
-    
-    for pattern in patterns:
-        # Direct file/path match
-        if fnmatch.fnmatch(rel_path, pattern):
-            return True
-        
-        # Check each path component for directory matches
-        # This helps match patterns like '*/node_modules/**' or '**/dist/**'
-        for i, part in enumerate(path_parts):
-            # Match against bare pattern (e.g., 'dist' from 'dist/**')
-            bare_pattern = pattern.strip('*').strip('/')
-            if fnmatch.fnmatch(part, bare_pattern):
-                # Also check if everything after this part should be excluded
-                # e.g., if 'node_modules' matched, exclude everything under it
-                if i < len(path_parts) - 1 or '/**' in pattern:
-                    return True
-    
-    return False
+    return compile_ignore_patterns(patterns).is_excluded(rel_path)
 
 
 def is_vault_content(
@@ -278,7 +1176,8 @@ def is_vault_content(
     Args:
         file_path: Absolute path to file being checked
         vault_root: Absolute path to vault root directory
-        ignore_patterns: List of gitignore patterns (loads from .gitignore if None)
+        ignore_patterns: List of gitignore patterns or a compiled IgnoreMatcher
+            (loads from .gitignore if None)
     
     Returns:
         True if file should be audited, False if it should be skipped
@@ -298,44 +1197,300 @@ def is_vault_content(
         return False
     
     # Skip if matches any ignore pattern
-    if _path_matches_patterns(rel_path, ignore_patterns):
+    matcher = compile_ignore_patterns(ignore_patterns, vault_root)
+    if matcher.is_excluded(rel_path):
         return False
     
     return True
 
 
-def should_check_frontmatter(file_path: Path, vault_root: Path) -> bool:
+def walk_vault(
+    vault_root: Path,
+    ignore_patterns: List[str] = None,
+    stats: Optional['Stats'] = None,
+) -> Iterator[Path]:
     """
-    Determine if a file should be checked for frontmatter.
-    
-    Vault content should have frontmatter, but generated/library
-    files don't need it:
-    - Documentation files (README.md, CHANGELOG.md, etc.)
-    - Generated HTML/CSS in dist folders
-    - Library files from dependencies
-    
-    This function is robust and handles:
-    - Files outside vault root (returns False)
-    - Invalid file paths (returns False)
-    
+    Yield every markdown file that is vault content.
+
+    Equivalent to filtering vault_root.rglob('*.md') through is_vault_content,
+    but excluded directories (node_modules, dist, .git, submodules, ...) are
+    pruned before descending, so nothing inside them is ever listed or stat-ed.
+    Nested .gitignore files are honored for the directories they live in.
+
+    Symlinked directories are followed, but each directory inode is visited
+    at most once, so symlink loops and aliases don't produce duplicates.
+
+    Files are yielded depth-first, a directory's own files before its
+    subdirectories, in the order the filesystem lists them.
+
     Args:
-        file_path: Absolute path to file
-        vault_root: Absolute path to vault root
-    
+        vault_root: Path to vault root directory
+        ignore_patterns: List of gitignore patterns (loads from .gitignore if None)
+        stats: Optional Stats to record entry counts and ignore-matching time in
+
     Returns:
-        True if file should have frontmatter, False if it's exempt
+        Iterator of paths under vault_root
     """
+    vault_root = Path(vault_root)
+    if ignore_patterns is None:
+        ignore_patterns = load_gitignore_patterns(vault_root)
+    matcher = compile_ignore_patterns(ignore_patterns, vault_root)
+    if stats is None:
+        stats = Stats()  # discarded; keeps the loop free of checks
+    counts = stats.counts
+    clock = time.perf_counter
+    ignore_time = 0.0
+    
+    visited = set()  # (st_dev, st_ino) of directories already walked
     try:
-        rel_path = str(file_path.relative_to(vault_root)).lower()
-        filename = file_path.name.lower()
-    except (ValueError, AttributeError):
-        # File outside vault or invalid path - exempt from frontmatter check
-        return False
+        root_stat = vault_root.stat()
+        visited.add((root_stat.st_dev, root_stat.st_ino))
+    except OSError:
+        return
     
-    # Patterns for files that don't need frontmatter
-    library_patterns = [
-        '**/readme*',
-        '**/changelog*',
+    stack = [(str(vault_root), '')]
+    while stack:
+        dir_path, rel_dir = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        counts['entries_seen'] += len(entries)
+        
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            rel_path = f'{rel_dir}/{name}' if rel_dir else name
+            try:
+                if entry.is_dir():
+                    start = clock()
+                    excluded = matcher.is_dir_excluded(rel_path)
+                    ignore_time += clock() - start
+                    if excluded:
+                        counts['entries_skipped'] += 1
+                        continue
+                    st = entry.stat()
+                    key = (st.st_dev, st.st_ino)
+                    if key in visited:
+                        continue
+                    visited.add(key)
+                    subdirs.append((entry.path, rel_path))
+                elif name.endswith('.md') and entry.is_file():
+                    start = clock()
+                    excluded = matcher.matches_entry(rel_path, is_dir=False)
+                    ignore_time += clock() - start
+                    if excluded:
+                        counts['entries_skipped'] += 1
+                    else:
+                        yield Path(entry.path)
+            except OSError:
+                # Broken symlink or entry vanished mid-walk
+                continue
+        
+        # Reversed so the first subdirectory is walked first
+        stack.extend(reversed(subdirs))
+    
+    stats.phases['ignore'] += ignore_time
+
+
+class VaultMonitor:
+    """
+    Find the notes added, modified or removed since the last look, by polling.
+
+    Remembers the mtime and size of every note walk_vault() would yield
+    and the mtime of every directory it would descend into. poll() only
+    stats those: a modified note shows in its own mtime or size, and
+    adding, removing or renaming an entry changes its directory's mtime,
+    so only those directories are listed again (new subdirectories are
+    walked whole). That is one stat per note and directory, far cheaper
+    than walking the vault, and needs nothing beyond the standard library
+    (no inotify or FSEvents).
+
+    The ignore rules are read once; poll() reports when .gitignore or
+    .gitmodules at the vault root changed, so the caller can start over.
+
+    Usage:
+        monitor = VaultMonitor(vault_root)
+        paths = monitor.paths()
+        while True:
+            time.sleep(1)
+            added, modified, removed = monitor.poll()
+    """
+
+    # Entries changed this recently may change again within the same
+    # mtime tick (see AuditCache.RACY_WINDOW), so they are checked again
+    RACY_WINDOW = 2.0
+
+    CONFIG_FILES = ('.gitignore', '.gitmodules')
+
+    def __init__(self, vault_root: Path, ignore_patterns: List[str] = None):
+        self.vault_root = Path(vault_root)
+        if ignore_patterns is None:
+            ignore_patterns = load_gitignore_patterns(self.vault_root)
+        self._matcher = compile_ignore_patterns(ignore_patterns, self.vault_root)
+        self._files: Dict[str, Tuple[str, int, int]] = {}  # rel path -> (path, mtime_ns, size)
+        self._dirs: Dict[str, Tuple[str, int]] = {}        # rel dir ('/'-separated) -> (path, mtime_ns)
+        self._dir_ids: Dict[str, Tuple[int, int]] = {}     # rel dir -> (st_dev, st_ino)
+        self._visited: Set[Tuple[int, int]] = set()
+        self._config = self._config_state()
+        self._walk(str(self.vault_root), '', set())
+
+    def _config_state(self) -> List[Optional[Tuple[int, int]]]:
+        state = []
+        for name in self.CONFIG_FILES:
+            try:
+                st = os.stat(self.vault_root / name)
+                state.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                state.append(None)
+        return state
+
+    def _stamp(self, st: os.stat_result) -> int:
+        """st's mtime, or -1 if it is too recent to trust (checked again next poll)."""
+        return st.st_mtime_ns if time.time() - st.st_mtime >= self.RACY_WINDOW else -1
+
+    def _walk(self, dir_path: str, rel_dir: str, added: Set[str]) -> None:
+        """Record a directory and everything below it, adding new notes to added."""
+        stack = [(dir_path, rel_dir)]
+        while stack:
+            dir_path, rel_dir = stack.pop()
+            stack.extend(self._list(dir_path, rel_dir, added))
+
+    def _list(self, dir_path: str, rel_dir: str, added: Set[str]) -> List[Tuple[str, str]]:
+        """
+        List one directory as walk_vault() does, recording it and its new notes.
+
+        Returns:
+            (path, rel dir) of the subdirectories not seen before
+        """
+        try:
+            st = os.stat(dir_path)
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError:
+            return []
+        key = (st.st_dev, st.st_ino)
+        if rel_dir not in self._dirs:
+            if key in self._visited:
+                return []  # symlink alias of a directory already watched
+            self._visited.add(key)
+            self._dir_ids[rel_dir] = key
+        self._dirs[rel_dir] = (dir_path, self._stamp(st))
+        
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            rel_path = f'{rel_dir}/{name}' if rel_dir else name
+            try:
+                if entry.is_dir():
+                    if rel_path in self._dirs or self._matcher.is_dir_excluded(rel_path):
+                        continue
+                    subdirs.append((entry.path, rel_path))
+                elif name.endswith('.md') and entry.is_file():
+                    note_path = str(Path(entry.path).relative_to(self.vault_root))
+                    if note_path in self._files or self._matcher.matches_entry(rel_path):
+                        continue
+                    st = entry.stat()
+                    self._files[note_path] = (entry.path, self._stamp(st), st.st_size)
+                    added.add(note_path)
+            except OSError:
+                continue
+        return subdirs
+
+    def _forget_dir(self, rel_dir: str) -> None:
+        """Stop watching a directory that is gone, and everything below it."""
+        prefix = rel_dir + '/'
+        for other in [d for d in self._dirs if d == rel_dir or d.startswith(prefix)]:
+            del self._dirs[other]
+            self._visited.discard(self._dir_ids.pop(other, None))
+
+    def paths(self) -> Set[str]:
+        """Paths (relative to the vault root) of all notes currently known."""
+        return set(self._files)
+
+    def config_changed(self) -> bool:
+        """True if .gitignore or .gitmodules changed since the monitor was created."""
+        return self._config_state() != self._config
+
+    def poll(self) -> Tuple[Set[str], Set[str], Set[str]]:
+        """
+        Compare the vault with the last poll.
+
+        Returns:
+            (added, modified, removed) sets of note paths relative to the
+            vault root; a renamed note is removed under its old path and
+            added under its new one
+        """
+        # Forget vanished directories before listing changed ones, so a
+        # renamed directory isn't mistaken for an alias of its old name
+        changed = []
+        for rel_dir, (dir_path, mtime_ns) in list(self._dirs.items()):
+            if rel_dir not in self._dirs:
+                continue  # forgotten along with its parent
+            try:
+                st = os.stat(dir_path)
+            except OSError:
+                self._forget_dir(rel_dir)
+                continue
+            if st.st_mtime_ns != mtime_ns:
+                changed.append((dir_path, rel_dir))
+        
+        added = set()
+        for dir_path, rel_dir in changed:
+            if rel_dir in self._dirs:
+                for subdir in self._list(dir_path, rel_dir, added):
+                    self._walk(*subdir, added)
+        
+        modified = set()
+        removed = set()
+        for rel_path, (path, mtime_ns, size) in list(self._files.items()):
+            if rel_path in added:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                del self._files[rel_path]
+                removed.add(rel_path)
+                continue
+            if st.st_mtime_ns != mtime_ns or st.st_size != size:
+                self._files[rel_path] = (path, self._stamp(st), st.st_size)
+                modified.add(rel_path)
+        return added, modified, removed
+
+
+def should_check_frontmatter(file_path: Path, vault_root: Path) -> bool:
+    """
+    Determine if a file should be checked for frontmatter.
+    
+    Vault content should have frontmatter, but generated/library
+    files don't need it:
+    - Documentation files (README.md, CHANGELOG.md, etc.)
+    - Generated HTML/CSS in dist folders
+    - Library files from dependencies
+    
+    This function is robust and handles:
+    - Files outside vault root (returns False)
+    - Invalid file paths (returns False)
+    
+    Args:
+        file_path: Absolute path to file
+        vault_root: Absolute path to vault root
+    
+    Returns:
+        True if file should have frontmatter, False if it's exempt
+    """
+    try:
+        rel_path = str(file_path.relative_to(vault_root)).lower()
+        filename = file_path.name.lower()
+    except (ValueError, AttributeError):
+        # File outside vault or invalid path - exempt from frontmatter check
+        return False
+    
+    # Patterns for files that don't need frontmatter
+    library_patterns = [
+        '**/readme*',
+        '**/changelog*',
         '**/license*',
         '**/code_of_conduct*',
         '**/contributing*',
@@ -352,3 +1507,1988 @@ def should_check_frontmatter(file_path: Path, vault_root: Path) -> bool:
             return False
     
     return True
+
+
+
+@dataclass
+class VaultNote:
+    """
+    Everything the audit scripts need to know about one note.
+
+    Built from a single read of the file (or from the audit cache if the
+    file is unchanged). If the file could not be read, `error` holds the
+    message and `stats` is empty.
+    """
+    path: Path
+    rel_path: str
+    name: str
+    mtime: float = 0.0
+    size: int = 0
+    stats: NoteStats = field(default_factory=NoteStats)
+    error: Optional[str] = None
+
+    @property
+    def links(self) -> List[Link]:
+        return self.stats.links
+
+    @property
+    def frontmatter(self) -> Optional[Dict[str, object]]:
+        return self.stats.frontmatter
+
+    @property
+    def word_count(self) -> int:
+        return self.stats.word_count
+
+    @property
+    def in_maps(self) -> bool:
+        return self.stats.in_maps
+
+    @property
+    def content_hash(self) -> Optional[str]:
+        return self.stats.content_hash
+
+    def property_links(self, key: str) -> List[Link]:
+        return self.stats.property_links(key)
+
+
+# (read seconds, parse seconds, bytes read) for one file, see Stats
+ParseCost = Tuple[float, float, int]
+
+
+# Notes this big are scanned through an mmap with scan_note_bytes
+MMAP_MIN_BYTES = 256 * 1024
+
+
+def _scan_mapped(f) -> Optional[NoteStats]:
+    """
+    Scan an open note of MMAP_MIN_BYTES or more through an mmap.
+
+    Returns None for smaller notes and notes scan_note_bytes declines.
+
+    Raises:
+        OSError, UnicodeDecodeError: if the note can't be read
+    """
+    if os.fstat(f.fileno()).st_size < MMAP_MIN_BYTES:
+        return None
+    try:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None  # not mappable (some network and virtual filesystems)
+    with data:
+        stats = scan_note_bytes(data)
+        if stats is not None:
+            stats.content_hash = hashlib.sha256(data).hexdigest()
+        return stats
+
+
+def _read_note(f) -> Tuple[str, str]:
+    """
+    Read an open binary note whole; returns (text, content hash).
+
+    Line endings are normalized to \\n, as in text mode.
+
+    Raises:
+        OSError, UnicodeDecodeError: if the note can't be read
+    """
+    data = f.read()
+    content = data.decode('utf-8')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content, hashlib.sha256(data).hexdigest()
+
+
+class AtomicBatch:
+    """
+    Replace files so that each changes all at once, in batches.
+
+    Each file's new contents go to a temporary file beside it; commit()
+    flushes the batch to disk and renames every temporary file over its
+    target. Readers (Obsidian, sync clients, a crash) see each file old
+    or new, never partly written, and the batch pays for its disk syncs
+    together rather than file by file. Files keep their permission bits.
+
+    Usage:
+        with AtomicBatch() as batch:
+            for path, data in changes:
+                with batch.open(path) as f:
+                    f.write(data)
+        # committed when the block ends, discarded if it raises
+    """
+
+    def __init__(self):
+        self._staged: List[Tuple[Path, Path]] = []  # (temporary file, target)
+
+    def __len__(self) -> int:
+        return len(self._staged)
+
+    @contextlib.contextmanager
+    def open(self, path: Path) -> Iterator[BinaryIO]:
+        """
+        Open a binary file that replaces path on commit().
+
+        Raises:
+            OSError: if the temporary file can't be written
+        """
+        path = Path(path)
+        tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+        try:
+            with open(tmp_path, 'wb') as f:
+                yield f
+            with contextlib.suppress(FileNotFoundError):
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+        self._staged.append((tmp_path, path))
+
+    def commit(self) -> int:
+        """
+        Sync the staged files and rename them into place.
+
+        Returns:
+            Number of files replaced
+
+        Raises:
+            OSError: if a file can't be synced or renamed; the files not
+                yet renamed are discarded and keep their old contents
+        """
+        try:
+            for tmp_path, _ in self._staged:
+                fd = os.open(tmp_path, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            done = 0
+            for tmp_path, path in self._staged:
+                os.replace(tmp_path, path)
+                done += 1
+        except BaseException:
+            self.discard()
+            raise
+        self._staged = []
+        return done
+
+    def discard(self) -> None:
+        """Delete the staged files, leaving their targets as they are."""
+        for tmp_path, _ in self._staged:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+        self._staged = []
+
+    def __enter__(self) -> 'AtomicBatch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """
+    Replace a file's contents all at once (see AtomicBatch).
+
+    Args:
+        path: File to write (created if missing)
+        data: Its new contents
+
+    Raises:
+        OSError: if the file can't be written; path is then unchanged
+    """
+    with AtomicBatch() as batch:
+        with batch.open(path) as f:
+            f.write(data)
+
+
+def _parse_file(path: str) -> Tuple[Optional[NoteStats], Optional[str], ParseCost]:
+    """
+    Read and scan one note.
+
+    Returns (stats, None, cost) or (None, error message, cost).
+    """
+    start = time.perf_counter()
+    nbytes = 0
+    try:
+        with open(path, 'rb') as f:
+            stats = _scan_mapped(f)
+            if stats is not None:
+                # Pages are read as they are scanned, so it all counts as parsing
+                size = os.fstat(f.fileno()).st_size
+                return stats, None, (0.0, time.perf_counter() - start, size)
+            content, content_hash = _read_note(f)
+            nbytes = f.tell()
+    except (IOError, OSError, UnicodeDecodeError) as e:
+        return None, str(e), (time.perf_counter() - start, 0.0, nbytes)
+    read_done = time.perf_counter()
+    stats = scan_note(content)
+    stats.content_hash = content_hash
+    return stats, None, (read_done - start, time.perf_counter() - read_done, nbytes)
+
+
+def _parse_header(path: str) -> Tuple[Optional[NoteStats], Optional[str], ParseCost]:
+    """
+    Read one note's frontmatter only.
+
+    Returns (stats, None, cost) or (None, error message, cost).
+    """
+    start = time.perf_counter()
+    nbytes = 0
+    try:
+        with open(path, 'rb') as f:
+            header = _read_header(f, FRONTMATTER_MAX_BYTES)
+            nbytes = f.tell()
+        read_done = time.perf_counter()
+        stats = _header_stats(header)
+    except (IOError, OSError, UnicodeDecodeError) as e:
+        return None, str(e), (time.perf_counter() - start, 0.0, nbytes)
+    return stats, None, (read_done - start, time.perf_counter() - read_done, nbytes)
+
+
+def _parse_if_mentions(path: str, pattern: 're.Pattern') -> Tuple[Optional[NoteStats], Optional[str], ParseCost]:
+    """
+    Like _parse_file, but only scan notes whose lowercased text matches pattern.
+
+    Returns (None, None, cost) for notes that don't match. Notes big enough
+    for _scan_mapped are always scanned, never decoded whole.
+    """
+    start = time.perf_counter()
+    nbytes = 0
+    try:
+        with open(path, 'rb') as f:
+            stats = _scan_mapped(f)
+            if stats is not None:
+                # Pages are read as they are scanned, so it all counts as parsing
+                size = os.fstat(f.fileno()).st_size
+                return stats, None, (0.0, time.perf_counter() - start, size)
+            content, content_hash = _read_note(f)
+            nbytes = f.tell()
+    except (IOError, OSError, UnicodeDecodeError) as e:
+        return None, str(e), (time.perf_counter() - start, 0.0, nbytes)
+    read_done = time.perf_counter()
+    if not pattern.search(content.lower()):
+        return None, None, (read_done - start, time.perf_counter() - read_done, nbytes)
+    stats = scan_note(content)
+    stats.content_hash = content_hash
+    return stats, None, (read_done - start, time.perf_counter() - read_done, nbytes)
+
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_MIN_FILES = 64
+
+
+def map_files(func: Callable[[str], object], paths: List[str], jobs: int = 1) -> list:
+    """
+    Apply func to each file path, across a process pool when it pays off.
+
+    Paths are handed to workers in chunks and results come back in input
+    order, so the outcome is identical to a serial map. func must be
+    picklable (a module-level function or a functools.partial of one).
+
+    Args:
+        func: Function of one path
+        paths: File paths
+        jobs: Number of worker processes (0 = one per CPU, 1 = no pool)
+
+    Returns:
+        [func(path) for path in paths]
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs <= 1 or len(paths) < PARALLEL_MIN_FILES:
+        return [func(path) for path in paths]
+    
+    # Several chunks per worker keeps them busy when file sizes vary
+    chunksize = max(1, min(256, len(paths) // (jobs * 8)))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(func, paths, chunksize=chunksize))
+
+
+def parse_files(
+    paths: List[str],
+    jobs: int = 1,
+    header_only: bool = False,
+    mentions: Optional['re.Pattern'] = None,
+) -> List[Tuple[Optional[NoteStats], Optional[str], ParseCost]]:
+    """
+    Read and scan notes, optionally across a process pool.
+
+    Files are spread over worker processes as in map_files(), so the
+    outcome is identical to parsing serially.
+
+    Args:
+        paths: Absolute paths of the notes to parse
+        jobs: Number of worker processes (0 = one per CPU, 1 = no pool)
+        header_only: Only read frontmatter (see read_frontmatter)
+        mentions: Only scan notes whose lowercased text matches this
+            pattern; the others get (None, None, cost)
+
+    Returns:
+        One (stats, error, cost) tuple per path, see _parse_file
+    """
+    if mentions is not None:
+        parse = functools.partial(_parse_if_mentions, pattern=mentions)
+    else:
+        parse = _parse_header if header_only else _parse_file
+    return map_files(parse, paths, jobs)
+
+
+def default_cache_dir() -> Path:
+    """
+    Directory for the audit cache.
+
+    $IDEAVERSE_CACHE_DIR if set, otherwise ideaverse-maintenance/ under
+    $XDG_CACHE_HOME (default ~/.cache).
+    """
+    if os.environ.get('IDEAVERSE_CACHE_DIR'):
+        return Path(os.environ['IDEAVERSE_CACHE_DIR'])
+    base = os.environ.get('XDG_CACHE_HOME') or str(Path.home() / '.cache')
+    return Path(base) / 'ideaverse-maintenance'
+
+
+def _open_cache_db(vault_root: Path, cache_dir: Path = None) -> sqlite3.Connection:
+    """
+    Connect to the cache database for a vault, creating its directory.
+
+    Raises:
+        OSError, sqlite3.Error: if the database can't be opened
+    """
+    cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+    vault_key = hashlib.sha1(str(Path(vault_root).resolve()).encode('utf-8')).hexdigest()[:16]
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return sqlite3.connect(str(cache_dir / f'{vault_key}.sqlite'), timeout=30)
+
+
+class AuditCache:
+    """
+    Persistent per-note NoteStats cache, one SQLite database per vault.
+
+    Entries are keyed on relative path and validated against the file's
+    mtime (in nanoseconds) and size, so only notes that changed since the
+    last run are read and parsed again. The database runs in WAL mode, so
+    concurrent audit runs can read and write it safely.
+
+    Any SQLite error disables the cache for the run instead of failing
+    the audit.
+
+    Usage:
+        cache = AuditCache.open(vault_root)
+        stats = cache.get(rel_path, st.st_mtime_ns, st.st_size)
+        ...
+        cache.put(rel_path, st.st_mtime_ns, st.st_size, stats)
+        cache.commit(seen_paths)
+    """
+
+    SCHEMA_VERSION = 4
+
+    # Files modified this recently may change again within the same mtime
+    # tick without the mtime changing, so they are never cached
+    RACY_WINDOW = 2.0
+
+    def __init__(self, conn: sqlite3.Connection, rebuild: bool = False):
+        self.conn = conn
+        self._pending = []
+        self._now = time.time()
+        
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS notes ('
+            'path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, data TEXT)'
+        )
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        with conn:
+            if rebuild or row is None or row[0] != str(self.SCHEMA_VERSION):
+                conn.execute('DELETE FROM notes')
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)",
+                    (str(self.SCHEMA_VERSION),),
+                )
+        
+        self._entries = {
+            path: (mtime_ns, size, data)
+            for path, mtime_ns, size, data in conn.execute(
+                'SELECT path, mtime_ns, size, data FROM notes')
+        }
+
+    @classmethod
+    def open(cls, vault_root: Path, cache_dir: Path = None, rebuild: bool = False) -> Optional['AuditCache']:
+        """
+        Open (or create) the cache for a vault.
+
+        Args:
+            vault_root: Path to vault root directory
+            cache_dir: Directory holding cache databases (default_cache_dir() if None)
+            rebuild: Discard all cached entries first
+
+        Returns:
+            AuditCache, or None if the cache can't be used
+        """
+        try:
+            conn = _open_cache_db(vault_root, cache_dir)
+            return cls(conn, rebuild=rebuild)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: audit cache unavailable ({e}); continuing without it", file=sys.stderr)
+            return None
+
+    def get(self, rel_path: str, mtime_ns: int, size: int) -> Optional[NoteStats]:
+        """Return the cached NoteStats if the file is unchanged, else None."""
+        entry = self._entries.get(rel_path)
+        if entry is None or entry[0] != mtime_ns or entry[1] != size:
+            return None
+        try:
+            return NoteStats.from_dict(json.loads(entry[2]))
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, rel_path: str, mtime_ns: int, size: int, stats: NoteStats) -> None:
+        """Queue a NoteStats to be written on commit()."""
+        if self._now - mtime_ns / 1e9 < self.RACY_WINDOW:
+            return
+        self._pending.append((rel_path, mtime_ns, size, json.dumps(stats.to_dict())))
+
+    def commit(self, seen_paths: Set[str] = None) -> None:
+        """
+        Write queued entries in one transaction and close the cache.
+
+        Args:
+            seen_paths: All paths found in this run; entries for any other
+                path (deleted or newly ignored notes) are dropped
+        """
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO notes (path, mtime_ns, size, data) VALUES (?, ?, ?, ?)',
+                    self._pending,
+                )
+                if seen_paths is not None:
+                    stale = [(path,) for path in self._entries if path not in seen_paths]
+                    self.conn.executemany('DELETE FROM notes WHERE path = ?', stale)
+        except sqlite3.Error as e:
+            print(f"Warning: could not update audit cache ({e})", file=sys.stderr)
+        finally:
+            self._pending = []
+            self.conn.close()
+
+
+class DerivedCache:
+    """
+    Persistent cache of data computed from note contents, keyed by content hash.
+
+    Lives next to the AuditCache notes table in the same database. Each
+    kind of data (MinHash signatures, ...) gets its own rows; put the
+    parameters the data depends on into the kind, e.g. 'minhash128:3', so
+    changing them never serves stale entries. Entries are keyed on
+    NoteStats.content_hash, so they survive renames and moves.
+
+    Any SQLite error disables the cache for the run instead of failing
+    the script.
+
+    Usage:
+        cache = DerivedCache.open(vault_root, 'minhash128:3')
+        data = cache.get(note.content_hash)
+        ...
+        cache.put(note.content_hash, data)
+        cache.commit(live_hashes)
+    """
+
+    def __init__(self, conn: sqlite3.Connection, kind: str, rebuild: bool = False):
+        self.conn = conn
+        self.kind = kind
+        self._pending = []
+        
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS derived ('
+            'kind TEXT, hash TEXT, data BLOB, PRIMARY KEY (kind, hash)) WITHOUT ROWID'
+        )
+        if rebuild:
+            with conn:
+                conn.execute('DELETE FROM derived WHERE kind = ?', (kind,))
+        
+        self._entries = dict(conn.execute('SELECT hash, data FROM derived WHERE kind = ?', (kind,)))
+
+    @classmethod
+    def open(cls, vault_root: Path, kind: str, cache_dir: Path = None,
+             rebuild: bool = False) -> Optional['DerivedCache']:
+        """
+        Open (or create) the cache of one kind of data for a vault.
+
+        Args:
+            vault_root: Path to vault root directory
+            kind: Name of the data, including anything its value depends on
+            cache_dir: Directory holding cache databases (default_cache_dir() if None)
+            rebuild: Discard all cached entries of this kind first
+
+        Returns:
+            DerivedCache, or None if the cache can't be used
+        """
+        try:
+            return cls(_open_cache_db(vault_root, cache_dir), kind, rebuild=rebuild)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: {kind} cache unavailable ({e}); continuing without it", file=sys.stderr)
+            return None
+
+    def get(self, content_hash: str) -> Optional[bytes]:
+        """Return the cached data for a note's content hash, or None."""
+        return self._entries.get(content_hash)
+
+    def put(self, content_hash: str, data: bytes) -> None:
+        """Queue data to be written on commit()."""
+        self._pending.append((self.kind, content_hash, data))
+
+    def commit(self, live_hashes: Set[str] = None) -> None:
+        """
+        Write queued entries in one transaction and close the cache.
+
+        Args:
+            live_hashes: Content hashes of all notes found in this run;
+                entries of this kind for any other hash are dropped
+        """
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO derived (kind, hash, data) VALUES (?, ?, ?)',
+                    self._pending,
+                )
+                if live_hashes is not None:
+                    stale = [(self.kind, h) for h in self._entries if h not in live_hashes]
+                    self.conn.executemany('DELETE FROM derived WHERE kind = ? AND hash = ?', stale)
+        except sqlite3.Error as e:
+            print(f"Warning: could not update {self.kind} cache ({e})", file=sys.stderr)
+        finally:
+            self._pending = []
+            self.conn.close()
+
+
+_SEARCH_TERM_RE = re.compile(r'\w+')
+
+
+class SearchIndex:
+    """
+    Persistent full-text index of a vault's notes, ranked with BM25.
+
+    An SQLite FTS5 table in the same database as the AuditCache holds
+    each note's title (file name), aliases (the aliases: property) and
+    body (text after the frontmatter). update() walks the vault with the
+    usual ignore rules and re-indexes only notes whose mtime or size
+    changed, so keeping the index current costs about one directory walk;
+    search() is a single query against the inverted index.
+
+    Terms are matched case- and accent-insensitively, after Porter
+    stemming ("notes" finds "note"). A match in the title counts more
+    than one in the aliases, which counts more than one in the body
+    (see WEIGHTS).
+
+    Usage:
+        index = SearchIndex.open(vault_root)
+        index.update()
+        for hit in index.search('spaced repetition'):
+            print(hit['path'], hit['score'])
+        index.close()
+    """
+
+    SCHEMA_VERSION = 2
+
+    # BM25 column weights: title, aliases, body
+    WEIGHTS = (10.0, 4.0, 1.0)
+
+    TOKENIZER = 'porter unicode61 remove_diacritics 2'
+
+    # See AuditCache.RACY_WINDOW; such notes are re-read on the next update
+    RACY_WINDOW = AuditCache.RACY_WINDOW
+
+    def __init__(self, conn: sqlite3.Connection, vault_root: Path, rebuild: bool = False):
+        self.conn = conn
+        self.vault_root = Path(vault_root)
+        
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        row = conn.execute("SELECT value FROM meta WHERE key = 'search_schema'").fetchone()
+        with conn:
+            if rebuild or row is None or row[0] != str(self.SCHEMA_VERSION):
+                conn.execute('DROP TABLE IF EXISTS search_fts')
+                conn.execute('DROP TABLE IF EXISTS search_docs')
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('search_schema', ?)",
+                    (str(self.SCHEMA_VERSION),),
+                )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS search_docs ('
+                'id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE, mtime_ns INTEGER, size INTEGER)'
+            )
+            conn.execute(
+                'CREATE VIRTUAL TABLE IF NOT EXISTS search_fts '
+                f"USING fts5(title, aliases, body, tokenize='{self.TOKENIZER}')"
+            )
+
+    @classmethod
+    def open(cls, vault_root: Path, cache_dir: Path = None, rebuild: bool = False) -> 'SearchIndex':
+        """
+        Open (or create) the search index for a vault.
+
+        Args:
+            vault_root: Path to vault root directory
+            cache_dir: Directory holding cache databases (default_cache_dir() if None)
+            rebuild: Discard the index first
+
+        Returns:
+            SearchIndex
+
+        Raises:
+            OSError, sqlite3.Error: if the database can't be opened, or
+                SQLite was built without FTS5
+        """
+        conn = _open_cache_db(vault_root, cache_dir)
+        try:
+            return cls(conn, vault_root, rebuild=rebuild)
+        except sqlite3.Error:
+            conn.close()
+            raise
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM search_docs').fetchone()[0]
+
+    def update(self, ignore_patterns: List[str] = None, stats: Optional['Stats'] = None) -> Dict[str, int]:
+        """
+        Re-index the notes added, changed or removed since the last update.
+
+        Args:
+            ignore_patterns: List of gitignore patterns (loads from .gitignore if None)
+            stats: Optional Stats to record timings and counts in
+
+        Returns:
+            Counts of 'notes' in the vault and notes 'added', 'updated'
+            and 'removed' from the index
+        """
+        if stats is None:
+            stats = Stats()
+        vault_root = self.vault_root
+        with stats.phase('ignore'):
+            if ignore_patterns is None:
+                ignore_patterns = load_gitignore_patterns(vault_root)
+        
+        known = {
+            path: (doc_id, mtime_ns, size)
+            for doc_id, path, mtime_ns, size in self.conn.execute(
+                'SELECT id, path, mtime_ns, size FROM search_docs')
+        }
+        seen = set()
+        changed = []  # (rel_path, md_file, st, doc id or None)
+        ignore_before = stats.phases['ignore']
+        with stats.phase('walk'):
+            for md_file in walk_vault(vault_root, ignore_patterns, stats):
+                rel_path = str(md_file.relative_to(vault_root))
+                try:
+                    st = md_file.stat()
+                except OSError:
+                    continue
+                seen.add(rel_path)
+                entry = known.get(rel_path)
+                if entry is None or entry[1] != st.st_mtime_ns or entry[2] != st.st_size:
+                    changed.append((rel_path, md_file, st, entry[0] if entry else None))
+        stats.phases['walk'] -= stats.phases['ignore'] - ignore_before
+        stats.counts['notes'] += len(seen)
+        stats.counts['cache_hits'] += len(seen) - len(changed)
+        
+        counts = {'notes': len(seen), 'added': 0, 'updated': 0, 'removed': 0}
+        removed = [entry[0] for path, entry in known.items() if path not in seen]
+        now = time.time()
+        conn = self.conn
+        with conn:
+            for doc_id in removed:
+                conn.execute('DELETE FROM search_fts WHERE rowid = ?', (doc_id,))
+                conn.execute('DELETE FROM search_docs WHERE id = ?', (doc_id,))
+            counts['removed'] = len(removed)
+            
+            for rel_path, md_file, st, doc_id in changed:
+                start = time.perf_counter()
+                try:
+                    with open(md_file, 'rb') as f:
+                        content, _ = _read_note(f)
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"Error reading {md_file}: {e}", file=sys.stderr)
+                    stats.add_parse_cost((time.perf_counter() - start, 0.0, 0), error=True)
+                    if doc_id is not None:
+                        conn.execute('DELETE FROM search_fts WHERE rowid = ?', (doc_id,))
+                        conn.execute('DELETE FROM search_docs WHERE id = ?', (doc_id,))
+                        counts['removed'] += 1
+                    continue
+                read_s = time.perf_counter() - start
+                
+                props = parse_frontmatter(content) or {}
+                aliases = props.get('aliases', props.get('alias', []))
+                if isinstance(aliases, str):
+                    aliases = [aliases]
+                # Recorded as unknown if it may still change within the same mtime tick
+                mtime_ns = st.st_mtime_ns if now - st.st_mtime >= self.RACY_WINDOW else -1
+                
+                if doc_id is None:
+                    doc_id = conn.execute(
+                        'INSERT INTO search_docs (path, mtime_ns, size) VALUES (?, ?, ?)',
+                        (rel_path, mtime_ns, st.st_size),
+                    ).lastrowid
+                    counts['added'] += 1
+                else:
+                    conn.execute('UPDATE search_docs SET mtime_ns = ?, size = ? WHERE id = ?',
+                                 (mtime_ns, st.st_size, doc_id))
+                    conn.execute('DELETE FROM search_fts WHERE rowid = ?', (doc_id,))
+                    counts['updated'] += 1
+                conn.execute(
+                    'INSERT INTO search_fts (rowid, title, aliases, body) VALUES (?, ?, ?, ?)',
+                    (doc_id, md_file.stem, '\n'.join(aliases), note_body(content)),
+                )
+                stats.add_parse_cost((read_s, time.perf_counter() - start - read_s, st.st_size))
+        
+        return counts
+
+    def search(self, query: str, limit: int = 10, raw: bool = False) -> List[Dict[str, object]]:
+        """
+        Rank notes against a query, best match first.
+
+        Args:
+            query: Words to look for; notes containing any of them match,
+                and those containing more of them, or rarer ones, rank
+                higher. With raw, an FTS5 query instead: "exact phrase",
+                AND/OR/NOT, prefix*, title:word ...
+            limit: Most results to return
+            raw: Pass query to FTS5 as is
+
+        Returns:
+            Records {'path', 'title', 'score', 'snippet'}, where score is
+            the BM25 relevance (higher is better) and snippet is the best
+            matching passage, matched terms in **bold**
+
+        Raises:
+            ValueError: if a raw query is malformed
+        """
+        if not raw:
+            # Each word is quoted, so FTS5 syntax in it is taken literally
+            # and 2024-01-15 or e-mail match as a phrase
+            words = [word for word in query.split() if _SEARCH_TERM_RE.search(word)]
+            if not words:
+                return []
+            query = ' OR '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+        
+        # rank MATCH makes FTS5 order by bm25 itself and stop at the limit,
+        # so snippets are only built for the rows returned
+        weights = ', '.join(str(w) for w in self.WEIGHTS)
+        try:
+            rows = self.conn.execute(
+                "SELECT d.path, search_fts.title, rank, "
+                "snippet(search_fts, 2, '**', '**', '...', 16) "
+                'FROM search_fts JOIN search_docs d ON d.id = search_fts.rowid '
+                'WHERE search_fts MATCH ? AND rank MATCH ? ORDER BY rank LIMIT ?',
+                (query, f'bm25({weights})', limit),
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f'invalid search query {query!r}: {e}') from None
+        
+        return [
+            {'path': path, 'title': title, 'score': round(-rank, 3), 'snippet': ' '.join(snippet.split())}
+            for path, title, rank, snippet in rows
+        ]
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class LinkResolver:
+    """
+    Resolve wikilink targets to notes the way Obsidian does.
+
+    Matching is case-insensitive and ignores a trailing '.md'. A bare
+    name matches every note with that stem, anywhere in the vault; a
+    path like 'Folder/Note' matches notes whose path ends in those
+    components, and './' or '../' paths are taken relative to the linking
+    note. When several notes match, the one with the exact spelling wins,
+    then one in the linking note's folder, then the shortest path.
+
+    Every path suffix of every note is hashed up front, so each lookup
+    is a single dict access no matter how large the vault is.
+
+    Usage:
+        resolver = LinkResolver(index.notes)
+        target = resolver.resolve(link.target, source=note)
+    """
+
+    def __init__(self, notes: List['VaultNote']):
+        self._by_suffix: Dict[str, List['VaultNote']] = {}
+        self._resolved: Dict[str, Optional['VaultNote']] = {}
+        for note in notes:
+            parts = _link_key(note.rel_path).split('/')
+            for i in range(len(parts)):
+                self._by_suffix.setdefault('/'.join(parts[i:]), []).append(note)
+
+    def add(self, note: 'VaultNote') -> None:
+        """Make a note added to the vault resolvable."""
+        self._resolved.clear()
+        parts = _link_key(note.rel_path).split('/')
+        for i in range(len(parts)):
+            self._by_suffix.setdefault('/'.join(parts[i:]), []).append(note)
+
+    def remove(self, note: 'VaultNote') -> None:
+        """Stop resolving links to a note removed from the vault."""
+        self._resolved.clear()
+        parts = _link_key(note.rel_path).split('/')
+        for i in range(len(parts)):
+            key = '/'.join(parts[i:])
+            matches = [match for match in self._by_suffix.get(key, ()) if match is not note]
+            if matches:
+                self._by_suffix[key] = matches
+            else:
+                self._by_suffix.pop(key, None)
+
+    def candidates(self, target: str, source: Optional['VaultNote'] = None) -> List['VaultNote']:
+        """
+        Return every note a link target could refer to, best match first.
+
+        Args:
+            target: Link target with any #anchor already split off
+            source: Note containing the link, for relative paths and tie-breaks
+
+        Returns:
+            Matching notes (empty if the link is broken)
+        """
+        if not target:
+            # [[#Heading]] points into the linking note itself
+            return [source] if source is not None else []
+        key = _link_key(target)
+        if source is not None and key.startswith(('./', '../')):
+            key = posixpath.normpath(posixpath.join(_link_key(source.rel_path), '..', key))
+        matches = self._by_suffix.get(key.lstrip('/'), [])
+        if len(matches) < 2:
+            return list(matches)
+        
+        spelled = _rel_key(target).lstrip('/')
+        folder = posixpath.dirname(_rel_key(source.rel_path)) if source is not None else None
+        
+        def rank(note):
+            path = _rel_key(note.rel_path)
+            exact = path == spelled or path.endswith('/' + spelled)
+            nearby = posixpath.dirname(path) == folder
+            return (not exact, not nearby, path.count('/'), path)
+        
+        return sorted(matches, key=rank)
+
+    def resolve(self, target: str, source: Optional['VaultNote'] = None) -> Optional['VaultNote']:
+        """Return the note a link target refers to, or None if it's broken."""
+        note = self._resolved.get(target, _UNRESOLVED)
+        if note is not _UNRESOLVED:
+            return note
+        
+        key = self._key(target)
+        matches = self._by_suffix.get(key, ())
+        if target and len(matches) < 2 and not key.startswith(('./', '../')):
+            # The answer doesn't depend on the linking note; remember it
+            note = self._resolved[target] = matches[0] if matches else None
+            return note
+        matches = self.candidates(target, source)
+        return matches[0] if matches else None
+
+    def is_ambiguous(self, target: str) -> bool:
+        """True if more than one note matches the target."""
+        if target in self._resolved:
+            return False  # only unambiguous answers are memoized
+        return len(self._by_suffix.get(self._key(target), ())) > 1
+
+    def _key(self, target: str) -> str:
+        """Lookup key for a link target."""
+        return _link_key(target).lstrip('/')
+
+
+# Sentinel for LinkResolver's memo, where None means "broken"
+_UNRESOLVED = object()
+
+
+def _rel_key(path: str) -> str:
+    """Note path or link target in '/'-separated form without '.md'."""
+    path = path.replace('\\', '/')
+    return path[:-3] if path.lower().endswith('.md') else path
+
+
+def _link_key(path: str) -> str:
+    """Lookup key for a note path or link target: _rel_key, case-folded."""
+    return _rel_key(path).lower()
+
+
+class LinkGraph:
+    """
+    Every resolved wikilink in a vault as compact integer adjacency arrays.
+
+    Notes are numbered in index order (node i is notes[i]). Links are
+    stored in CSR form: node i links to out_targets[out_offsets[i]:
+    out_offsets[i + 1]], and in_sources/in_offsets hold the same links
+    reversed (built on first use; in-degrees are counted up front).
+    Every occurrence of a link counts, self-links don't. Broken links are
+    kept per node as numbers into unresolved_names (the link text, with
+    any #anchor).
+
+    Each link costs 8 bytes (4 forward, 4 reversed) instead of set and
+    string objects per edge, so even million-link vaults fit in tens of
+    megabytes.
+
+    Usage:
+        graph = index.graph
+        i = graph.node(note)
+        for j in graph.in_neighbors(i):
+            print(graph.notes[j].rel_path, 'links to', note.rel_path)
+    """
+
+    def __init__(self, notes: List['VaultNote'], resolver: LinkResolver):
+        self.notes = notes
+        self._number = number = {note.rel_path: i for i, note in enumerate(notes)}
+        self.out_offsets = array('i', [0])
+        self.out_targets = array('i')
+        self.unresolved_offsets = array('i', [0])
+        self.unresolved_targets = array('i')
+        self.unresolved_names: List[str] = []
+        self._in_degree = array('i', [0]) * len(notes)
+        self._in_offsets = None
+        self._in_sources = None
+
+        names: Dict[str, int] = {}
+        resolve = resolver.resolve
+        add_target = self.out_targets.append
+        add_unresolved = self.unresolved_targets.append
+        in_degree = self._in_degree
+        for note in notes:
+            for link in note.links:
+                target = resolve(link.target, note)
+                if target is None:
+                    name = names.get(link.text)
+                    if name is None:
+                        name = names[link.text] = len(self.unresolved_names)
+                        self.unresolved_names.append(link.text)
+                    add_unresolved(name)
+                elif target is not note:
+                    j = number[target.rel_path]
+                    add_target(j)
+                    in_degree[j] += 1
+            self.out_offsets.append(len(self.out_targets))
+            self.unresolved_offsets.append(len(self.unresolved_targets))
+
+    @property
+    def in_offsets(self) -> array:
+        """CSR offsets into in_sources (built with it on first use)."""
+        if self._in_offsets is None:
+            self._reverse()
+        return self._in_offsets
+
+    @property
+    def in_sources(self) -> array:
+        """Sources of every link, grouped by target (built on first use)."""
+        if self._in_sources is None:
+            self._reverse()
+        return self._in_sources
+
+    def _reverse(self) -> None:
+        """Build the reverse adjacency with a counting sort, sources in order."""
+        offsets = array('i', [0]) * (len(self.notes) + 1)
+        for i, degree in enumerate(self._in_degree):
+            offsets[i + 1] = offsets[i] + degree
+        sources = array('i', [0]) * len(self.out_targets)
+        fill = offsets[:-1]
+        out_offsets, out_targets = self.out_offsets, self.out_targets
+        for i in range(len(self.notes)):
+            for target in out_targets[out_offsets[i]:out_offsets[i + 1]]:
+                sources[fill[target]] = i
+                fill[target] += 1
+        self._in_offsets, self._in_sources = offsets, sources
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+    @property
+    def link_count(self) -> int:
+        """Number of resolved links, not counting self-links."""
+        return len(self.out_targets)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the adjacency arrays."""
+        arrays = (self.out_offsets, self.out_targets, self._in_degree, self._in_offsets,
+                  self._in_sources, self.unresolved_offsets, self.unresolved_targets)
+        return sum(len(a) * a.itemsize for a in arrays if a is not None)
+
+    def node(self, note: 'VaultNote') -> int:
+        """Node number of a note in this graph."""
+        return self._number[note.rel_path]
+
+    def out_degree(self, i: int) -> int:
+        """Number of resolved links from node i to other notes."""
+        return self.out_offsets[i + 1] - self.out_offsets[i]
+
+    def in_degree(self, i: int) -> int:
+        """Number of links into node i from other notes."""
+        return self._in_degree[i]
+
+    def out_neighbors(self, i: int) -> array:
+        """Nodes that node i links to, once per link, in link order."""
+        return self.out_targets[self.out_offsets[i]:self.out_offsets[i + 1]]
+
+    def in_neighbors(self, i: int) -> array:
+        """Nodes linking to node i, once per link, in ascending order."""
+        return self.in_sources[self.in_offsets[i]:self.in_offsets[i + 1]]
+
+    def unresolved(self, i: int) -> List[str]:
+        """Text of node i's broken links (target and #anchor), in link order."""
+        names = self.unresolved_names
+        start, end = self.unresolved_offsets[i], self.unresolved_offsets[i + 1]
+        return [names[k] for k in self.unresolved_targets[start:end]]
+
+
+_TRIGRAM_WORD_RE = re.compile(r'\w+')
+
+
+def _trigrams(text: str) -> FrozenSet[str]:
+    """Character trigrams of each word in text, lowercased and padded like pg_trgm."""
+    grams = set()
+    for word in _TRIGRAM_WORD_RE.findall(text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class TrigramIndex:
+    """
+    Find the notes whose names are most similar to a misspelled name.
+
+    Names are compared by the Jaccard similarity of their character
+    trigram sets (shared trigrams / all trigrams), as in PostgreSQL's
+    pg_trgm. An inverted index maps each trigram to the names containing
+    it, so a lookup counts shared trigrams by walking only the posting
+    lists of the query's own trigrams, and names sharing none are never
+    touched. A name at or above the threshold must share at least
+    ceil(threshold * n) of the query's n trigrams, which rules out most
+    of the rest before any similarity is computed.
+
+    Usage:
+        names = TrigramIndex(index.notes)
+        for note, similarity in names.similar('Concpet Map', limit=3):
+            print(note.rel_path, similarity)
+    """
+
+    def __init__(self, notes: List['VaultNote']):
+        by_name: Dict[str, List['VaultNote']] = {}
+        for note in notes:
+            by_name.setdefault(note.name.lower(), []).append(note)
+        self._notes = [sorted(group, key=lambda n: n.rel_path) for group in by_name.values()]
+        self._postings: Dict[str, List[int]] = {}
+        self._sizes = []
+        for i, name in enumerate(by_name):
+            grams = _trigrams(name)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(i)
+
+    def similar(self, target: str, limit: int = 3,
+                threshold: float = 0.4) -> List[Tuple['VaultNote', float]]:
+        """
+        Return up to limit (note, similarity) pairs for a link target, best first.
+
+        Args:
+            target: Link target; only its last path component is compared
+            limit: Most notes to return
+            threshold: Least similarity (0-1] a name needs to be returned
+
+        Returns:
+            Notes with similarity >= threshold, most similar first, then by path
+        """
+        name = _rel_key(target).rsplit('/', 1)[-1]
+        query = _trigrams(name)
+        if not query or limit <= 0:
+            return []
+        
+        shared_counts = collections.Counter()
+        for gram in query:
+            shared_counts.update(self._postings.get(gram, ()))
+        
+        needed = math.ceil(threshold * len(query) - 1e-9)
+        scored = []
+        for i, shared in shared_counts.items():
+            if shared < needed:
+                continue
+            similarity = shared / (len(query) + self._sizes[i] - shared)
+            if similarity >= threshold:
+                scored.append((-similarity, self._notes[i][0].rel_path, i))
+        scored.sort()
+        
+        results = []
+        for negated, _, i in scored:
+            for note in self._notes[i]:
+                if len(results) == limit:
+                    return results
+                results.append((note, -negated))
+        return results
+
+
+class LiveLinkGraph:
+    """
+    The resolved links of a VaultIndex, kept current as notes change.
+
+    LinkGraph is built once for a fixed set of notes; this keeps each
+    note's links in dicts keyed by path instead, so that after
+    index.update() only the changed notes, and the notes with a link
+    naming an added or removed note (by link stem, as with --since), are
+    resolved again. As in LinkGraph, every occurrence of a link counts
+    and self-links don't.
+
+    Usage:
+        links = LiveLinkGraph(index)
+        added, modified = index.update(changed, removed)
+        relinked, retargeted = links.update(added, modified, removed)
+    """
+
+    def __init__(self, index: 'VaultIndex'):
+        self.index = index
+        self._notes: Dict[str, 'VaultNote'] = {}
+        self._out: Dict[str, Tuple[str, ...]] = {}         # source -> resolved target paths
+        self._unresolved: Dict[str, Tuple[str, ...]] = {}  # source -> broken link texts
+        self._in: Dict[str, Dict[str, int]] = {}           # target -> {source: link count}
+        self._stems: Dict[str, Tuple[str, ...]] = {}       # source -> link stems
+        self._mentions: Dict[str, Set[str]] = {}           # link stem -> sources
+        self._stem_of: Dict[str, str] = {}                 # link target -> stem, memoized
+        for note in index.notes:
+            self._notes[note.rel_path] = note
+            self._link(note)
+
+    def _link(self, note: 'VaultNote') -> Set[str]:
+        """Resolve a note's links; returns the paths it links to."""
+        resolve = self.index.resolver.resolve
+        source = note.rel_path
+        out = []
+        unresolved = []
+        stems = set()
+        stem_of = self._stem_of
+        for link in note.links:
+            target = resolve(link.target, note)
+            if target is None:
+                unresolved.append(link.text)
+            elif target is not note:
+                out.append(target.rel_path)
+            if link.target:
+                stem = stem_of.get(link.target)
+                if stem is None:
+                    stem = stem_of[link.target] = _stem_key(link.target)
+                stems.add(stem)
+        
+        # Tuples of strings drop out of the garbage collector's tracking,
+        # which keeps a 50k-note graph from slowing down every collection
+        self._out[source] = tuple(out)
+        self._unresolved[source] = tuple(unresolved)
+        self._stems[source] = tuple(stems)
+        for stem in stems:
+            self._mentions.setdefault(stem, set()).add(source)
+        for target in out:
+            sources = self._in.setdefault(target, {})
+            sources[source] = sources.get(source, 0) + 1
+        return set(out)
+
+    def _unlink(self, source: str) -> Set[str]:
+        """Forget a note's links; returns the paths it linked to."""
+        out = set(self._out.pop(source, ()))
+        self._unresolved.pop(source, None)
+        for stem in self._stems.pop(source, ()):
+            sources = self._mentions[stem]
+            sources.discard(source)
+            if not sources:
+                del self._mentions[stem]
+        for target in out:
+            sources = self._in[target]
+            del sources[source]
+            if not sources:
+                del self._in[target]
+        return out
+
+    def update(self, added: List['VaultNote'], modified: List['VaultNote'],
+               removed: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """
+        Catch up with index.update(changed, removed).
+
+        Args:
+            added, modified: The notes index.update() returned
+            removed: Paths of the removed notes
+
+        Returns:
+            (relinked, retargeted): paths of the notes whose outgoing
+            links were resolved again, and of the notes whose incoming
+            links may have changed (removed notes are in neither)
+        """
+        removed = {path for path in removed if path in self._notes}
+        for path in removed:
+            del self._notes[path]
+        for note in added:
+            self._notes[note.rel_path] = note
+        
+        # Names that now resolve differently: those of added and removed notes
+        names = {_stem_key(note.rel_path) for note in added}
+        names.update(_stem_key(path) for path in removed)
+        relinked = {note.rel_path for note in added + modified}
+        for name in names:
+            relinked |= self._mentions.get(name, set())
+        relinked -= removed
+        
+        retargeted = {note.rel_path for note in added}
+        for source in relinked | removed:
+            retargeted |= self._unlink(source)
+        for source in relinked:
+            retargeted |= self._link(self._notes[source])
+        return relinked, retargeted - removed
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._notes
+
+    def out_links(self, path: str) -> Tuple[str, ...]:
+        """Paths a note links to, once per link."""
+        return self._out.get(path, ())
+
+    def unresolved(self, path: str) -> Tuple[str, ...]:
+        """Text (with any #anchor) of a note's broken links, once per link."""
+        return self._unresolved.get(path, ())
+
+    def backlinks(self, path: str) -> Dict[str, int]:
+        """Paths of the notes linking to a note, with how often each does."""
+        return dict(self._in.get(path, {}))
+
+    def in_degree(self, path: str) -> int:
+        """Number of links into a note from other notes."""
+        return sum(self._in.get(path, {}).values())
+
+
+class GitError(RuntimeError):
+    """git is missing or a git command failed (no repository, unknown ref, ...)."""
+
+
+def _git(vault_root: Path, *args: str) -> str:
+    """Run a git command in vault_root and return its output; GitError on failure."""
+    try:
+        result = subprocess.run(
+            ['git', '-C', str(vault_root)] + list(args),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=True,
+        )
+    except FileNotFoundError:
+        raise GitError('git is not installed')
+    except subprocess.CalledProcessError as e:
+        message = e.stderr.decode('utf-8', 'replace').strip() or f'git {args[0]} failed'
+        raise GitError(message)
+    return result.stdout.decode('utf-8', 'surrogateescape')
+
+
+def git_changes(vault_root: Path, ref: str) -> Tuple[Set[str], Set[str], Set[str]]:
+    """
+    Ask git which notes changed between ref and the working tree.
+
+    Paths are relative to vault_root, which may be a subdirectory of the
+    repository. Untracked (but not git-ignored) notes count as added.
+
+    Args:
+        vault_root: Path to vault root directory
+        ref: Any git revision (commit, branch, tag, HEAD~3, ...)
+
+    Returns:
+        (changed, removed, removed_links): added/modified notes and the
+        new names of renamed ones; deleted notes and the old names of
+        renamed ones; and the targets of every wikilink on a removed line
+
+    Raises:
+        GitError: if git is missing, vault_root isn't in a repository,
+            or ref doesn't exist
+    """
+    changed, removed = set(), set()
+    fields = _git(vault_root, 'diff', '--name-status', '-z', '-M', '--relative',
+                  ref, '--', '*.md').split('\0')
+    i = 0
+    while i < len(fields) - 1:
+        status = fields[i]
+        if status[:1] in ('R', 'C'):
+            old, new = fields[i + 1], fields[i + 2]
+            if status[0] == 'R':
+                removed.add(str(Path(old)))
+            changed.add(str(Path(new)))
+            i += 3
+            continue
+        path = str(Path(fields[i + 1]))
+        (removed if status == 'D' else changed).add(path)
+        i += 2
+    
+    untracked = _git(vault_root, 'ls-files', '-z', '--others', '--exclude-standard', '--', '*.md')
+    changed.update(str(Path(path)) for path in untracked.split('\0') if path)
+    
+    # Links that disappeared may have been some note's only incoming link
+    removed_links = set()
+    in_hunk = False
+    diff = _git(vault_root, 'diff', '-M', '--relative', '-U0', '--no-color', '--no-ext-diff',
+                ref, '--', '*.md')
+    for line in diff.splitlines():
+        if line.startswith('diff --git'):
+            in_hunk = False
+        elif line.startswith('@@'):
+            in_hunk = True
+        elif in_hunk and line.startswith('-'):
+            for inner in _LINK_RE.findall(line):
+                link = _parse_link(False, inner)
+                if link is not None:
+                    removed_links.add(link.target)
+    
+    return changed, removed, removed_links
+
+
+def git_commit_dates(vault_root: Path) -> Dict[str, float]:
+    """
+    Map every committed note to the time of the last commit that touched it.
+
+    Runs one `git log --name-only` over the whole history instead of a
+    git call per note. Notes with uncommitted changes are left out, as
+    are untracked ones, so callers can fall back to the file's mtime.
+
+    Args:
+        vault_root: Path to vault root directory (may be a subdirectory
+            of the repository)
+
+    Returns:
+        Dict of path relative to vault_root -> commit timestamp (seconds)
+
+    Raises:
+        GitError: if git is missing, vault_root isn't in a repository,
+            or the repository has no commits yet
+    """
+    dates = {}
+    current = None
+    log = _git(vault_root, 'log', '--format=%ct', '--name-only', '-z', '--relative',
+               '--', '*.md')
+    # Commit times and file names come out NUL-separated, newest commit
+    # first; names all end in .md, so a bare number is always a time
+    for entry in log.split('\0'):
+        entry = entry.strip('\n')
+        if not entry:
+            continue
+        if entry.isdigit():
+            current = float(entry)
+        elif current is not None:
+            dates.setdefault(str(Path(entry)), current)
+
+    dirty = _git(vault_root, 'diff', '--name-only', '-z', '--relative', 'HEAD', '--', '*.md')
+    for path in dirty.split('\0'):
+        if path:
+            dates.pop(str(Path(path)), None)
+    return dates
+
+
+def git_first_commit_dates(vault_root: Path) -> Dict[str, float]:
+    """
+    Map every committed note to the time of the commit that added it.
+
+    Runs one `git log` over the whole history, oldest commit first,
+    following renames, so a note renamed or moved since keeps the date
+    it was first committed under its old path. Untracked notes are left
+    out, so callers can fall back to the file's own times.
+
+    Args:
+        vault_root: Path to vault root directory (may be a subdirectory
+            of the repository; notes moved into it count as added then)
+
+    Returns:
+        Dict of path relative to vault_root -> commit timestamp (seconds)
+
+    Raises:
+        GitError: if git is missing, vault_root isn't in a repository,
+            or the repository has no commits yet
+    """
+    dates = {}
+    current = None
+    fields = _git(vault_root, 'log', '--reverse', '--format=%ct', '--name-status', '-z', '-M',
+                  '--relative', '--', '*.md').split('\0')
+    # Each commit is its time, then (status, path) pairs, with an old and
+    # a new path for renames and copies; statuses start with a letter
+    i = 0
+    while i < len(fields) - 1:
+        entry = fields[i].strip('\n')
+        if entry.isdigit():
+            current = float(entry)
+            i += 1
+        elif entry[:1] in ('R', 'C'):
+            old, new = str(Path(fields[i + 1])), str(Path(fields[i + 2]))
+            first = dates.get(old, current)
+            if entry[0] == 'R':
+                dates.pop(old, None)
+            dates[new] = first
+            i += 3
+        else:
+            path = str(Path(fields[i + 1]))
+            if entry == 'D':
+                dates.pop(path, None)
+            else:
+                dates.setdefault(path, current)
+            i += 2
+    return dates
+
+
+def _stem_key(target: str) -> str:
+    """Lowercased note name a link target or note path ends in."""
+    return _link_key(target).rsplit('/', 1)[-1]
+
+
+def _mention_pattern(stems: Set[str]) -> 're.Pattern':
+    """Regex finding a wikilink to any of stems (lowercased) in lowercased note text."""
+    alternatives = '|'.join(re.escape(stem) for stem in sorted(stems, key=len, reverse=True))
+    return re.compile(r'(?:\[\[\s*|/)(?:' + alternatives + r')(?:\.md)?\s*(?:\]\]|\||#)')
+
+
+@dataclass
+class ChangeScope:
+    """
+    The part of the vault an audit limited to changes since a git ref covers.
+
+    All fields are sets of note paths relative to the vault root.
+    """
+    ref: str
+    changed: Set[str]   # added or modified notes, and new names of renamed ones
+    removed: Set[str]   # deleted notes, and old names of renamed ones
+    linking: Set[str]   # notes linking to a changed, removed or re-linked name
+    focus: Set[str]     # notes all of whose incoming links are in changed or linking notes
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process or its workers, in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # ru_maxrss is in bytes on macOS, KiB elsewhere
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+class Stats:
+    """
+    Per-phase timings and counters for one audit run (--stats).
+
+    Phases:
+        walk: listing directories and stat-ing them
+        ignore: loading ignore patterns and matching paths against them
+        cache: stat-ing notes, cache lookups and writes
+        read: reading note files
+        parse: scanning note text (scan_note or the frontmatter header)
+        analysis: the audit itself, once the index is built
+
+    With --jobs, read and parse are summed over the worker processes and
+    can add up to more than the elapsed time.
+
+    Usage:
+        stats = Stats()
+        with stats.phase('analysis'):
+            ...
+        stats.report()
+    """
+
+    PHASES = ('walk', 'ignore', 'cache', 'read', 'parse', 'analysis')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = dict.fromkeys(self.PHASES, 0.0)
+        self._open: Dict[str, float] = {}  # phase -> start time, while inside phase()
+        self.counts: Dict[str, int] = {
+            'entries_seen': 0,     # directory entries listed by the walk
+            'entries_skipped': 0,  # files and directories excluded by ignore rules
+            'notes': 0,            # vault notes found
+            'cache_hits': 0,       # notes served by the audit cache
+            'files_parsed': 0,     # notes actually read
+            'read_errors': 0,
+            'bytes_read': 0,
+        }
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Context manager adding the time spent in its block to a phase."""
+        start = self._open[name] = time.perf_counter()
+        try:
+            yield
+        finally:
+            del self._open[name]
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def add_parse_cost(self, cost: ParseCost, error: bool = False) -> None:
+        """Record the cost of one file from parse_files."""
+        read_s, parse_s, nbytes = cost
+        self.phases['read'] += read_s
+        self.phases['parse'] += parse_s
+        self.counts['bytes_read'] += nbytes
+        self.counts['files_parsed'] += 1
+        if error:
+            self.counts['read_errors'] += 1
+
+    def to_dict(self) -> Dict[str, object]:
+        """Snapshot as a JSON-serializable dict (phases still running count up to now)."""
+        now = time.perf_counter()
+        elapsed = now - self.started
+        phases = dict(self.phases)
+        for name, start in self._open.items():
+            phases[name] = phases.get(name, 0.0) + now - start
+        io_time = phases['read'] + phases['parse']
+        return {
+            'elapsed_s': round(elapsed, 4),
+            'phases_s': {name: round(seconds, 4) for name, seconds in phases.items()},
+            'counts': dict(self.counts),
+            'files_per_s': round(self.counts['notes'] / elapsed, 1) if elapsed else None,
+            'parsed_per_s': round(self.counts['files_parsed'] / io_time, 1) if io_time else None,
+            'peak_rss_mb': round(_peak_rss_mb(), 1) if resource is not None else None,
+        }
+
+    def report(self, file=None) -> None:
+        """Print a human-readable summary (to stderr by default)."""
+        file = file or sys.stderr
+        data = self.to_dict()
+        counts = data['counts']
+        print("\n--- stats ---", file=file)
+        for name, seconds in data['phases_s'].items():
+            print(f"  {name:10} {seconds:9.3f}s", file=file)
+        print(f"  {'total':10} {data['elapsed_s']:9.3f}s", file=file)
+        print(f"  notes: {counts['notes']} ({counts['cache_hits']} from cache, "
+              f"{counts['files_parsed']} parsed, {counts['read_errors']} read errors)", file=file)
+        print(f"  entries: {counts['entries_seen']} seen, {counts['entries_skipped']} skipped "
+              f"by ignore rules", file=file)
+        print(f"  bytes read: {counts['bytes_read'] / (1024 * 1024):.1f} MB", file=file)
+        if data['files_per_s'] is not None:
+            print(f"  throughput: {data['files_per_s']:.0f} notes/s overall", end='', file=file)
+            if data['parsed_per_s'] is not None:
+                print(f", {data['parsed_per_s']:.0f} files/s read+parse", end='', file=file)
+            print(file=file)
+        if data['peak_rss_mb'] is not None:
+            print(f"  peak RSS: {data['peak_rss_mb']:.1f} MB", file=file)
+
+
+def write_ndjson(
+    records: Iterable[Dict[str, object]],
+    group_by: Optional[Tuple[str, Callable[[Dict[str, object]], str]]] = None,
+    stats: Optional[Stats] = None,
+    out=None,
+) -> Dict[str, object]:
+    """
+    Write records as newline-delimited JSON, then a summary trailer.
+
+    Records are written as they are produced, so a generator streams
+    straight through with flat memory. The last line is
+    {"summary": {"count": N, ...}} (plus "stats" if given).
+
+    Args:
+        records: JSON-serializable records, consumed lazily
+        group_by: Optional (name, key function); the summary then also
+            counts records per key under 'by_<name>'
+        stats: Optional Stats to include in the trailer
+        out: Stream to write to (default: stdout)
+
+    Returns:
+        The summary dict
+    """
+    out = out or sys.stdout
+    encode = json.JSONEncoder().encode
+    count = 0
+    groups: Dict[str, int] = {}
+    name, key = group_by if group_by else (None, None)
+    for record in records:
+        out.write(encode(record) + '\n')
+        count += 1
+        if key is not None:
+            group = key(record)
+            groups[group] = groups.get(group, 0) + 1
+    
+    summary: Dict[str, object] = {'count': count}
+    if key is not None:
+        summary[f'by_{name}'] = groups
+    trailer: Dict[str, object] = {'summary': summary}
+    if stats is not None:
+        trailer['stats'] = stats.to_dict()
+    out.write(encode(trailer) + '\n')
+    return summary
+
+
+def attach_stats(payload, stats: Stats) -> Dict[str, object]:
+    """
+    Add stats to a --json payload.
+
+    Dict payloads get a 'stats' key; anything else (the list-shaped
+    reports) is wrapped as {"results": payload, "stats": ...}.
+    """
+    if isinstance(payload, dict):
+        return dict(payload, stats=stats.to_dict())
+    return {'results': payload, 'stats': stats.to_dict()}
+
+
+class VaultIndex:
+    """
+    Single-pass index of all vault content.
+
+    Walks the vault once and reads each note once, recording the data
+    every audit script needs (stems, mtime, and the note's NoteStats:
+    links, frontmatter, word count, headings, tags). Scripts accept a prebuilt index so that running several
+    audits in a row (see run_all.py) touches the filesystem only once.
+
+    With an AuditCache, unchanged notes are taken from the cache and only
+    new or modified notes are read.
+
+    A header_only index reads just the frontmatter of notes not in the
+    cache; their stats hold no links, words, headings or tags. Use it for
+    audits that only look at frontmatter.
+
+    An index built with since=REF covers only what changed since that git
+    ref (see ChangeScope): changed notes, notes linking to a name whose
+    incoming links may have changed, and the notes with those names. Other
+    notes are listed but not read (unless cached); scripts check
+    is_changed(), is_link_source() and has_known_incoming() to stay within
+    the notes whose results match a full run.
+
+    Usage:
+        index = VaultIndex.build(vault_root)
+        for note in index:
+            ...
+    """
+
+    def __init__(
+        self,
+        vault_root: Path,
+        notes: List[VaultNote],
+        ignore_patterns: List[str],
+        header_only: bool = False,
+        stats: Optional[Stats] = None,
+        scope: Optional[ChangeScope] = None,
+    ):
+        self.vault_root = vault_root
+        self.notes = notes
+        self.ignore_patterns = ignore_patterns
+        self.header_only = header_only
+        self.stats = stats if stats is not None else Stats()
+        self.scope = scope
+        self.stems = {note.name for note in notes}
+        self._resolver = None
+        self._graph = None
+
+    @property
+    def resolver(self) -> LinkResolver:
+        """LinkResolver over this index's notes, built on first use."""
+        if self._resolver is None:
+            self._resolver = LinkResolver(self.notes)
+        return self._resolver
+
+    @property
+    def graph(self) -> LinkGraph:
+        """LinkGraph of this index's notes, built on first use."""
+        if self._graph is None:
+            self._graph = LinkGraph(self.notes, self.resolver)
+        return self._graph
+
+    def is_changed(self, note: VaultNote) -> bool:
+        """True if note's own content is audited (always, unless limited by since)."""
+        return self.scope is None or note.rel_path in self.scope.changed
+
+    def is_link_source(self, note: VaultNote) -> bool:
+        """True if note's outgoing links are audited (changed and linking notes with since)."""
+        return (self.scope is None
+                or note.rel_path in self.scope.changed
+                or note.rel_path in self.scope.linking)
+
+    def has_known_incoming(self, note: VaultNote) -> bool:
+        """True if every link into note is known (focus notes with since)."""
+        return self.scope is None or note.rel_path in self.scope.focus
+
+    @classmethod
+    def build(
+        cls,
+        vault_root: Path,
+        ignore_patterns: List[str] = None,
+        cache: Optional[AuditCache] = None,
+        jobs: int = 1,
+        header_only: bool = False,
+        stats: Optional[Stats] = None,
+        since: Optional[str] = None,
+    ) -> 'VaultIndex':
+        """
+        Walk the vault and read every note once.
+
+        Args:
+            vault_root: Path to vault root directory
+            ignore_patterns: List of gitignore patterns (loads from .gitignore if None)
+            cache: Optional AuditCache; it is committed and closed afterwards
+            jobs: Number of processes to parse notes with (0 = one per CPU)
+            header_only: Only read the frontmatter of notes not in the cache
+            stats: Stats to record timings and counts in (a new one if None)
+            since: Git ref; only cover what changed since then (see ChangeScope)
+
+        Returns:
+            Populated VaultIndex
+
+        Raises:
+            GitError: if since is given and git can't answer (see git_changes)
+        """
+        vault_root = Path(vault_root)
+        if stats is None:
+            stats = Stats()
+        with stats.phase('ignore'):
+            if ignore_patterns is None:
+                ignore_patterns = load_gitignore_patterns(vault_root)
+            compile_ignore_patterns(ignore_patterns, vault_root)
+        
+        ignore_before = stats.phases['ignore']
+        with stats.phase('walk'):
+            files = list(walk_vault(vault_root, ignore_patterns, stats))
+        # walk_vault books its ignore matching separately
+        stats.phases['walk'] -= stats.phases['ignore'] - ignore_before
+        
+        notes = []
+        to_parse = []  # (note, st) for notes not served by the cache
+        with stats.phase('cache'):
+            for md_file in files:
+                note = VaultNote(
+                    path=md_file,
+                    rel_path=str(md_file.relative_to(vault_root)),
+                    name=md_file.stem,
+                )
+                notes.append(note)
+                try:
+                    st = md_file.stat()
+                except OSError as e:
+                    note.error = str(e)
+                    stats.counts['read_errors'] += 1
+                    continue
+                note.mtime = st.st_mtime
+                note.size = st.st_size
+                
+                parsed = cache.get(note.rel_path, st.st_mtime_ns, st.st_size) if cache else None
+                if parsed is None:
+                    to_parse.append((note, st))
+                else:
+                    note.stats = parsed
+                    stats.counts['cache_hits'] += 1
+        stats.counts['notes'] += len(notes)
+        
+        def parse(batch, mentions=None):
+            """Parse (note, st) pairs; return paths of the notes it finished with."""
+            results = parse_files([str(note.path) for note, _ in batch], jobs, header_only, mentions)
+            done = set()
+            for (note, st), (parsed, error, cost) in zip(batch, results):
+                stats.add_parse_cost(cost, error=error is not None)
+                if error is not None:
+                    note.error = error
+                elif parsed is None:
+                    continue  # not scanned, see _parse_if_mentions
+                else:
+                    note.stats = parsed
+                    # Partial (header-only) stats must not shadow full ones
+                    if cache and not header_only:
+                        cache.put(note.rel_path, st.st_mtime_ns, st.st_size, parsed)
+                done.add(note.rel_path)
+            return done
+        
+        scope = None
+        if since is None:
+            parse(to_parse)
+        else:
+            scope = cls._scope_changes(vault_root, since, notes, to_parse, parse, header_only)
+        
+        if cache:
+            with stats.phase('cache'):
+                cache.commit({note.rel_path for note in notes})
+        
+        return cls(vault_root, notes, ignore_patterns, header_only, stats, scope)
+
+    @staticmethod
+    def _scope_changes(vault_root, since, notes, to_parse, parse, header_only) -> ChangeScope:
+        """Work out a ChangeScope and parse just the notes it needs."""
+        changed, removed, removed_links = git_changes(vault_root, since)
+        by_path = {note.rel_path: note for note in notes}
+        changed &= by_path.keys()
+        pending = {note.rel_path: (note, st) for note, st in to_parse}
+        
+        def parse_paths(paths):
+            batch = [pending[path] for path in sorted(paths) if path in pending]
+            for path in parse(batch):
+                del pending[path]
+        
+        parse_paths(changed)
+        if header_only:
+            return ChangeScope(since, changed, removed, set(), set())
+        
+        # Names whose incoming links may differ from the ref: changed and
+        # removed notes, and everything changed notes link or linked to
+        names = {_stem_key(path) for path in changed | removed}
+        names.update(_stem_key(target) for target in removed_links)
+        for path in changed:
+            names.update(_stem_key(link.target) for link in by_path[path].links if link.target)
+        names.discard('')
+        if not names:
+            return ChangeScope(since, changed, removed, set(), set())
+        
+        # Notes with those names are scanned in full, so each file is read
+        # (and counted) once; of the rest, only notes that mention one of
+        # the names are scanned
+        focus = {note.rel_path for note in notes if note.name.lower() in names}
+        parse_paths(focus)
+        batch = list(pending.values())
+        for path in parse(batch, mentions=_mention_pattern(names)):
+            del pending[path]
+        
+        linking = {
+            note.rel_path for note in notes
+            if note.rel_path not in pending
+            and any(_stem_key(link.target) in names for link in note.links if link.target)
+        }
+        return ChangeScope(since, changed, removed, linking, focus)
+
+    def update(self, changed: Iterable[str], removed: Iterable[str],
+               jobs: int = 1) -> Tuple[List[VaultNote], List[VaultNote]]:
+        """
+        Apply notes added, modified or removed since the index was built.
+
+        Changed notes are read again (new ones are appended to notes) and
+        removed ones dropped. An already built resolver is updated in
+        place; the graph is rebuilt on next use. Not for indexes limited
+        with since.
+
+        Args:
+            changed: Paths (relative to the vault root) of added or modified notes
+            removed: Paths of notes that no longer exist
+            jobs: Number of processes to parse notes with (0 = one per CPU)
+
+        Returns:
+            (added notes, modified notes)
+        """
+        by_path = {note.rel_path: note for note in self.notes}
+        removed = {path for path in removed if path in by_path}
+        added = []
+        modified = []
+        for rel_path in sorted(set(changed) - removed):
+            note = by_path.get(rel_path)
+            if note is None:
+                path = self.vault_root / rel_path
+                note = VaultNote(path=path, rel_path=rel_path, name=path.stem)
+                added.append(note)
+            else:
+                modified.append(note)
+        
+        batch = []
+        for note in added + modified:
+            note.stats = NoteStats()
+            try:
+                st = note.path.stat()
+            except OSError as e:
+                note.error = str(e)
+                self.stats.counts['read_errors'] += 1
+                continue
+            note.mtime = st.st_mtime
+            note.size = st.st_size
+            note.error = None
+            batch.append(note)
+        results = parse_files([str(note.path) for note in batch], jobs, self.header_only)
+        for note, (parsed, error, cost) in zip(batch, results):
+            self.stats.add_parse_cost(cost, error=error is not None)
+            if error is not None:
+                note.error = error
+            else:
+                note.stats = parsed
+        
+        if removed:
+            self.notes = [note for note in self.notes if note.rel_path not in removed]
+        self.notes.extend(added)
+        if self._resolver is not None:
+            for path in removed:
+                self._resolver.remove(by_path[path])
+            for note in added:
+                self._resolver.add(note)
+        self._graph = None
+        self.stems = {note.name for note in self.notes}
+        return added, modified
+
+    def __iter__(self) -> Iterator[VaultNote]:
+        return iter(self.notes)
+
+    def __len__(self) -> int:
+        return len(self.notes)
+
+
+def add_index_args(parser: argparse.ArgumentParser) -> None:
+    """Add the options shared by every script that builds a VaultIndex."""
+    group = parser.add_argument_group('index options')
+    group.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        metavar='N',
+        help='Parse notes with N processes (0 = one per CPU, default: 1)'
+    )
+    group.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Parse every note, without reading or writing the audit cache'
+    )
+    group.add_argument(
+        '--rebuild-cache',
+        action='store_true',
+        help='Discard the audit cache and re-parse every note'
+    )
+    group.add_argument(
+        '--cache-dir',
+        type=Path,
+        default=None,
+        help='Audit cache location (default: $IDEAVERSE_CACHE_DIR or ~/.cache/ideaverse-maintenance)'
+    )
+    group.add_argument(
+        '--since',
+        metavar='REF',
+        default=None,
+        help='Only audit notes changed since git REF (plus untracked notes) and the notes '
+             'linking to or from them'
+    )
+    group.add_argument(
+        '--stats',
+        action='store_true',
+        help='Report per-phase timings, counts and peak memory (to stderr, or under '
+             '"stats" in json/ndjson output)'
+    )
+
+
+def add_output_args(parser: argparse.ArgumentParser) -> None:
+    """Add the --format/--json/--sort options shared by every script."""
+    group = parser.add_argument_group('output options')
+    group.add_argument(
+        '--format',
+        choices=('text', 'json', 'ndjson'),
+        default='text',
+        help='Output format (default: text); ndjson streams one record per line '
+             'as results are found, followed by a {"summary": ...} line'
+    )
+    group.add_argument(
+        '--json',
+        action='store_const',
+        const='json',
+        dest='format',
+        help='Same as --format json'
+    )
+    group.add_argument(
+        '--sort',
+        action='store_true',
+        help='With --format ndjson, emit records in the same order as --format json '
+             '(buffers them all) instead of as they are found'
+    )
+
+
+def build_index(args: argparse.Namespace, header_only: bool = False) -> VaultIndex:
+    """Build the VaultIndex for a script's parsed command-line arguments."""
+    stats = Stats()
+    cache = None
+    if not args.no_cache:
+        with stats.phase('cache'):
+            cache = AuditCache.open(args.vault_path, args.cache_dir, rebuild=args.rebuild_cache)
+    try:
+        return VaultIndex.build(args.vault_path, cache=cache, jobs=args.jobs,
+                                header_only=header_only, stats=stats, since=args.since)
+    except GitError as e:
+        print(f"Error: --since {args.since}: {e}", file=sys.stderr)
+        sys.exit(2)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Watch the vault and report audit findings as they appear and go away.
+
+Usage:
+    ./vault_watch.py [vault_path] [--interval SECONDS] [--format text|ndjson]
+    ./vault_watch.py [vault_path] --initial --format ndjson | your-editor-plugin
+
+Builds the vault index once, then polls for notes that were added,
+modified, renamed or removed (see VaultMonitor; no inotify needed) and
+re-checks only what a change can affect:
+
+- Broken links: the changed notes, and notes linking to a name that
+  was added or removed
+- Orphans: notes whose incoming links changed
+- Frontmatter issues: the changed notes (check_frontmatter.py)
+- MOC bloat: the changed notes (detect_moc_bloat.py)
+
+Each finding that appears is reported with "+" ("change": "added"), and
+each that goes away with "-" ("change": "resolved"). With --initial the
+findings present at startup are reported first, as added, so a consumer
+summing the deltas always holds the full current state.
+
+If .gitignore or .gitmodules at the vault root change, the vault is
+indexed again from scratch (through the audit cache) and the difference
+reported the same way.
+
+This script watches only vault content, excluding:
+- node_modules/ directories (package dependencies)
+- Build artifacts (dist/, build/, .next/, etc.)
+- Version control (.git/, .github/)
+- Other non-vault content matching .gitignore
+"""
+
+import sys
+import json
+import time
+from pathlib import Path
+from vault_utils import (
+    LiveLinkGraph, VaultIndex, VaultMonitor, add_index_args, build_index, load_gitignore_patterns,
+)
+import argparse
+
+import check_frontmatter
+import detect_moc_bloat
+import find_orphans
+
+AUDITS = ('broken_links', 'orphans', 'frontmatter', 'moc_bloat')
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='Watch the vault and report audit findings as they appear and go away.'
+    )
+    parser.add_argument(
+        'vault_path',
+        nargs='?',
+        type=Path,
+        default=Path.cwd(),
+        help='Path to vault (default: current directory)'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=1.0,
+        metavar='SECONDS',
+        help='Seconds between checks for changed notes (default: 1.0)'
+    )
+    parser.add_argument(
+        '--strict',
+        action='store_true',
+        help='Check MOCs for required "in" property'
+    )
+    parser.add_argument(
+        '--moc-threshold',
+        type=int,
+        default=50,
+        metavar='N',
+        help='Link count to consider a MOC bloated (default: 50)'
+    )
+    parser.add_argument(
+        '--initial',
+        action='store_true',
+        help='Report the findings present at startup before watching for changes'
+    )
+    parser.add_argument(
+        '--format',
+        choices=('text', 'ndjson'),
+        default='text',
+        help='Output format (default: text); ndjson writes one JSON record per finding added '
+             'or resolved, after a {"ready": ...} line'
+    )
+    add_index_args(parser)
+    args = parser.parse_args()
+    if args.since:
+        parser.error("watching covers the whole vault and can't be combined with --since")
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    return args
+
+def audit_notes(index, links, scope, strict=False, moc_threshold=50):
+    """
+    Run the watched audits over part of the vault.
+
+    Args:
+        index: The VaultIndex
+        links: Its LiveLinkGraph
+        scope: {audit: paths of the notes to check}
+
+    Returns:
+        {audit: {path: {key: record}}}, a record per finding keyed by
+        what tells it apart from the note's other findings; paths in
+        scope with no findings (or no longer in the vault) are left out
+    """
+    results = {audit: {} for audit in AUDITS}
+    
+    for path in scope['broken_links']:
+        if path in links:
+            found = {link: {'source': path, 'link': link} for link in links.unresolved(path)}
+            if found:
+                results['broken_links'][path] = found
+    
+    notes = {note.rel_path: note for note in index}
+    for path in scope['orphans']:
+        note = notes.get(path)
+        if note is not None and find_orphans.is_orphan(note, links.in_degree(path)):
+            results['orphans'][path] = {'orphan': {'name': note.name, 'path': path}}
+    
+    # The audit scripts themselves, over an index of just the changed notes
+    changed = VaultIndex(index.vault_root, [notes[path] for path in sorted(scope['frontmatter'])
+                                            if path in notes], index.ignore_patterns)
+    for issue in check_frontmatter.iter_frontmatter_issues(index.vault_root, strict, index=changed):
+        results['frontmatter'].setdefault(issue['path'], {})[issue['issue']] = issue
+    changed = VaultIndex(index.vault_root, [notes[path] for path in sorted(scope['moc_bloat'])
+                                            if path in notes], index.ignore_patterns)
+    for moc in detect_moc_bloat.iter_moc_bloat(index.vault_root, moc_threshold, index=changed):
+        results['moc_bloat'][moc['path']] = {moc['status']: moc}
+    
+    return results
+
+def apply_findings(state, results, scope):
+    """
+    Replace the findings for the notes in scope and return what changed.
+
+    Args:
+        state: {audit: {path: {key: record}}}, updated in place
+        results: audit_notes() output for scope
+        scope: {audit: paths that were checked}
+
+    Returns:
+        Delta records {'audit', 'change': 'added' or 'resolved', ...},
+        audit by audit, each audit's resolved findings first
+    """
+    deltas = []
+    for audit in AUDITS:
+        current = state[audit]
+        resolved = []
+        added = []
+        for path in scope[audit]:
+            old = current.get(path, {})
+            new = results[audit].get(path, {})
+            resolved.extend(record for key, record in old.items() if key not in new)
+            added.extend(record for key, record in new.items() if key not in old)
+            if new:
+                current[path] = new
+            else:
+                current.pop(path, None)
+        for change, records in (('resolved', resolved), ('added', added)):
+            for record in sorted(records, key=lambda r: json.dumps(r, sort_keys=True)):
+                deltas.append({'audit': audit, 'change': change, **record})
+    return deltas
+
+def whole_vault(paths):
+    """Scope covering every audit for the given note paths."""
+    return {audit: set(paths) for audit in AUDITS}
+
+def count_findings(state):
+    return {audit: sum(len(found) for found in state[audit].values()) for audit in AUDITS}
+
+def describe(delta):
+    """One line of text output for a delta record."""
+    sign = '+' if delta['change'] == 'added' else '-'
+    audit = delta['audit']
+    if audit == 'broken_links':
+        return f"  {sign} broken link  {delta['source']} -> [[{delta['link']}]]"
+    if audit == 'orphans':
+        return f"  {sign} orphan       {delta['path']}"
+    if audit == 'frontmatter':
+        return f"  {sign} frontmatter  {delta['path']}: {delta['issue']} ({delta['severity']})"
+    return f"  {sign} MOC bloat    {delta['path']}: {delta['link_count']} links ({delta['status']})"
+
+def emit(deltas, fmt, heading=None):
+    """Write delta records (with a heading line in text format) and flush."""
+    if not deltas:
+        return
+    if fmt == 'ndjson':
+        for delta in deltas:
+            sys.stdout.write(json.dumps(delta) + '\n')
+    else:
+        if heading:
+            print(f"[{time.strftime('%H:%M:%S')}] {heading}")
+        for delta in deltas:
+            print(describe(delta))
+    sys.stdout.flush()
+
+def start(args):
+    """
+    Index the vault and audit all of it.
+
+    Returns (monitor, index, live link graph, findings state, the
+    findings as added deltas).
+    """
+    # The monitor looks first, so a note saved while indexing shows up on
+    # the first poll rather than being missed
+    monitor = VaultMonitor(args.vault_path, load_gitignore_patterns(args.vault_path))
+    index = build_index(args)
+    links = LiveLinkGraph(index)
+    paths = [note.rel_path for note in index]
+    state = {audit: {} for audit in AUDITS}
+    deltas = apply_findings(state, audit_notes(index, links, whole_vault(paths), args.strict,
+                                               args.moc_threshold), whole_vault(paths))
+    return monitor, index, links, state, deltas
+
+def main():
+    args = get_args()
+    
+    if not args.vault_path.exists():
+        print(f"Error: Path does not exist: {args.vault_path}", file=sys.stderr)
+        sys.exit(1)
+    
+    monitor, index, links, state, deltas = start(args)
+    counts = count_findings(state)
+    if args.format == 'ndjson':
+        print(json.dumps({'ready': {'notes': len(index), 'counts': counts}}), flush=True)
+    else:
+        print(f"Watching {len(index)} notes in {args.vault_path}: {counts['broken_links']} broken "
+              f"link(s), {counts['orphans']} orphan(s), {counts['frontmatter']} frontmatter "
+              f"issue(s), {counts['moc_bloat']} large MOC(s). Ctrl-C to stop.", flush=True)
+    if args.stats:
+        index.stats.report()
+    if args.initial:
+        emit(deltas, args.format, 'current findings')
+    
+    try:
+        while True:
+            time.sleep(args.interval)
+            
+            if monitor.config_changed():
+                # Ignore rules changed: start over and report the difference
+                old_paths = {path for found in state.values() for path in found}
+                monitor, index, links, new_state, _ = start(args)
+                scope = whole_vault(old_paths | {note.rel_path for note in index})
+                emit(apply_findings(state, {audit: new_state[audit] for audit in AUDITS}, scope),
+                     args.format, 'ignore rules changed; vault indexed again')
+                continue
+            
+            added, modified, removed = monitor.poll()
+            if not (added or modified or removed):
+                continue
+            
+            new_notes, modified_notes = index.update(added | modified, removed, args.jobs)
+            relinked, retargeted = links.update(new_notes, modified_notes, removed)
+            changed = added | modified
+            scope = {
+                'broken_links': relinked | removed,
+                'orphans': retargeted | changed | removed,
+                'frontmatter': changed | removed,
+                'moc_bloat': changed | removed,
+            }
+            results = audit_notes(index, links, scope, args.strict, args.moc_threshold)
+            summary = ', '.join(f"{len(paths)} {what}" for what, paths in (
+                ('added', added), ('modified', modified), ('removed', removed)) if paths)
+            emit(apply_findings(state, results, scope), args.format, summary)
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+if __name__ == '__main__':
+    main()